@@ -0,0 +1,194 @@
+# Copyright (c) 2026, Digi International, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# AD types
+AD_FLAGS = 0x01
+AD_UUID16_INCOMPLETE = 0x02
+AD_UUID16_COMPLETE = 0x03
+AD_NAME_SHORT = 0x08
+AD_NAME_COMPLETE = 0x09
+AD_SERVICE_DATA16 = 0x16
+AD_MANUFACTURER = 0xFF
+
+COMPANY_ID_APPLE = 0x004C
+COMPANY_ID_DIGI = 0x02DB
+UUID_EDDYSTONE = 0xFEAA
+
+_RULE_KEYS = ("ad_type", "company_id", "service_uuid", "ibeacon_uuid", "eddystone_type", "addresses", "rssi_min")
+
+# Most 16-bit service UUID lists looked at in an advertisement.
+_MAX_UUID_ADS = 4
+
+
+class AdvFilter(object):
+    """
+    Matches advertisements from ble.gap_scan() against a list of rules. The advertisement's AD structures are
+    walked once, recording where the fields the rules look at are, and the rules then compare bytes in place: no
+    slice or other object is allocated per advertisement.
+
+    Each rule is a dictionary with any of the following criteria, all of which must hold for the rule to match:
+
+    * ad_type: An AD structure of this type is present.
+    * company_id: The manufacturer specific data is from this company, such as COMPANY_ID_DIGI.
+    * service_uuid: This 16-bit service UUID is listed, or has service data.
+    * ibeacon_uuid: The advertisement is an iBeacon whose proximity UUID starts with these bytes (empty for any
+      iBeacon).
+    * eddystone_type: The advertisement is an Eddystone frame of this type, such as EddystoneBeacon.TYPE_UID.
+    * addresses: The advertiser address (6 bytes) is one of these.
+    * rssi_min: The RSSI is at least this, in dBm.
+    """
+
+    def __init__(self, rules):
+        """
+        :param rules: The rules, in order of precedence.
+        """
+        self._rules = []
+        for rule in rules:
+            for key in rule:
+                if key not in _RULE_KEYS:
+                    raise ValueError("Unknown rule criterion: " + key)
+            addresses = rule.get("addresses")
+            ibeacon_uuid = rule.get("ibeacon_uuid")
+            if ibeacon_uuid is not None:
+                ibeacon_uuid = bytes(ibeacon_uuid)
+                if len(ibeacon_uuid) > 16:
+                    raise ValueError("ibeacon_uuid is longer than 16 bytes")
+            # -1 stands for "any" so that the checks compare ints only.
+            self._rules.append((
+                rule.get("rssi_min", -1000),
+                None if addresses is None else frozenset(bytes(a) for a in addresses),
+                rule.get("ad_type", -1),
+                rule.get("company_id", -1),
+                rule.get("service_uuid", -1),
+                ibeacon_uuid,
+                rule.get("eddystone_type", -1),
+            ))
+        # Per advertisement scratch state, see _scan(): the AD types present
+        # (marked with the current generation) and where the fields are.
+        self._types = bytearray(256)
+        self._gen = 0
+        self._uuid_ads = [0] * _MAX_UUID_ADS
+        self._uuid_count = 0
+        self._mfg = -1
+        self._svc_data = -1
+
+    def _scan(self, payload):
+        self._gen += 1
+        if self._gen > 255:
+            self._gen = 1
+            for i in range(256):
+                self._types[i] = 0
+        gen = self._gen
+        self._uuid_count = 0
+        self._mfg = -1
+        self._svc_data = -1
+        n = len(payload)
+        pos = 0
+        while pos + 1 < n:
+            length = payload[pos]
+            if length == 0 or pos + 1 + length > n:
+                break
+            ad_type = payload[pos + 1]
+            self._types[ad_type] = gen
+            if ad_type == AD_MANUFACTURER:
+                if self._mfg < 0 and length >= 3:
+                    self._mfg = pos
+            elif ad_type == AD_SERVICE_DATA16:
+                if self._svc_data < 0 and length >= 3:
+                    self._svc_data = pos
+            elif ad_type == AD_UUID16_COMPLETE or ad_type == AD_UUID16_INCOMPLETE:
+                if self._uuid_count < _MAX_UUID_ADS:
+                    self._uuid_ads[self._uuid_count] = pos
+                    self._uuid_count += 1
+            pos += 1 + length
+
+    def _has_uuid(self, payload, uuid):
+        lo = uuid & 0xFF
+        hi = uuid >> 8
+        pos = self._svc_data
+        if pos >= 0 and payload[pos + 2] == lo and payload[pos + 3] == hi:
+            return True
+        for i in range(self._uuid_count):
+            pos = self._uuid_ads[i]
+            end = pos + 1 + payload[pos]
+            pos += 2
+            while pos + 1 < end:
+                if payload[pos] == lo and payload[pos + 1] == hi:
+                    return True
+                pos += 2
+        return False
+
+    def _is_ibeacon(self, payload, prefix):
+        pos = self._mfg
+        if pos < 0 or payload[pos] != 0x1A or payload[pos + 2] != 0x4C or payload[pos + 3] != 0x00 or \
+                payload[pos + 4] != 0x02 or payload[pos + 5] != 0x15:
+            return False
+        pos += 6
+        for i in range(len(prefix)):
+            if payload[pos + i] != prefix[i]:
+                return False
+        return True
+
+    def match(self, adv):
+        """
+        Find the first rule matching an advertisement.
+        :param adv: The advertisement, a dictionary with 'payload', 'address' and 'rssi' as from ble.gap_scan().
+        :return: The index of the rule that matched, None if none did.
+        """
+        payload = adv['payload']
+        rssi = adv['rssi']
+        scanned = False
+        for i in range(len(self._rules)):
+            rssi_min, addresses, ad_type, company_id, service_uuid, ibeacon_uuid, eddystone_type = self._rules[i]
+            if rssi < rssi_min:
+                continue
+            if addresses is not None and adv['address'] not in addresses:
+                continue
+            if not scanned:
+                self._scan(payload)
+                scanned = True
+            if ad_type >= 0 and self._types[ad_type] != self._gen:
+                continue
+            if company_id >= 0:
+                pos = self._mfg
+                if pos < 0 or payload[pos + 2] | payload[pos + 3] << 8 != company_id:
+                    continue
+            if service_uuid >= 0 and not self._has_uuid(payload, service_uuid):
+                continue
+            if ibeacon_uuid is not None and not self._is_ibeacon(payload, ibeacon_uuid):
+                continue
+            if eddystone_type >= 0:
+                pos = self._svc_data
+                if pos < 0 or payload[pos] < 4 or payload[pos + 2] != 0xAA or payload[pos + 3] != 0xFE or \
+                        payload[pos + 4] != eddystone_type:
+                    continue
+            return i
+        return None
+
+    def filter(self, advs):
+        """
+        Yield the advertisements matching a rule, such as those from a scan.
+        :param advs: An iterable of advertisements.
+        :return: Yields (index of the rule that matched, advertisement) tuples.
+        """
+        for adv in advs:
+            i = self.match(adv)
+            if i is not None:
+                yield i, adv
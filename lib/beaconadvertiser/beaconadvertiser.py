@@ -0,0 +1,141 @@
+# Copyright (c) 2026, Digi International, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import utime
+
+_RAW_TYPES = (bytes, bytearray, memoryview)
+
+
+class RotatingAdvertiser(object):
+    """
+    Cycles ble.gap_advertise() through a fixed set of advertisement frames, such as iBeacon and Eddystone frames, on
+    a schedule. The frames are prepared when the advertiser is created, so a rotation only passes the next frame to
+    ble.gap_advertise() and allocates nothing.
+
+    The schedule is kept against the time of the first rotation rather than the time each rotation happened, so
+    late calls to poll() do not make it drift.
+    """
+
+    def __init__(self, frames, dwell=1000, interval_us=100000, ble=None):
+        """
+        :param frames: The frames to advertise in turn. Each is either a bytes-like payload or an object with a frame
+            attribute, like ProximityBeaconFrame or EddystoneBeacon objects, which is read on every rotation so that
+            frames updated in place are advertised as they are.
+        :param dwell: Time in milliseconds each frame is advertised for, or a list of times, one per frame.
+        :param interval_us: The advertising interval passed to ble.gap_advertise(), in microseconds.
+        :param ble: The digi.ble module, imported by default.
+        """
+        if not frames:
+            raise ValueError("No frames to advertise")
+        if ble is None:
+            from digi import ble
+        self.ble = ble
+        self.interval_us = interval_us
+        self._frames = list(frames)
+        self._raw = bytearray(isinstance(f, _RAW_TYPES) for f in self._frames)
+        if isinstance(dwell, int):
+            self._dwell = [dwell] * len(self._frames)
+        else:
+            self._dwell = list(dwell)
+            if len(self._dwell) != len(self._frames):
+                raise ValueError("Expected one dwell time per frame")
+        self._index = -1
+        self._due = 0
+        self.running = False
+        self.rotations = 0
+        # Lateness of the rotations done by poll(), in ms.
+        self.late_ms = 0
+        self.max_late_ms = 0
+
+    def _advertise(self, index):
+        frame = self._frames[index]
+        self.ble.gap_advertise(self.interval_us, frame if self._raw[index] else frame.frame)
+        self._index = index
+        self.rotations += 1
+
+    def start(self, now=None):
+        """
+        Start advertising the first frame.
+        :param now: The time in ticks_ms(), the current time by default.
+        """
+        if now is None:
+            now = utime.ticks_ms()
+        self.running = True
+        self._advertise(0)
+        self._due = utime.ticks_add(now, self._dwell[0])
+
+    def poll(self, now=None) -> int:
+        """
+        Advertise the next frame if the current one is due to change. Call this often from the main loop.
+        :param now: The time in ticks_ms(), the current time by default.
+        :return: Time in milliseconds until the next rotation is due.
+        """
+        if now is None:
+            now = utime.ticks_ms()
+        if not self.running:
+            self.start(now)
+        late = utime.ticks_diff(now, self._due)
+        if late < 0:
+            return -late
+        index = self._index + 1
+        if index == len(self._frames):
+            index = 0
+        self._advertise(index)
+        self.late_ms += late
+        if late > self.max_late_ms:
+            self.max_late_ms = late
+        if late >= self._dwell[index]:
+            # Too far behind to catch up, start the schedule over from now.
+            self._due = utime.ticks_add(now, self._dwell[index])
+        else:
+            self._due = utime.ticks_add(self._due, self._dwell[index])
+        return utime.ticks_diff(self._due, now)
+
+    def run(self, duration=None):
+        """
+        Rotate the frames, sleeping between rotations.
+        :param duration: Time in milliseconds to run for, forever by default. Advertising is stopped afterwards.
+        """
+        start = utime.ticks_ms()
+        self.start(start)
+        while True:
+            wait = self.poll()
+            if duration is not None:
+                left = duration - utime.ticks_diff(utime.ticks_ms(), start)
+                if left <= 0:
+                    break
+                wait = min(wait, left)
+            utime.sleep_ms(wait)
+        self.stop()
+
+    def stop(self):
+        """
+        Stop advertising.
+        """
+        self.ble.gap_advertise(None)
+        self.running = False
+
+    @property
+    def index(self) -> int:
+        """
+        Get the index of the frame being advertised, -1 before start().
+        """
+        return self._index
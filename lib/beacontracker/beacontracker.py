@@ -0,0 +1,239 @@
+# Copyright (c) 2026, Digi International, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import math
+import utime
+
+import EddystoneBeacon
+
+# Events passed to the tracker callback.
+ENTER = 0
+EXIT = 1
+MOVE = 2
+
+# Proximity zones, from the smoothed distance.
+IMMEDIATE = 0
+NEAR = 1
+FAR = 2
+
+# Eddystone ranging data is the power at 0 m, iBeacon measured power the
+# power at 1 m, which is about 41 dB lower.
+_EDDYSTONE_1M_LOSS = 41
+
+
+def _signed(b):
+    return b - 256 if b > 127 else b
+
+
+def beacon_key(payload):
+    """
+    Get the identity of an iBeacon or Eddystone-UID advertisement.
+    :param payload: The raw advertisement.
+    :return: The key (iBeacon UUID, major and minor, or Eddystone namespace and instance) and the advertised power at
+        1 m in dBm: bytes, int. None if payload is neither kind of beacon.
+    """
+    n = len(payload)
+    if (
+        n == 30 and payload[3] == 0x1A and payload[4] == 0xFF and payload[5] == 0x4C and payload[6] == 0x00 and
+        payload[7] == 0x02 and payload[8] == 0x15
+    ):
+        return bytes(payload[9:29]), _signed(payload[29])
+    if EddystoneBeacon.eddystone_type(payload) == EddystoneBeacon.TYPE_UID:
+        return bytes(payload[13:29]), _signed(payload[12]) - _EDDYSTONE_1M_LOSS
+    return None
+
+
+class BeaconTracker(object):
+    """
+    Keeps track of the iBeacon and Eddystone-UID beacons in range from the advertisements of a scan, and reports
+    only changes: a beacon entering, leaving (not heard for timeout ms) or moving to another proximity zone.
+
+    Up to capacity beacons are tracked in preallocated slots. When all are in use, the beacon heard least recently
+    is dropped (with an EXIT event) to make room for a new one.
+    """
+
+    def __init__(self, callback, capacity=32, timeout=30000, alpha=0.25, immediate_m=0.5, near_m=3.0,
+                 path_loss=2.0, hysteresis=3.0, confirm=3):
+        """
+        :param callback: Called as callback(event, key, rssi, zone) for ENTER, EXIT and MOVE events, with the
+            smoothed RSSI in dBm.
+        :param capacity: Maximum number of beacons tracked.
+        :param timeout: Time in milliseconds after which a beacon not heard again has left.
+        :param alpha: Weight of a new RSSI reading in the moving average, between 0 and 1.
+        :param immediate_m: Distance in meters up to which a beacon is IMMEDIATE.
+        :param near_m: Distance in meters up to which a beacon is NEAR, FAR beyond.
+        :param path_loss: Path loss exponent used to estimate distances, 2 in free space.
+        :param hysteresis: Margin in dB the smoothed RSSI must cross a zone limit by for a beacon to change zone.
+        :param confirm: Number of consecutive readings a beacon must be in another zone for before it moves there.
+        """
+        self.callback = callback
+        self.capacity = capacity
+        self.timeout = timeout
+        self.path_loss = path_loss
+        self._alpha = int(alpha * 256)
+        # Zone limits as path loss relative to the power at 1 m, in 1/16 dB.
+        db_per_log = 10 * path_loss / math.log(10)
+        self._immediate = int(16 * db_per_log * math.log(immediate_m))
+        self._near = int(16 * db_per_log * math.log(near_m))
+        self._margin = int(16 * hysteresis)
+        self.confirm = confirm
+        # One entry per slot; RSSI and power are kept in 1/16 dB.
+        self._index = {}
+        self._free = list(range(capacity - 1, -1, -1))
+        self._keys = [None] * capacity
+        self._rssi = [0] * capacity
+        self._power = [0] * capacity
+        self._first = [0] * capacity
+        self._last = [0] * capacity
+        self._zone = bytearray(capacity)
+        # Zone a beacon is heading to and for how many readings in a row.
+        self._next = bytearray(capacity)
+        self._count = bytearray(capacity)
+        self._expired = utime.ticks_ms()
+        self.ingested = 0
+        self.events = 0
+
+    def __len__(self):
+        return len(self._index)
+
+    # Zone of a beacon from its smoothed RSSI. Leaving the current zone
+    # takes crossing a limit by the hysteresis margin.
+    def _zone_of(self, slot, zone=NEAR, margin=0):
+        loss = self._power[slot] - self._rssi[slot]
+        if loss < self._immediate + (margin if zone == IMMEDIATE else -margin):
+            return IMMEDIATE
+        if loss < self._near + (margin if zone != FAR else -margin):
+            return NEAR
+        return FAR
+
+    def _emit(self, event, slot):
+        self.events += 1
+        self.callback(event, self._keys[slot], self._rssi[slot] / 16, self._zone[slot])
+
+    def _remove(self, slot):
+        self._emit(EXIT, slot)
+        del self._index[self._keys[slot]]
+        self._keys[slot] = None
+        self._free.append(slot)
+
+    def ingest(self, adv, now=None):
+        """
+        Process an advertisement from ble.gap_scan(). Advertisements other than iBeacon and Eddystone-UID are
+        ignored.
+        :param adv: The advertisement, a dictionary with at least 'payload' and 'rssi'.
+        :param now: The time in ticks_ms(), the current time by default.
+        :return: The beacon key, None if adv is not from a beacon.
+        """
+        if now is None:
+            now = utime.ticks_ms()
+        if utime.ticks_diff(now, self._expired) >= 1000:
+            self.expire(now)
+        beacon = beacon_key(adv['payload'])
+        if beacon is None:
+            return None
+        key, power = beacon
+        self.ingested += 1
+        rssi = adv['rssi'] << 4
+        slot = self._index.get(key)
+        if slot is None:
+            if not self._free:
+                # Full, drop the beacon heard least recently.
+                oldest = 0
+                for i in range(1, self.capacity):
+                    if utime.ticks_diff(self._last[i], self._last[oldest]) < 0:
+                        oldest = i
+                self._remove(oldest)
+            slot = self._free.pop()
+            self._index[key] = slot
+            self._keys[slot] = key
+            self._rssi[slot] = rssi
+            self._power[slot] = power << 4
+            self._first[slot] = self._last[slot] = now
+            self._zone[slot] = self._zone_of(slot)
+            self._count[slot] = 0
+            self._emit(ENTER, slot)
+            return key
+        self._rssi[slot] += ((rssi - self._rssi[slot]) * self._alpha) >> 8
+        self._power[slot] = power << 4
+        self._last[slot] = now
+        zone = self._zone_of(slot, self._zone[slot], self._margin)
+        if zone == self._zone[slot]:
+            self._count[slot] = 0
+            return key
+        if self._count[slot] and zone == self._next[slot]:
+            self._count[slot] += 1
+        else:
+            self._next[slot] = zone
+            self._count[slot] = 1
+        if self._count[slot] >= self.confirm:
+            self._zone[slot] = zone
+            self._count[slot] = 0
+            self._emit(MOVE, slot)
+        return key
+
+    def expire(self, now=None):
+        """
+        Drop the beacons not heard for timeout ms, with an EXIT event each. Called by ingest() about every second.
+        :param now: The time in ticks_ms(), the current time by default.
+        """
+        if now is None:
+            now = utime.ticks_ms()
+        self._expired = now
+        for slot in range(self.capacity):
+            if self._keys[slot] is not None and utime.ticks_diff(now, self._last[slot]) > self.timeout:
+                self._remove(slot)
+
+    def _slot(self, key):
+        slot = self._index.get(key)
+        if slot is None:
+            raise KeyError(key)
+        return slot
+
+    def rssi(self, key) -> float:
+        """
+        Get the smoothed RSSI of a tracked beacon, in dBm.
+        """
+        return self._rssi[self._slot(key)] / 16
+
+    def distance(self, key) -> float:
+        """
+        Get the estimated distance to a tracked beacon, in meters, from its smoothed RSSI and advertised power.
+        """
+        slot = self._slot(key)
+        return 10 ** ((self._power[slot] - self._rssi[slot]) / (160 * self.path_loss))
+
+    def zone(self, key) -> int:
+        """
+        Get the proximity zone of a tracked beacon: IMMEDIATE, NEAR or FAR.
+        """
+        return self._zone[self._slot(key)]
+
+    def seen(self, key):
+        """
+        Get when a tracked beacon was first and last heard, in ticks_ms(): int, int.
+        """
+        slot = self._slot(key)
+        return self._first[slot], self._last[slot]
+
+    def beacons(self):
+        """
+        Get the keys of the tracked beacons.
+        """
+        return list(self._index)
@@ -41,6 +41,31 @@ _DEFAULT_FLAGS = 0x06
 
 _LENGTH_INDEX = 7
 
+# Largest legacy advertisement payload, and so the largest Eddystone frame.
+_MAX_FRAME_LEN = 31
+_MAX_UINT32 = 0xFFFFFFFF
+
+# The ordering of the elements in both of the following list are significant for encoding them.
+_EXTENSIONS = [
+    ".com/", ".org/", ".edu/", ".net/", ".info/", ".biz/", ".gov/",
+    ".com", ".org", ".edu", ".net", ".info", ".biz", ".gov",
+]
+
+_SCHEMES = [
+    "http://www.",
+    "https://www.",
+    "http://",
+    "https://",
+]
+
+# Extension code by extension without the slash, whose code is 7 less.
+_EXTENSION_IDS = {_EXTENSIONS[i]: i for i in range(7, len(_EXTENSIONS))}
+
+# Encoded URLs by URL, so that advertising the same URLs again doesn't
+# encode them again. Emptied when full.
+_url_cache = {}
+_URL_CACHE_SIZE = 8
+
 
 def _check_for_valid_eddystone(frame, expected_len=None):
     frame_len = len(frame)
@@ -80,37 +105,46 @@ class _EddystoneGenericFrame(object):
     """
 
     def __init__(self, eddystone_type, payload_len, data_flags):
-        self._frame = bytearray()
-        self._frame.extend(_DEFAULT_FRAME)
-        self._frame[_FLAGS_INDEX] = data_flags
-        self._frame.append(eddystone_type)  # Eddystone type
-        # Extends the frame to have payload_len number of zero bytes at the end
-        self._frame += bytearray(payload_len)
+        # The frame is written in place in a buffer of the largest frame size,
+        # _frame is a view of the part in use, cut from _view.
+        self._buf = bytearray(_MAX_FRAME_LEN)
+        self._view = memoryview(self._buf)
+        self._frame = self._view[:0]
+        self._buf[:len(_DEFAULT_FRAME)] = _DEFAULT_FRAME
+        self._buf[_FLAGS_INDEX] = data_flags
+        self._buf[11] = eddystone_type  # Eddystone type
         self._set_payload_length(payload_len)
 
     def _set_payload_length(self, length):
-        self._frame[_LENGTH_INDEX] = 4 + length  # 7th byte specifies the payload len. There are 4 bytes that are used in all frames
+        self._buf[_LENGTH_INDEX] = 4 + length  # 7th byte specifies the payload len. There are 4 bytes that are used in all frames
+        if len(self._frame) != 12 + length:
+            self._frame = self._view[:12 + length]
 
     def set_raw_payload(self, payload):
         payload_len = len(payload)
         if payload_len > 19:
             raise TypeError("The payload is too large")
 
-        # Cut off the existing payload (beyond the default frame)
-        offset = len(_DEFAULT_FRAME)
-        self._frame = self._frame[:offset + 1]
-        # Place the new payload at the end
-        self._frame.extend(payload)
+        # Place the new payload after the default frame and the type
+        self._buf[12:12 + payload_len] = payload
         self._set_payload_length(payload_len)
 
     def get_bytes(self) -> bytes:
         """
-        Get the advertisement payload. Used to send this frame.
+        Get a copy of the advertisement payload. Used to send this frame.
         """
         return bytes(self._frame)
 
+    @property
+    def frame(self) -> memoryview:
+        """
+        Get the advertisement payload without copying it, to pass to ble.gap_advertise(). The setters update it in
+        place; only a change of the URL length makes a new view.
+        """
+        return self._frame
+
     def _validate_payload(self, expected_len=None):
-        return _check_for_valid_eddystone(self._frame, expected_len)
+        return _check_for_valid_eddystone(bytes(self._frame), expected_len)
 
     def validate_payload(self):
         return self._validate_payload(None)
@@ -128,18 +162,8 @@ class EddystoneURLFrame(_EddystoneGenericFrame):
     Eddystone-URL frame broadcasts ranging data and a URL using a compressed encoding format.
     See https://github.com/google/eddystone/tree/master/eddystone-url for format details.
     """
-    # The ordering of the elements in both of the following list are significant for encoding them.
-    _EXTENSIONS = [
-        ".com/", ".org/", ".edu/", ".net/", ".info/", ".biz/", ".gov/",
-        ".com", ".org", ".edu", ".net", ".info", ".biz", ".gov",
-    ]
-
-    _SCHEMES = [
-        "http://www.",
-        "https://www.",
-        "http://",
-        "https://",
-    ]
+    _EXTENSIONS = _EXTENSIONS
+    _SCHEMES = _SCHEMES
 
     def __init__(self, ranging_data, url, data_flags=_DEFAULT_FLAGS):
         super().__init__(eddystone_type=TYPE_URL, payload_len=3, data_flags=data_flags)
@@ -158,69 +182,29 @@ class EddystoneURLFrame(_EddystoneGenericFrame):
         if ranging_data < -100 or ranging_data > 20:
             raise ValueError("ranging_data is out of range")
 
-        tx_power_byte = struct.pack('>b', ranging_data)
-        self._frame = self._frame[:12] + tx_power_byte + self._frame[13:]
-
-    def __find_scheme_id(self, input_url):
-        for i in range(len(self._SCHEMES)):
-            if input_url.startswith(self._SCHEMES[i]):
-                return i, len(self._SCHEMES[i])
-        else:
-            raise ValueError("The URL does not use a supported prefix scheme")
-
-    def __find_extension_id(self, input_url, pos):
-        # Check if this matches a supported extension
-        for ext_id in range(len(self._EXTENSIONS)):
-            extension = self._EXTENSIONS[ext_id]
-            if input_url.startswith(extension, pos):
-                return ext_id
-        return None
+        struct.pack_into('>b', self._buf, 12, ranging_data)
 
     @property
     def url(self) -> str:
         """
         Get or set the URL. Encoded internally as defined by RFC 1738.
         """
-        url = self._frame[13:]
-        if len(url) == 0:
-            return str()
-
-        if url[0] >= len(self._SCHEMES):
-            raise ValueError("Invalid URL scheme")
-
-        decoded_url = self._SCHEMES[url[0]]
-        extension_index_max = len(self._EXTENSIONS) - 1
-        for c in url[1:]:
-            if c <= extension_index_max:  # If this is one of the extensions
-                decoded_url += self._EXTENSIONS[c]
-            elif 0x21 <= c < 0x7F:
-                decoded_url += chr(c)
-            else:
-                raise ValueError("Invalid URL")
-
-        return decoded_url
+        return decode_url(self._frame[13:])
 
     @url.setter
     def url(self, input_url: str):
-        encoded_url = bytearray()
-
-        scheme_id, scheme_len = self.__find_scheme_id(input_url)
-        encoded_url.append(scheme_id)
-
-        # Start processing after the scheme
-        pos = scheme_len
-        while pos < len(input_url):
-            ext_id = self.__find_extension_id(input_url, pos)
-            if ext_id is not None:
-                encoded_url += struct.pack('>b', ext_id)
-                pos += len(self._EXTENSIONS[ext_id])
-            else:
-                # Just write the character if a shortened extension wasn't found.
-                encoded_url.append(ord(input_url[pos]))
-                pos += 1
+        encoded_url = _url_cache.get(input_url)
+        if encoded_url is None:
+            encoded_url = encode_url(input_url)
+            if len(_url_cache) >= _URL_CACHE_SIZE:
+                _url_cache.clear()
+            _url_cache[input_url] = encoded_url
+
+        if len(encoded_url) > _MAX_FRAME_LEN - 13:
+            raise ValueError("The encoded URL is too long")
 
         # Set the url into the frame
-        self._frame = self._frame[:13] + encoded_url
+        self._buf[13:13 + len(encoded_url)] = encoded_url
         # Set the length of the payload, +1 for ranging data
         self._set_payload_length(len(encoded_url) + 1)
 
@@ -250,8 +234,7 @@ class EddystoneUIDFrame(_EddystoneGenericFrame):
         if ranging_data < -100 or ranging_data > 20:
             raise ValueError("ranging_data is out of range")
 
-        ranging_data_byte = struct.pack('>b', ranging_data)
-        self._frame = self._frame[:12] + ranging_data_byte + self._frame[13:]
+        struct.pack_into('>b', self._buf, 12, ranging_data)
 
     @property
     def uid(self) -> bytes:
@@ -266,8 +249,8 @@ class EddystoneUIDFrame(_EddystoneGenericFrame):
         if len(uid) != 16:
             raise ValueError("The UID field is an incorrect size, expected 16 bytes")
 
-        # Insert UID with an extra zeroed two bytes at the end that are reserved for future use.
-        self._frame = self._frame[:13] + uid + self._frame[29:]
+        # Insert UID, the two bytes after it stay zeroed as they are reserved for future use.
+        self._buf[13:29] = uid
 
     def validate_payload(self):
         # All UUID fields are of the same length: 23 bytes
@@ -296,7 +279,7 @@ class EddystoneTLMFrame(_EddystoneGenericFrame):
         # limited to Q 8.8 fixed point range. valid range: -2^7 < temperature < 2^7 - 2^-8
         if fl < -128 or fl > 127.9961:
             raise ValueError("Out of range of representable values")
-        return struct.pack('>h', int(fl * (2 ** 8)))
+        return int(fl * 256)
 
     @staticmethod
     def __from_fixed88(fp):
@@ -319,9 +302,7 @@ class EddystoneTLMFrame(_EddystoneGenericFrame):
         if voltage & ~0xFFFF:
             raise ValueError("Voltage is out of range")
 
-        voltage_bytes = struct.pack('>H', voltage)
-
-        self._frame = self._frame[:13] + voltage_bytes + self._frame[15:]
+        struct.pack_into('>H', self._buf, 13, voltage)
 
     @property
     def beacon_temperature(self) -> float:
@@ -332,8 +313,7 @@ class EddystoneTLMFrame(_EddystoneGenericFrame):
 
     @beacon_temperature.setter
     def beacon_temperature(self, temperature: float):
-        temperature_bytes = self.__to_fixed88(temperature)
-        self._frame = self._frame[:15] + temperature_bytes + self._frame[17:]
+        struct.pack_into('>h', self._buf, 15, self.__to_fixed88(temperature))
 
     @property
     def advertisement_count(self) -> int:
@@ -344,10 +324,9 @@ class EddystoneTLMFrame(_EddystoneGenericFrame):
 
     @advertisement_count.setter
     def advertisement_count(self, count: int):
-        if count >= 1 << 32:
+        if count > _MAX_UINT32:
             raise ValueError("Advertisement count is out of range of representable values")
-        count_bytes = struct.pack('>I', count)
-        self._frame = self._frame[:17] + count_bytes + self._frame[21:]
+        struct.pack_into('>I', self._buf, 17, count)
 
     @property
     def time_sec(self) -> float:
@@ -359,10 +338,9 @@ class EddystoneTLMFrame(_EddystoneGenericFrame):
     @time_sec.setter
     def time_sec(self, time_sec: float):
         count = int(time_sec * 10)
-        if count >= 1 << 32:
+        if count > _MAX_UINT32:
             raise ValueError("Time stamp out of range")
-        count_bytes = struct.pack('>I', count)
-        self._frame = self._frame[:21] + count_bytes
+        struct.pack_into('>I', self._buf, 21, count)
 
     def validate_payload(self):
         # All TLM fields are of the same size: 17 bytes
@@ -376,7 +354,7 @@ def parse(frame: bytes):
     :return: The type of the frame and a parsed Eddystone frame of that type:
         int, (EddystoneUIDFrame or EddystoneURLFrame or EddystoneTLMFrame).
     """
-    if not _check_for_valid_eddystone(frame):
+    if eddystone_type(frame) is None:
         raise TypeError("Incoming Eddystone frame is invalid")
 
     eddy_type = struct.unpack('>b', frame[11:12])[0]
@@ -399,3 +377,138 @@ def parse(frame: bytes):
         raise TypeError("Eddystone Payload is invalid")
 
     return eddy_type, eddy_frame
+
+
+# The functions below read the fields of a raw advertisement where they are,
+# without building a frame object, for scanners that see many of them. adv
+# can be a memoryview, the slices returned are then views into it too.
+
+def eddystone_type(adv):
+    """
+    Get the type of a raw advertisement if it is a valid Eddystone frame. Other AD structures may follow the
+    Eddystone service data.
+    :param adv: The raw advertisement.
+    :return: TYPE_UID, TYPE_URL or TYPE_TLM, None if adv is not an Eddystone frame of one of these types.
+    """
+    n = len(adv)
+    if (
+        n < 14 or adv[_LENGTH_INDEX] + 8 > n or
+        adv[0] != 0x02 or adv[1] != 0x01 or adv[3] != 0x03 or adv[4] != 0x03 or adv[5] != 0xAA or adv[6] != 0xFE or
+        adv[8] != 0x16 or adv[9] != 0xAA or adv[10] != 0xFE
+    ):
+        return None
+    end = adv[_LENGTH_INDEX] + 8
+    # The lengths of the structures after it must add up to the total.
+    pos = end
+    while pos < n:
+        pos += adv[pos] + 1
+    if pos != n:
+        return None
+    eddy_type = adv[11]
+    if eddy_type == TYPE_UID:
+        # The two reserved bytes at the end are optional.
+        return eddy_type if end == 29 or end == 31 else None
+    if eddy_type == TYPE_TLM:
+        # Only unencrypted TLM (version 0) is supported.
+        return eddy_type if end == 25 and adv[12] == 0 else None
+    if eddy_type == TYPE_URL:
+        return eddy_type
+    return None
+
+
+def _signed(b):
+    return b - 256 if b > 127 else b
+
+
+def parse_uid(adv):
+    """
+    Get the fields of an Eddystone-UID advertisement, checked with eddystone_type().
+    :return: The ranging data and the 10-byte namespace and 6-byte instance slices of adv: int, bytes, bytes.
+    """
+    return _signed(adv[12]), adv[13:23], adv[23:29]
+
+
+def parse_url(adv):
+    """
+    Get the fields of an Eddystone-URL advertisement, checked with eddystone_type().
+    :return: The ranging data and the slice of adv with the encoded URL, see decode_url(): int, bytes.
+    """
+    return _signed(adv[12]), adv[13:adv[_LENGTH_INDEX] + 8]
+
+
+def parse_tlm(adv):
+    """
+    Get the fields of an Eddystone-TLM advertisement, checked with eddystone_type().
+    :return: The battery voltage in mV, the temperature in 1/256 degrees Celsius, the advertisement count and the
+        time since power-on in tenths of seconds: int, int, int, int.
+    """
+    return struct.unpack_from('>HhII', adv, 13)
+
+
+def encode_url(url):
+    """
+    Encode a URL for an Eddystone-URL frame.
+    :param url: The URL, starting with one of the supported schemes.
+    :return: The URL scheme prefix byte followed by the encoded URL: bytes.
+    """
+    for scheme_id in range(len(_SCHEMES)):
+        if url.startswith(_SCHEMES[scheme_id]):
+            break
+    else:
+        raise ValueError("The URL does not use a supported prefix scheme")
+
+    encoded_url = bytearray((scheme_id,))
+    pos = len(_SCHEMES[scheme_id])
+    end = len(url)
+    while pos < end:
+        # Extensions all start with a dot, copy everything up to the next one.
+        dot = url.find('.', pos)
+        if dot < 0:
+            dot = end
+        encoded_url.extend(url[pos:dot].encode())
+        if dot == end:
+            break
+        ext_id = _EXTENSION_IDS.get(url[dot:dot + 4])
+        if ext_id is None:
+            ext_id = _EXTENSION_IDS.get(url[dot:dot + 5])
+        if ext_id is None:
+            encoded_url.append(0x2E)
+            pos = dot + 1
+            continue
+        pos = dot + len(_EXTENSIONS[ext_id])
+        if url[pos:pos + 1] == '/':
+            ext_id -= 7
+            pos += 1
+        encoded_url.append(ext_id)
+
+    return bytes(encoded_url)
+
+
+def decode_url(encoded):
+    """
+    Decode an Eddystone-URL encoded URL, see parse_url().
+    :param encoded: The URL scheme prefix byte followed by the encoded URL.
+    :return: The URL.
+    """
+    if len(encoded) == 0:
+        return str()
+
+    if encoded[0] >= len(_SCHEMES):
+        raise ValueError("Invalid URL scheme")
+
+    # Runs of plain characters are decoded as a whole, between extensions.
+    parts = [_SCHEMES[encoded[0]]]
+    start = 1
+    for i in range(1, len(encoded)):
+        c = encoded[i]
+        if c < len(_EXTENSIONS):  # If this is one of the extensions
+            if i > start:
+                parts.append(str(bytes(encoded[start:i]), 'ascii'))
+            parts.append(_EXTENSIONS[c])
+            start = i + 1
+        elif not 0x21 <= c < 0x7F:
+            raise ValueError("Invalid URL")
+    if len(encoded) > start:
+        parts.append(str(bytes(encoded[start:]), 'ascii'))
+
+    return "".join(parts)
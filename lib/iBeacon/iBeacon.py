@@ -42,6 +42,11 @@ _MFG_SPEC_HEADER = (
 )
 
 
+# Flags data (0x06), followed by the manufacturer specific data up to the UUID.
+_FRAME_HEADER = _FLAGS_HEADER + b"\x06" + _MFG_SPEC_HEADER
+_FRAME_LEN = 30
+
+
 def _check_for_valid_proximity_beacon(frame):
 
     if len(frame) != 30:
@@ -81,18 +86,7 @@ def make_proximity_beacon(uuid: bytes, power: int, major=0x0000, minor=0x0000):
     :param minor: the minor beacon identifier used in the frame
     :return: Returns the proximity beacon frame.
     """
-    if len(uuid) != 16:
-        raise ValueError("The UID field is an incorrect size, expected 16 bytes")
-
-    frame = bytearray()
-    frame.extend(_FLAGS_HEADER)
-    frame.append(0x06)
-    frame.extend(_MFG_SPEC_HEADER)
-    frame.extend(uuid)
-    frame.extend(struct.pack('>HHB', major, minor, power))
-
-    assert _check_for_valid_proximity_beacon(frame)
-    return frame
+    return ProximityBeaconFrame(uuid, power, major, minor).get_frame()
 
 
 def is_proximity_beacon(frame: bytes):
@@ -102,3 +96,88 @@ def is_proximity_beacon(frame: bytes):
     :return: True if frame is a iBeacon proximity frame
     """
     return _check_for_valid_proximity_beacon(frame)
+
+
+class ProximityBeaconFrame(object):
+    """
+    A proximity beacon frame that is built once and then updated in place, to advertise changing major, minor or
+    power values without allocating a new frame each time.
+    """
+
+    def __init__(self, uuid: bytes, power: int, major=0x0000, minor=0x0000):
+        """
+        :param uuid: the proximity UUID used in the frame
+        :param power: the measured power used in the frame, in dBm (negative) or as its unsigned byte
+        :param major: the major beacon identifier in the frame
+        :param minor: the minor beacon identifier used in the frame
+        """
+        if len(uuid) != 16:
+            raise ValueError("The UID field is an incorrect size, expected 16 bytes")
+
+        self._buf = bytearray(_FRAME_LEN)
+        self._buf[:len(_FRAME_HEADER)] = _FRAME_HEADER
+        self._buf[9:25] = uuid
+        self._frame = memoryview(self._buf)
+        self.set(major, minor, power)
+
+    def set(self, major, minor, power=None):
+        """
+        Set the major and minor identifiers, and optionally the measured power, at once.
+        """
+        struct.pack_into('>HH', self._buf, 25, major, minor)
+        if power is not None:
+            self._buf[29] = power & 0xFF
+
+    @property
+    def frame(self) -> memoryview:
+        """
+        Get the frame without copying it, to pass to ble.gap_advertise(). The setters update it in place.
+        """
+        return self._frame
+
+    def get_frame(self) -> bytearray:
+        """
+        Get the frame buffer itself.
+        """
+        return self._buf
+
+    @property
+    def uuid(self) -> bytes:
+        """
+        Get the proximity UUID.
+        """
+        return bytes(self._buf[9:25])
+
+    @property
+    def major(self) -> int:
+        """
+        Get or set the major beacon identifier.
+        """
+        return struct.unpack_from('>H', self._buf, 25)[0]
+
+    @major.setter
+    def major(self, major: int):
+        struct.pack_into('>H', self._buf, 25, major)
+
+    @property
+    def minor(self) -> int:
+        """
+        Get or set the minor beacon identifier.
+        """
+        return struct.unpack_from('>H', self._buf, 27)[0]
+
+    @minor.setter
+    def minor(self, minor: int):
+        struct.pack_into('>H', self._buf, 27, minor)
+
+    @property
+    def power(self) -> int:
+        """
+        Get or set the measured power. Read as the unsigned byte, like parse_proximity_beacon() does; set either in
+        dBm (negative) or as the unsigned byte.
+        """
+        return self._buf[29]
+
+    @power.setter
+    def power(self, power: int):
+        self._buf[29] = power & 0xFF
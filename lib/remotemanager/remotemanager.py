@@ -10,16 +10,131 @@ Use with samples/cellular/remotemanager/rm_sample.py.
 """
 
 import ubinascii
+import ujson
+import uos
 import urequests
+import utime
 
 class AuthorizationException(Exception):
     pass
 
 STREAMS_URI = "https://remotemanager.digi.com/ws/v1/streams/"
 
+
+_UNRESERVED = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~"
+
+
+# Build a query string from keyword arguments, leaving out None values.
+# Done here rather than with urllib so that urequests stays the only
+# dependency.
+def _query(**params):
+    out = []
+    for k in params:
+        v = params[k]
+        if v is None:
+            continue
+        v = str(v).encode()
+        out.append(k + "=" + "".join(chr(c) if c in _UNRESERVED else "%%%02X" % c for c in v))
+    return "?" + "&".join(out) if out else ""
+
+
+def _datapoint(stream_id, value, timestamp=None):
+    point = {"stream_id": stream_id, "value": value}
+    if timestamp is not None:
+        point["timestamp"] = timestamp
+    return ujson.dumps(point)
+
+
+# Parse the JSON object of a response read in blocks, yielding each element
+# of its array member (the "list" of a page) as soon as it is complete. The
+# rest of the object, with that array left empty, is returned at the end.
+# Memory use depends on the size of an element, not of the response.
+def _iter_page(response, blocksize=256):
+    buf = bytearray(blocksize)
+    mv = memoryview(buf)
+    head = bytearray()
+    item = None
+    depth = 0
+    in_list = in_str = esc = False
+    while True:
+        n = response.readinto(buf)
+        if not n:
+            break
+        for c in mv[:n]:
+            if in_str:
+                if esc:
+                    esc = False
+                elif c == 0x5c:
+                    esc = True
+                elif c == 0x22:
+                    in_str = False
+            elif c == 0x22:
+                in_str = True
+            elif c == 0x7b or c == 0x5b:
+                if depth == 1 and c == 0x5b:
+                    in_list = True
+                elif depth == 2 and in_list:
+                    item = bytearray()
+                depth += 1
+            elif c == 0x7d or c == 0x5d:
+                depth -= 1
+                if depth == 1:
+                    in_list = False
+            elif c == 0x2c and depth == 2 and in_list:
+                continue
+            if item is None:
+                head.append(c)
+                continue
+            item.append(c)
+            if depth == 2:
+                yield ujson.loads(str(item, "utf-8"))
+                item = None
+    return ujson.loads(str(head, "utf-8"))
+
+
 class RemoteManagerConnection:
 
-    def __init__(self, credentials, auth_scheme="Basic"):
+    def __init__(self, credentials, auth_scheme="Basic", batch_count=20, batch_bytes=2048,
+                 batch_age=60000, stream_cache_size=8, stream_cache_ttl=600000, max_retries=3,
+                 retry_delay=1000, retry_max_delay=30000, rate_limit=0, rate_burst=5):
+        # All requests share one kept-alive HTTPS connection.
+        self.session = urequests.Session()
+        # Failed requests are retried up to max_retries times, after a
+        # jittered delay doubling from retry_delay ms up to retry_max_delay,
+        # or after the server's Retry-After. With rate_limit (requests per
+        # second), requests are spaced by a token bucket of rate_burst.
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.retry_max_delay = retry_max_delay
+        self.rate_limit = rate_limit
+        self.rate_burst = rate_burst
+        self._tokens = rate_burst
+        self._bucket_time = utime.ticks_ms()
+        # Requests retried and time (ms) spent waiting to send requests.
+        self.retries = 0
+        self.throttled_ms = 0
+        # Metadata of up to stream_cache_size streams, trusted for
+        # stream_cache_ttl ms: stream id -> (expiry ticks, metadata).
+        self.stream_cache_size = stream_cache_size
+        self.stream_cache_ttl = stream_cache_ttl
+        self._streams = {}
+        self.stream_cache_hits = 0
+        self.stream_cache_misses = 0
+        # Datapoints queued by queue_datapoint(), as JSON, sent together
+        # once any of the batch_* limits (age in ms) is reached.
+        self.batch_count = batch_count
+        self.batch_bytes = batch_bytes
+        self.batch_age = batch_age
+        self._batch = []
+        self._batch_bytes = 0
+        self._batch_time = 0
+        # Batching counters: datapoints sent in batches, the requests that
+        # took, and the requests and request bytes (estimated, headers
+        # included) that adding them one by one would have cost on top.
+        self.datapoints_sent = 0
+        self.batch_requests = 0
+        self.requests_saved = 0
+        self.bytes_saved = 0
         if not credentials:
             self.auth = None
         else:
@@ -33,6 +148,65 @@ class RemoteManagerConnection:
         else:
             raise AuthorizationException("Unsupported authorization scheme: " + auth_scheme)
 
+    def close(self):
+        self.session.close()
+
+    # Send a request, retrying it on a network error or a 429/5xx status.
+    # POST is not idempotent: it is only retried when the server says it
+    # did not handle it (429 and 503).
+    def _request(self, method, url, headers, session=None, **kw):
+        if session is None:
+            session = self.session
+        idempotent = method != "POST"
+        attempt = 0
+        while True:
+            self._take_token()
+            try:
+                response = session.request(method, url, headers=headers, **kw)
+            except OSError:
+                if not idempotent or attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+            else:
+                status = response.status_code
+                if status not in (429, 500, 502, 503, 504) or attempt >= self.max_retries or \
+                        not idempotent and status not in (429, 503):
+                    return response
+                delay = self._backoff(attempt)
+                after = response.headers.get('Retry-After')
+                if after is not None and after.isdigit():
+                    # Seconds (the HTTP date form is not supported).
+                    delay = int(after) * 1000
+                    if delay > self.retry_max_delay:
+                        return response
+                response.close()
+            attempt += 1
+            self.retries += 1
+            self._sleep(delay)
+
+    def _backoff(self, attempt):
+        delay = min(self.retry_delay << attempt, self.retry_max_delay)
+        # Random half to full delay, so devices don't retry in lockstep.
+        half = delay // 2
+        return half + int.from_bytes(uos.urandom(2), "big") % (half + 1)
+
+    def _take_token(self):
+        if not self.rate_limit:
+            return
+        now = utime.ticks_ms()
+        self._tokens = min(self.rate_burst, self._tokens +
+                           utime.ticks_diff(now, self._bucket_time) * self.rate_limit / 1000)
+        self._bucket_time = now
+        if self._tokens < 1:
+            self._sleep(int((1 - self._tokens) * 1000 / self.rate_limit) + 1)
+            self._tokens = 1
+            self._bucket_time = utime.ticks_ms()
+        self._tokens -= 1
+
+    def _sleep(self, ms):
+        utime.sleep_ms(ms)
+        self.throttled_ms += ms
+
     @staticmethod
     def check_response_code(response):
         if response.status_code not in (200, 201, 204):
@@ -48,37 +222,191 @@ class RemoteManagerConnection:
         return headers
 
     def get_datastreams(self, headers=None):
-        headers = self.set_headers(headers)
-        response = urequests.get(STREAMS_URI + "inventory.json", headers=headers)
-        self.check_response_code(response)
-        return [stream['id'] for stream in response.json()['list']]
+        return [stream['id'] for stream in self.iter_datastreams(headers=headers)]
+
+    def iter_datastreams(self, size=100, headers=None):
+        """
+        Yields the datastreams of the account, as dicts, requesting them
+        size at a time and parsing each page while it is received.
+
+        Pages come over a connection of their own, so other requests can
+        be made while iterating; that connection is closed at the end, so
+        close() the generator if not iterating to the end.
+        """
+        # Requests through self.session would otherwise reclaim the
+        # connection and drain the rest of the page being parsed.
+        session = urequests.Session()
+        cursor = None
+        try:
+            while True:
+                headers = self.set_headers(headers)
+                response = self._request("GET", STREAMS_URI + "inventory.json" + _query(size=size, cursor=cursor),
+                                         headers=headers, session=session)
+                try:
+                    self.check_response_code(response)
+                    page = yield from _iter_page(response)
+                finally:
+                    response.close()
+                cursor = page.get('cursor')
+                if not cursor or not page.get('count'):
+                    return
+        finally:
+            session.close()
 
     def get_datastream_info(self, stream_id, headers=None):
         headers = self.set_headers(headers)
-        response = urequests.get(STREAMS_URI + "inventory/" + stream_id + ".json", headers=headers)
+        response = self._request("GET", STREAMS_URI + "inventory/" + stream_id + ".json", headers=headers)
         return self.check_response_code(response)
 
     def update_datastream(self, stream_id, json, headers=None):
+        self.invalidate_stream(stream_id)
         headers = self.set_headers(headers)
-        response = urequests.put(STREAMS_URI + "inventory/" + stream_id, headers=headers, json=json)
+        response = self._request("PUT", STREAMS_URI + "inventory/" + stream_id, headers=headers, json=json)
         return self.check_response_code(response)
 
     def create_datastream(self, json, headers=None):
         headers = self.set_headers(headers)
-        response = urequests.post(STREAMS_URI + "inventory/", headers=headers, json=json)
-        return self.check_response_code(response)
+        response = self._request("POST", STREAMS_URI + "inventory/", headers=headers, json=json)
+        self.check_response_code(response)
+        if 'id' in json:
+            self._cache_stream(json['id'], json)
+        return response
 
     def delete_datastream(self, stream_id, headers=None):
+        self.invalidate_stream(stream_id)
         headers = self.set_headers(headers)
-        response = urequests.delete(STREAMS_URI + "inventory/" + stream_id, headers=headers)
+        response = self._request("DELETE", STREAMS_URI + "inventory/" + stream_id, headers=headers)
         return self.check_response_code(response)
 
+    def get_stream_metadata(self, stream_id, headers=None):
+        """
+        Returns the metadata of a datastream as a dict, or None if it does
+        not exist, from the stream cache when possible.
+        """
+        entry = self._streams.get(stream_id)
+        if entry is not None:
+            if utime.ticks_diff(entry[0], utime.ticks_ms()) > 0:
+                self.stream_cache_hits += 1
+                return entry[1]
+            del self._streams[stream_id]
+        self.stream_cache_misses += 1
+        headers = self.set_headers(headers)
+        response = self._request("GET", STREAMS_URI + "inventory/" + stream_id + ".json", headers=headers)
+        if response.status_code == 404:
+            response.close()
+            return None
+        self.check_response_code(response)
+        info = response.json()
+        self._cache_stream(stream_id, info)
+        return info
+
+    def ensure_datastream(self, json, headers=None):
+        """
+        Creates the datastream described by json unless it already exists,
+        and returns its metadata. Only a stream cache miss costs requests.
+        """
+        info = self.get_stream_metadata(json['id'], headers)
+        if info is None:
+            self.create_datastream(json, headers)
+            info = json
+        return info
+
+    def invalidate_stream(self, stream_id=None):
+        """
+        Drops a datastream, or all of them by default, from the stream cache.
+        """
+        if stream_id is None:
+            self._streams = {}
+        elif stream_id in self._streams:
+            del self._streams[stream_id]
+
+    @property
+    def stream_cache_hit_ratio(self):
+        lookups = self.stream_cache_hits + self.stream_cache_misses
+        return self.stream_cache_hits / lookups if lookups else 0
+
+    def _cache_stream(self, stream_id, info):
+        if not self.stream_cache_size:
+            return
+        if stream_id not in self._streams and len(self._streams) >= self.stream_cache_size:
+            # Full, drop the entry closest to expiry.
+            now = utime.ticks_ms()
+            oldest = None
+            for k in self._streams:
+                if oldest is None or utime.ticks_diff(self._streams[k][0], now) < \
+                        utime.ticks_diff(self._streams[oldest][0], now):
+                    oldest = k
+            del self._streams[oldest]
+        self._streams[stream_id] = (utime.ticks_add(utime.ticks_ms(), self.stream_cache_ttl), info)
+
     def add_datapoint(self, stream_id, value, headers=None):
         headers = self.set_headers(headers)
-        response = urequests.post(STREAMS_URI + "history/", headers=headers, json={"stream_id": stream_id, "value": value})
+        response = self._request("POST", STREAMS_URI + "history/", headers=headers, json={"stream_id": stream_id, "value": value})
         return self.check_response_code(response)
 
+    def add_datapoints(self, datapoints, headers=None):
+        """
+        Adds many datapoints, of any streams, in a single request.
+        datapoints holds (stream_id, value) or (stream_id, value, timestamp)
+        tuples.
+        """
+        return self._post_datapoints([_datapoint(*point) for point in datapoints], headers)
+
+    def queue_datapoint(self, stream_id, value, timestamp=None, headers=None):
+        """
+        Queues a datapoint to be added in one request with others, see
+        flush_datapoints(). Returns the response if the batch was sent.
+        """
+        point = _datapoint(stream_id, value, timestamp)
+        if not self._batch:
+            self._batch_time = utime.ticks_ms()
+        self._batch.append(point)
+        self._batch_bytes += len(point) + 1
+        return self.flush_datapoints(False, headers)
+
+    def flush_datapoints(self, force=True, headers=None):
+        """
+        Sends the queued datapoints. Unless force is set, they are only sent
+        once there are batch_count of them or batch_bytes of JSON, or the
+        oldest was queued batch_age ms ago; call it periodically to enforce
+        the age limit. Returns the response, or None if nothing was sent.
+        """
+        if not self._batch:
+            return None
+        if not (force or len(self._batch) >= self.batch_count or
+                self._batch_bytes >= self.batch_bytes or
+                utime.ticks_diff(utime.ticks_ms(), self._batch_time) >= self.batch_age):
+            return None
+        # The batch is kept if the request fails.
+        response = self._post_datapoints(self._batch, headers)
+        self._batch = []
+        self._batch_bytes = 0
+        return response
+
+    def _post_datapoints(self, points, headers):
+        headers = self.set_headers(headers)
+        headers['Content-Type'] = "application/json"
+        response = self._request("POST", STREAMS_URI + "history/", headers=headers,
+                                 data="[" + ",".join(points) + "]")
+        self.check_response_code(response)
+        n = len(points)
+        self.datapoints_sent += n
+        self.batch_requests += 1
+        self.requests_saved += n - 1
+        # Each single request repeats the request line and headers, while
+        # the batch only adds brackets and commas to the same JSON.
+        self.bytes_saved += (n - 1) * self._request_overhead(headers) - n - 1
+        return response
+
+    @staticmethod
+    def _request_overhead(headers):
+        size = len("POST /ws/v1/streams/history/ HTTP/1.1\r\n"
+                   "Host: remotemanager.digi.com\r\nContent-Length: 000\r\n\r\n")
+        for k in headers:
+            size += len(k) + len(headers[k]) + 4
+        return size
+
     def delete_datapoint(self, stream_id, start_time=None, end_time=None, headers=None):
         headers = self.set_headers(headers)
-        response = urequests.delete(STREAMS_URI + "history/" + stream_id, params={"start_time": start_time, "end_time": end_time}, headers=headers)
+        response = self._request("DELETE", STREAMS_URI + "history/" + stream_id + _query(start_time=start_time, end_time=end_time), headers=headers)
         return self.check_response_code(response)
@@ -9,6 +9,7 @@ Python Software Foundation License
 """
 
 import usocket as socket
+import utime
 
 MAXLINE = 2048
 CRLF = '\r\n'
@@ -27,10 +28,25 @@ class FTP:
     encoding = "latin-1"
 
     def __init__(self, host=None, port=21, user=None, passwd=None, acct=None,
-                 timeout=_GLOBAL_DEFAULT_TIMEOUT):
+                 timeout=_GLOBAL_DEFAULT_TIMEOUT, cache_ttl=0):
         self.host = host
         self.port = port
         self.timeout = timeout
+        # Listing/metadata cache: entries are trusted for cache_ttl ms (0
+        # disables it) and dropped whenever this session changes the server.
+        self.cache_ttl = cache_ttl
+        self._cache = {}
+        self._cwd = None
+        self._mlsd = True
+        # Control channel receive buffer; _lpos/_lend delimit unread data.
+        self._lbuf = bytearray(MAXLINE)
+        self._lpos = 0
+        self._lend = 0
+        self._login = None
+        # Resumed transfers: bytes that did not have to be transferred
+        # again, and bytes that were sent again after a failure.
+        self.bytes_resumed = 0
+        self.bytes_resent = 0
         if host:
             self.connect(host, port)
             if user:
@@ -62,9 +78,12 @@ class FTP:
         self.port = port if port else self.port
         self.timeout = timeout if timeout else self.timeout
         self.sock = self._create_connection((self.host, self.port), timeout)
+        self._lpos = self._lend = 0
+        self._cwd = None
         return self.getresp()
 
     def login(self, user='anonymous', passwd='anonymous@', acct=''):
+        self._login = (user, passwd, acct)
         resp = self.sendcmd('USER ' + user)
         if resp[0] == '3':
             resp = self.sendcmd('PASS ' + passwd)
@@ -85,29 +104,48 @@ class FTP:
         if sock is not None:
             sock.close()
 
+    # Reply lines are received in blocks into _lbuf and split there; lines
+    # longer than MAXLINE are cut.
     def getline(self):
-        line = ""
-        for i in range(MAXLINE):
-            buf = str(self.sock.recv(1), self.encoding)
-            if buf == '\r':
-                buf2 = str(self.sock.recv(1), self.encoding)
-                if buf2 == '\n':
+        buf = self._lbuf
+        p = i = self._lpos
+        while i < self._lend and buf[i] != 0x0a:
+            i += 1
+        while i == self._lend:
+            # No complete line buffered, receive another block.
+            if i == len(buf):
+                if p == 0:
                     break
-            line += buf
-        if not line:
+                buf[:i - p] = buf[p:i]
+                i -= p
+                p = 0
+                self._lend = i
+            data = self.sock.recv(len(buf) - i)
+            if not data:
+                break
+            buf[i:i + len(data)] = data
+            self._lend = i + len(data)
+            k = data.find(b'\n')
+            i = i + k if k >= 0 else self._lend
+        self._lpos = i + 1 if i < self._lend else i
+        if i > p and buf[i - 1] == 0x0d:
+            i -= 1
+        if i == p:
             raise EOFError
-        return line
+        return str(buf[p:i], self.encoding)
 
     def getmultiline(self):
         line = self.getline()
         if line[3:4] == '-':
             code = line[:3]
+            lines = [line]
             while 1:
                 nextline = self.getline()
-                line = line + ('\n' + nextline)
+                lines.append(nextline)
                 if nextline[:3] == code and \
                         nextline[3:4] != '-':
                     break
+            line = '\n'.join(lines)
         return line
 
     def getresp(self):
@@ -142,9 +180,10 @@ class FTP:
         host, port = parse227(self.sendcmd('PASV'))
         return host, port
 
-    def transfercmd(self, cmd, fp=None, callback=None, blocksize=MAXLINE, rest=None):
+    # Open a data connection and send cmd on the control connection,
+    # returning the data connection once the server has accepted it.
+    def ntransfercmd(self, cmd, rest=None):
         host, port = self.makepasv()
-        cmd_prefix = cmd[:4]
         conn = self._create_connection((host, port), self.timeout)
         try:
             if rest is not None:
@@ -155,19 +194,51 @@ class FTP:
                 resp = self.getresp()
             if resp[0] != '1':
                 raise ReplyError(resp)
-            while 1:
+        except:
+            conn.close()
+            raise
+        return conn
+
+    # If buffer is given, data is read into it with readinto() and passed
+    # on (to the data connection for STOR, to callback) as memoryview
+    # slices of it, instead of allocating a new block each time.
+    def transfercmd(self, cmd, fp=None, callback=None, blocksize=MAXLINE, rest=None,
+                    buffer=None):
+        cmd_prefix = cmd[:4]
+        if cmd_prefix in ['STOR']:
+            self.clear_cache()
+        conn = self.ntransfercmd(cmd, rest)
+        try:
+            if buffer is not None:
                 if cmd_prefix in ['STOR']:
-                    data = fp.read(blocksize)
+                    src = fp
                 elif cmd_prefix in ['LIST', 'RETR', 'NLST']:
-                    data = conn.recv(blocksize)
+                    src = conn
                 else:
                     raise ValueError('Unknown Command')
-                if not data:
-                    break
-                if cmd_prefix in ['STOR']:
-                    conn.send(data)
-                if callback:
-                    callback(data)
+                mv = memoryview(buffer)
+                while 1:
+                    n = src.readinto(buffer)
+                    if not n:
+                        break
+                    if src is fp:
+                        conn.write(mv[:n])
+                    if callback:
+                        callback(mv[:n])
+            else:
+                while 1:
+                    if cmd_prefix in ['STOR']:
+                        data = fp.read(blocksize)
+                    elif cmd_prefix in ['LIST', 'RETR', 'NLST']:
+                        data = conn.recv(blocksize)
+                    else:
+                        raise ValueError('Unknown Command')
+                    if not data:
+                        break
+                    if cmd_prefix in ['STOR']:
+                        conn.send(data)
+                    if callback:
+                        callback(data)
         except:
             conn.close()
             raise
@@ -175,6 +246,7 @@ class FTP:
         return self.voidresp()
 
     def stor(self, localname, remotename=None, **kw):
+        # Pass buffer=bytearray(n) to send the file through that buffer.
         remotename = localname if not remotename else remotename
         with open(localname, 'rb') as fp:
             return self.transfercmd('STOR ' + remotename, fp=fp, **kw)
@@ -182,9 +254,299 @@ class FTP:
     def retr(self, filename, **kw):
         return self.transfercmd('RETR ' + filename, **kw)
 
+    def retr_into(self, filename, fileobj, buffer=None, rest=None):
+        """
+        Downloads filename straight into fileobj (any object with a
+        write() method), reusing buffer (a bytearray of MAXLINE bytes if
+        not given) for every block.
+        """
+        if buffer is None:
+            buffer = bytearray(MAXLINE)
+        return self.transfercmd('RETR ' + filename, callback=fileobj.write, rest=rest,
+                                buffer=buffer)
+
+    def _reconnect(self):
+        self.close()
+        self.connect()
+        if self._login:
+            self.login(*self._login)
+            self.sendcmd("TYPE I")
+
+    def _remote_size(self, filename):
+        try:
+            return self.size(filename)
+        except PermError:
+            return 0
+
+    # Identify the remote file by its size and, if the server supports
+    # MDTM, modification time, to tell whether it changed since a partial
+    # download.
+    def _remote_id(self, filename):
+        size = self._remote_size(filename)
+        try:
+            resp = self.sendcmd('MDTM ' + filename)
+            mtime = resp[3:].strip() if resp[:3] == '213' else ''
+        except PermError:
+            mtime = ''
+        return size, '%d %s' % (size, mtime)
+
+    def retr_to_file(self, filename, localname=None, retries=3, blocksize=MAXLINE):
+        """
+        Downloads filename into localname, resuming after a failure.
+
+        Data goes to "<localname>.part", renamed to localname once
+        complete, so the bytes already on flash are the transfer progress:
+        the download restarts from them (with REST) after a dropped
+        connection, up to retries times, or when called again after a
+        reset. "<localname>.part.id" records the size and modification
+        time of the remote file; if they changed, the partial file is
+        discarded and the download starts over.
+        """
+        import uos
+        localname = localname if localname else filename
+        part = localname + '.part'
+        marker = part + '.id'
+        buffer = bytearray(blocksize)
+        attempt = 0
+        while 1:
+            try:
+                try:
+                    with open(part, 'rb') as f:
+                        offset = f.seek(0, 2)
+                except OSError:
+                    offset = 0
+                size, ident = self._remote_id(filename)
+                try:
+                    with open(marker) as f:
+                        same = f.read() == ident
+                except OSError:
+                    same = False
+                if offset and (not same or offset > size):
+                    uos.remove(part)
+                    offset = 0
+                if not same:
+                    with open(marker, 'w') as f:
+                        f.write(ident)
+                self.bytes_resumed += offset
+                with open(part, 'ab') as f:
+                    resp = self.retr_into(filename, f, buffer, offset or None)
+                break
+            except (OSError, EOFError, TempError):
+                attempt += 1
+                if attempt > retries:
+                    raise
+                self._reconnect()
+        try:
+            uos.remove(localname)
+        except OSError:
+            pass
+        uos.rename(part, localname)
+        uos.remove(marker)
+        return resp
+
+    def stor_from_file(self, localname, remotename=None, retries=3, blocksize=MAXLINE):
+        """
+        Uploads localname as remotename, resuming after a failure.
+
+        "<localname>.up" marks an upload in progress, written once the
+        server has accepted the STOR and data is flowing, so that a file
+        already on the server is never taken for a partial upload. While
+        it exists, the upload continues from the size the server reports
+        for remotename (with REST) rather than from the start, after a
+        dropped connection (up to retries times) or when called again
+        after a reset.
+        """
+        import uos
+        remotename = remotename if remotename else localname
+        marker = localname + '.up'
+        with open(localname, 'rb') as f:
+            total = f.seek(0, 2)
+        try:
+            with open(marker) as f:
+                resume = f.read() == remotename
+        except OSError:
+            resume = False
+        started = [resume]
+        buffer = bytearray(blocksize)
+        sent = [0]
+        attempt = 0
+        resp = None
+        while 1:
+            try:
+                offset = 0
+                if resume:
+                    offset = self._remote_size(remotename)
+                    if offset > total:
+                        offset = 0
+                    if sent[0] > offset:
+                        self.bytes_resent += sent[0] - offset
+                    self.bytes_resumed += offset
+                sent[0] = offset
+                if offset < total or not resume:
+                    def progress(data):
+                        if not started[0]:
+                            with open(marker, 'w') as f:
+                                f.write(remotename)
+                            started[0] = True
+                        sent[0] += len(data)
+                    with open(localname, 'rb') as fp:
+                        fp.seek(offset)
+                        resp = self.transfercmd('STOR ' + remotename, fp=fp, callback=progress,
+                                                rest=offset or None, buffer=buffer)
+                break
+            except (OSError, EOFError, TempError):
+                attempt += 1
+                if attempt > retries:
+                    raise
+                resume = started[0]
+                self._reconnect()
+        try:
+            uos.remove(marker)
+        except OSError:
+            pass
+        return resp
+
     def list(self, *args, **kw):
         return self.transfercmd(" ".join(['LIST'] + list(args)), **kw)
 
+    # Yield the lines sent on the data connection for cmd.
+    def _iterlines(self, cmd):
+        conn = self.ntransfercmd(cmd)
+        try:
+            tail = b''
+            while 1:
+                data = conn.recv(MAXLINE)
+                if not data:
+                    break
+                lines = (tail + data).split(b'\n')
+                tail = lines.pop()
+                for line in lines:
+                    if line:
+                        yield str(line.rstrip(b'\r'), self.encoding)
+            if tail.rstrip(b'\r'):
+                yield str(tail.rstrip(b'\r'), self.encoding)
+        except GeneratorExit:
+            # Stopped early: drop the data connection and read the reply
+            # to it, whatever it is, to keep the control connection in step.
+            conn.close()
+            try:
+                self.getresp()
+            except Error:
+                pass
+            raise
+        except:
+            conn.close()
+            raise
+        conn.close()
+        self.voidresp()
+
+    # Yield the entries of a listing, from the cache if possible, storing
+    # the listing there once it has been read completely.
+    def _listing(self, key, cmd, parse):
+        entries = self._cached(key)
+        if entries is not None:
+            yield from entries
+            return
+        entries = [] if self.cache_ttl and key is not None else None
+        # Generators are not finalized, close the inner one explicitly.
+        lines = self._iterlines(cmd)
+        try:
+            for line in lines:
+                entry = parse(line)
+                if entry is None:
+                    continue
+                if entries is not None:
+                    entries.append(entry)
+                yield entry
+        finally:
+            lines.close()
+        if entries is not None:
+            self._remember(key, entries)
+
+    def mlsd(self, path=''):
+        """
+        Yields (name, size, modify, type) for each entry of directory path
+        (the working directory by default) using MLSD. modify is the
+        "YYYYMMDDHHMMSS" UTC string sent by the server, size is None for
+        directories, and the "." and ".." entries are left out.
+        """
+        d = self._path(path)
+        cmd = 'MLSD ' + path if path else 'MLSD'
+
+        def parse(line):
+            entry = parse_mlsd(line)
+            if entry and entry[1] is not None and d is not None:
+                self._remember('S' + self._join(d, entry[0]), entry[1])
+            return entry
+        yield from self._listing(d and 'M' + d, cmd, parse)
+
+    def nlst(self, path=''):
+        """
+        Yields the names in directory path (the working directory by
+        default) using NLST.
+        """
+        d = self._path(path)
+        cmd = 'NLST ' + path if path else 'NLST'
+        yield from self._listing(d and 'N' + d, cmd, lambda line: line[line.rfind('/') + 1:])
+
+    def listdir(self, path=''):
+        """
+        Yields (name, size, modify, type) entries like mlsd(), falling back
+        to NLST (with None for all but name) if the server has no MLSD.
+        """
+        if self._mlsd:
+            try:
+                yield from self.mlsd(path)
+                return
+            except PermError as e:
+                if str(e)[:3] not in ['500', '501', '502', '504']:
+                    raise
+                self._mlsd = False
+        names = self.nlst(path)
+        try:
+            for name in names:
+                yield name, None, None, None
+        finally:
+            names.close()
+
+    def clear_cache(self):
+        self._cache = {}
+
+    def _cached(self, key):
+        if key is None or not self.cache_ttl:
+            return None
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        if utime.ticks_diff(entry[0], utime.ticks_ms()) > 0:
+            return entry[1]
+        del self._cache[key]
+        return None
+
+    def _remember(self, key, value):
+        if key is not None and self.cache_ttl:
+            self._cache[key] = (utime.ticks_add(utime.ticks_ms(), self.cache_ttl), value)
+
+    @staticmethod
+    def _join(d, name):
+        return d + name if d.endswith('/') else d + '/' + name
+
+    # Absolute, normalized remote path of name, or None while the working
+    # directory is unknown (before pwd() or a cwd() to an absolute path).
+    def _path(self, name):
+        if name[:1] != '/':
+            if self._cwd is None:
+                return None
+            name = self._join(self._cwd, name)
+        parts = []
+        for part in name.split('/'):
+            if part == '..':
+                if parts:
+                    parts.pop()
+            elif part and part != '.':
+                parts.append(part)
+        return '/' + '/'.join(parts)
+
     def abort(self):
         line = b'ABOR' + B_CRLF
         self.sock.send(line, 0x1)
@@ -194,12 +556,14 @@ class FTP:
         return resp
 
     def rename(self, fromname, toname):
+        self.clear_cache()
         resp = self.sendcmd('RNFR ' + fromname)
         if resp[0] != '3':
             raise ReplyError(resp)
         return self.voidcmd('RNTO ' + toname)
 
     def delete(self, filename):
+        self.clear_cache()
         resp = self.sendcmd('DELE ' + filename)
         if resp[:3] in ['250', '200']:
             return resp
@@ -207,26 +571,46 @@ class FTP:
             raise ReplyError(resp)
 
     def cwd(self, dirname):
+        path = self._path(dirname)
+        if path is not None and path == self._cwd:
+            resp = self._cached('C' + path)
+            if resp is not None:
+                return resp
         cmd = 'CWD ' + dirname if dirname != '..' else 'CDUP'
-        return self.voidcmd(cmd)
+        self._cwd = None
+        resp = self.voidcmd(cmd)
+        self._cwd = path
+        self._remember(path and 'C' + path, resp)
+        return resp
 
     def size(self, filename):
+        path = self._path(filename)
+        size = self._cached(path and 'S' + path)
+        if size is not None:
+            return size
         resp = self.sendcmd('SIZE ' + filename)
         if resp[:3] == '213':
             s = resp[3:].strip()
-            return int(s)
+            size = int(s)
+            self._remember(path and 'S' + path, size)
+            return size
         return 0
 
     def mkd(self, dirname):
+        self.clear_cache()
         resp = self.voidcmd('MKD ' + dirname)
         return parse257(resp) if resp.startswith('257') else ''
 
     def rmd(self, dirname):
+        self.clear_cache()
         return self.voidcmd('RMD ' + dirname)
 
     def pwd(self):
         resp = self.sendcmd('PWD')
-        return '' if not resp.startswith('257') else parse257(resp)
+        path = '' if not resp.startswith('257') else parse257(resp)
+        if path[:1] == '/':
+            self._cwd = path
+        return path
 
 
 def parse227(resp):
@@ -247,9 +631,34 @@ def parse227(resp):
 
     return host, port
 
+def parse_mlsd(line):
+    i = line.find(' ')
+    if i < 0:
+        return None
+    name = line[i + 1:]
+    size = modify = kind = None
+    for fact in line[:i].split(';'):
+        j = fact.find('=')
+        key = fact[:j].lower()
+        value = fact[j + 1:]
+        if key == 'type':
+            kind = value.lower()
+        elif key == 'size':
+            size = int(value)
+        elif key == 'modify':
+            modify = value[:14]
+    if kind in ['cdir', 'pdir']:
+        return None
+    return name, size, modify, kind
+
 def parse257(resp):
     if resp[3:5] != ' "':
         return ''
-    resp = resp.replace('257', '')
-    resp = resp.replace('"', '')
-    return resp.strip()
+    # The path is quoted, with any quote in it doubled.
+    i = 5
+    while 1:
+        i = resp.find('"', i)
+        if i < 0 or resp[i + 1:i + 2] != '"':
+            break
+        i += 2
+    return resp[5:i if i >= 0 else None].replace('""', '"')
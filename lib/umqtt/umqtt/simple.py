@@ -8,15 +8,24 @@ MIT License
 
 import usocket as socket
 import ustruct as struct
+import utime as time
 from ubinascii import hexlify
 
 class MQTTException(Exception):
     pass
 
+# Prefix a topic with its 2-byte length, as it goes on the wire, so it
+# can be passed to MQTTClient.publish_encoded() without re-encoding.
+def encode_topic(topic):
+    if isinstance(topic, str):
+        topic = topic.encode()
+    return struct.pack("!H", len(topic)) + topic
+
 class MQTTClient:
 
     def __init__(self, client_id, server, port=0, user=None, password=None, keepalive=0,
-                 ssl=False, ssl_params={}):
+                 ssl=False, ssl_params={}, rbuf_size=512, max_inflight=0,
+                 retry_timeout=10000, wbuf_size=128, session_file=None, store=None):
         if port == 0:
             port = 8883 if ssl else 1883
         self.client_id = client_id
@@ -34,16 +43,300 @@ class MQTTClient:
         self.lw_msg = None
         self.lw_qos = 0
         self.lw_retain = False
+        # Optional umqtt.store.MessageStore holding messages published
+        # while disconnected, until drain() sends them.
+        self.store = store
+        # Receive buffer, filled in bulk and parsed in place. _rpos/_rend
+        # delimit the unread bytes, _pkt is the offset of the body of the
+        # last non-PUBLISH packet returned by wait_msg().
+        self._rbuf = bytearray(rbuf_size)
+        self._rmv = memoryview(self._rbuf)
+        self._rpos = 0
+        self._rend = 0
+        self._pkt = 0
+        # Scratch buffer outgoing PUBLISH packets are assembled in.
+        self._wbuf = bytearray(wbuf_size)
+        # QoS 1/2 in-flight table. With max_inflight > 0, publish() returns
+        # as soon as the packet is sent and acknowledgements are matched as
+        # they arrive; otherwise it waits for its own flow to complete.
+        # Slot i holds packet id _ifl_pid[i] (0 if free), its state (1:
+        # waiting PUBACK, 2: waiting PUBREC, 3: waiting PUBCOMP), the time
+        # it was last sent and the (topic, msg, retain, encoded) to resend.
+        # _rx_pid holds ids of inbound QoS 2 messages waiting for PUBREL
+        # (0 if free), and grows when more are outstanding.
+        # If session_file is set, both are saved there on every change and
+        # restored by connect(clean_session=False).
+        n = max(max_inflight, 1)
+        self.max_inflight = max_inflight
+        self.retry_timeout = retry_timeout
+        self.session_file = session_file
+        self._inflight = 0
+        self._ifl_pid = [0] * n
+        self._ifl_state = bytearray(n)
+        self._ifl_time = [0] * n
+        self._ifl_msg = [None] * n
+        self._rx_pid = [0] * max(n, 4)
+        self._queued = False
 
     def _send_str(self, s):
-        self.sock.write(struct.pack("!H", len(s)))
+        struct.pack_into("!H", self._wbuf, 0, len(s))
+        self.sock.write(self._wbuf, 2)
         self.sock.write(s)
 
+    # Make sure at least n bytes are buffered. Whatever the socket already
+    # has pending is pulled in with a single non-blocking readinto(), and
+    # only the missing bytes are waited for. If block is False and nothing
+    # is available, returns False.
+    def _fill(self, n, block=True):
+        buf = self._rbuf
+        have = self._rend - self._rpos
+        if have >= n:
+            return True
+        assert n <= len(buf)
+        if self._rpos + n > len(buf):
+            buf[:have] = buf[self._rpos:self._rend]
+            self._rpos = 0
+            self._rend = have
+        sock = self.sock
+        while 1:
+            sock.setblocking(False)
+            try:
+                r = sock.readinto(self._rmv[self._rend:])
+            finally:
+                sock.setblocking(True)
+            if r == 0:
+                raise OSError(-1)
+            if r:
+                self._rend += r
+                have += r
+                if have >= n:
+                    return True
+            if not block:
+                return False
+            r = sock.readinto(self._rmv[self._rend:], n - have)
+            if not r:
+                raise OSError(-1)
+            self._rend += r
+            have += r
+            if have >= n:
+                return True
+
+    # Consume and return the next n bytes. Payloads bigger than the receive
+    # buffer are read straight from the socket into a new bytearray.
+    def _read(self, n):
+        if n <= len(self._rbuf):
+            self._fill(n)
+            p = self._rpos
+            self._rpos = p + n
+            return bytes(self._rmv[p:p + n])
+        have = self._rend - self._rpos
+        out = bytearray(n)
+        out[:have] = self._rmv[self._rpos:self._rend]
+        self._rpos = self._rend = 0
+        mv = memoryview(out)
+        while have < n:
+            r = self.sock.readinto(mv[have:])
+            if not r:
+                raise OSError(-1)
+            have += r
+        return out
+
+    # Skips ids still in flight, such as those restored from the session
+    # file, so that an acknowledgement can only match one flow.
+    def _next_pid(self):
+        pid = self.pid % 65535 + 1
+        while pid in self._ifl_pid:
+            pid = pid % 65535 + 1
+        self.pid = pid
+        return pid
+
+    # Encode the fixed header, topic and packet id (and msg, if it fits)
+    # into the scratch buffer and send them with a single write. With
+    # encoded=True, topic already carries its 2-byte length prefix (see
+    # encode_topic()).
+    def _send_publish(self, topic, msg, retain, qos, pid, dup=False, encoded=False):
+        buf = self._wbuf
+        if not encoded and isinstance(topic, str):
+            topic = topic.encode()
+        if isinstance(msg, str):
+            msg = msg.encode()
+        tl = len(topic)
+        sz = tl + len(msg)
+        if not encoded:
+            sz += 2
+        if qos > 0:
+            sz += 2
+        assert sz < 2097152
+        buf[0] = 0x30 | dup << 3 | qos << 1 | retain
+        i = 1
+        while sz > 0x7f:
+            buf[i] = (sz & 0x7f) | 0x80
+            sz >>= 7
+            i += 1
+        buf[i] = sz
+        i += 1
+        if i + tl + 4 > len(buf):
+            # Topic does not fit in the scratch buffer, send it on its own.
+            self.sock.write(buf, i)
+            if encoded:
+                self.sock.write(topic)
+            else:
+                self._send_str(topic)
+            i = 0
+        else:
+            if not encoded:
+                struct.pack_into("!H", buf, i, tl)
+                i += 2
+            buf[i:i + tl] = topic
+            i += tl
+        if qos > 0:
+            struct.pack_into("!H", buf, i, pid)
+            i += 2
+        n = len(msg)
+        if i + n <= len(buf):
+            buf[i:i + n] = msg
+            self.sock.write(buf, i + n)
+        else:
+            self.sock.write(buf, i)
+            self.sock.write(msg)
+
+    def _send_ack(self, op, pid):
+        struct.pack_into("!BBH", self._wbuf, 0, op, 2, pid)
+        self.sock.write(self._wbuf, 4)
+
+    # A clean session drops the flows still in flight: put back in the
+    # store the messages the broker may not have received, for drain() to
+    # send again.
+    def _requeue(self):
+        for i in range(len(self._ifl_pid)):
+            if self._ifl_pid[i] and self._ifl_msg[i]:
+                topic, msg, retain, encoded = self._ifl_msg[i]
+                self.store.append(topic[2:] if encoded else topic, msg, retain, self._ifl_state[i])
+
+    def _clear_session(self):
+        for i in range(len(self._ifl_pid)):
+            self._ifl_pid[i] = 0
+            self._ifl_msg[i] = None
+        for i in range(len(self._rx_pid)):
+            self._rx_pid[i] = 0
+        self._inflight = 0
+
+    # Session file layout: in-flight count, then per flow its pid, state,
+    # retain/encoded flags, topic and msg lengths, topic and msg; then the
+    # count and pids of inbound QoS 2 messages waiting for PUBREL.
+    def _save_session(self):
+        if not self.session_file:
+            return
+        import uos
+        tmp = self.session_file + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(struct.pack("!H", self._inflight))
+            for i in range(len(self._ifl_pid)):
+                if self._ifl_pid[i]:
+                    topic, msg, retain, encoded = self._ifl_msg[i] or (b"", b"", 0, 0)
+                    f.write(struct.pack("!HBBHI", self._ifl_pid[i], self._ifl_state[i],
+                                        retain | encoded << 1, len(topic), len(msg)))
+                    f.write(topic)
+                    f.write(msg)
+            rx = [pid for pid in self._rx_pid if pid]
+            f.write(struct.pack("!H", len(rx)))
+            for pid in rx:
+                f.write(struct.pack("!H", pid))
+        uos.replace(tmp, self.session_file)
+
+    def _load_session(self):
+        try:
+            f = open(self.session_file, "rb")
+        except OSError:
+            return
+        with f:
+            self._clear_session()
+            n = struct.unpack("!H", f.read(2))[0]
+            while len(self._ifl_pid) < n:
+                self._ifl_pid.append(0)
+                self._ifl_state.append(0)
+                self._ifl_time.append(0)
+                self._ifl_msg.append(None)
+            for i in range(n):
+                pid, state, flags, tl, ml = struct.unpack("!HBBHI", f.read(10))
+                self._ifl_pid[i] = pid
+                self._ifl_state[i] = state
+                self._ifl_msg[i] = (f.read(tl), f.read(ml), flags & 1, flags >> 1)
+            self._inflight = n
+            for i in range(struct.unpack("!H", f.read(2))[0]):
+                self._store_rx(struct.unpack("!H", f.read(2))[0])
+
+    # An id is only dropped by its PUBREL: evicting it earlier would let a
+    # redelivered PUBLISH through a second time.
+    def _store_rx(self, pid):
+        try:
+            self._rx_pid[self._rx_pid.index(0)] = pid
+        except ValueError:
+            self._rx_pid.append(pid)
+
+    # Handle a PUBACK (1), PUBREC (2) or PUBCOMP (3) for an outbound flow
+    # in the given state.
+    def _ack(self, pid, state):
+        try:
+            i = self._ifl_pid.index(pid)
+        except ValueError:
+            i = -1
+        if state == 2:
+            self._send_ack(0x62, pid)
+        if i < 0 or self._ifl_state[i] != state:
+            return
+        if state == 2:
+            # Payload is not needed anymore, only PUBREL may be resent.
+            self._ifl_state[i] = 3
+            self._ifl_time[i] = time.ticks_ms()
+            self._ifl_msg[i] = None
+        else:
+            self._ifl_pid[i] = 0
+            self._ifl_msg[i] = None
+            self._inflight -= 1
+        self._save_session()
+
+    # Resend with the DUP flag every in-flight PUBLISH (or PUBREL) that was
+    # not acknowledged within retry_timeout ms (all of them if force is
+    # set).
+    def _retransmit(self, force=False):
+        now = time.ticks_ms()
+        for i in range(len(self._ifl_pid)):
+            pid = self._ifl_pid[i]
+            if pid and (force or time.ticks_diff(now, self._ifl_time[i]) >= self.retry_timeout):
+                state = self._ifl_state[i]
+                if state == 3:
+                    self._send_ack(0x62, pid)
+                else:
+                    topic, msg, retain, encoded = self._ifl_msg[i]
+                    self._send_publish(topic, msg, retain, state, pid, True, encoded)
+                self._ifl_time[i] = now
+
+    # Process incoming packets until at most n QoS 1/2 flows are still in
+    # flight. Returns False if timeout (in ms) expires first.
+    def _wait_acks(self, n, timeout=None):
+        start = time.ticks_ms()
+        while self._inflight > n:
+            if self._fill(1, False):
+                self.wait_msg()
+                continue
+            self._retransmit()
+            if timeout is not None and time.ticks_diff(time.ticks_ms(), start) >= timeout:
+                return False
+            time.sleep_ms(10)
+        return True
+
+    def _recv_byte(self):
+        self._fill(1)
+        b = self._rbuf[self._rpos]
+        self._rpos += 1
+        return b
+
     def _recv_len(self):
         n = 0
         sh = 0
         while 1:
-            b = self.sock.read(1)[0]
+            b = self._recv_byte()
             n |= (b & 0x7f) << sh
             if not b & 0x80:
                 return n
@@ -70,6 +363,7 @@ class MQTTClient:
             import ussl
             self.sock = ussl.wrap_socket(self.sock, **self.ssl_params)
         self.sock.connect((self.server, self.port))
+        self._rpos = self._rend = 0
         premsg = bytearray(b"\x10\0\0\0\0\0")
         msg = bytearray(b"\x04MQTT\x04\x02\0\0")
 
@@ -104,59 +398,122 @@ class MQTTClient:
         if self.user is not None:
             self._send_str(self.user)
             self._send_str(self.pswd)
-        resp = self.sock.read(4)
-        assert resp[0] == 0x20 and resp[1] == 0x02
-        if resp[3] != 0:
-            raise MQTTException(resp[3])
-        return resp[2] & 1
+        self._fill(4)
+        p = self._rpos
+        self._rpos = p + 4
+        resp = self._rbuf
+        assert resp[p] == 0x20 and resp[p + 1] == 0x02
+        if resp[p + 3] != 0:
+            raise MQTTException(resp[p + 3])
+        if clean_session:
+            if self.store is not None:
+                self._requeue()
+            self._clear_session()
+            self._save_session()
+        else:
+            if not self._inflight and self.session_file:
+                self._load_session()
+            if self._inflight:
+                self._retransmit(True)
+        return resp[p + 2] & 1
 
     def disconnect(self):
         self.sock.write(b"\xe0\0")
         self.sock.close()
+        self.sock = None
 
     def ping(self):
         self.sock.write(b"\xc0\0")
 
+    # With an in-flight window (max_inflight > 0), QoS 1 and 2 publishes
+    # only block while the window is full and return the packet id; call
+    # flush() to wait for the outstanding flows to complete.
     def publish(self, topic, msg, retain=False, qos=0):
-        pkt = bytearray(b"\x30\0\0\0")
-        pkt[0] |= qos << 1 | retain
-        sz = 2 + len(topic) + len(msg)
-        if qos > 0:
-            sz += 2
-        assert sz < 2097152
-        i = 1
-        while sz > 0x7f:
-            pkt[i] = (sz & 0x7f) | 0x80
-            sz >>= 7
-            i += 1
-        pkt[i] = sz
-        #print(hex(len(pkt)), hexlify(pkt, ":"))
-        self.sock.write(pkt, i + 1)
-        self._send_str(topic)
-        if qos > 0:
-            self.pid += 1
-            pid = self.pid
-            struct.pack_into("!H", pkt, 0, pid)
-            self.sock.write(pkt, 2)
-        self.sock.write(msg)
-        if qos == 1:
-            while 1:
-                op = self.wait_msg()
-                if op == 0x40:
-                    sz = self.sock.read(1)
-                    assert sz == b"\x02"
-                    rcv_pid = self.sock.read(2)
-                    rcv_pid = rcv_pid[0] << 8 | rcv_pid[1]
-                    if pid == rcv_pid:
-                        return
-        elif qos == 2:
-            assert 0
+        return self._publish(topic, msg, retain, qos, False)
+
+    # Same as publish(), for a topic prepared once with encode_topic().
+    def publish_encoded(self, etopic, msg, retain=False, qos=0):
+        return self._publish(etopic, msg, retain, qos, True)
+
+    # With a store attached, messages published while disconnected are
+    # kept in it. If sending fails, the socket is closed and the OSError is
+    # raised so that the application can reconnect; the message is stored
+    # as well unless it already made it to the in-flight table, from which
+    # connect(clean_session=False) resends it with the same packet id and
+    # connect() moves it back to the store.
+    def _publish(self, topic, msg, retain, qos, encoded):
+        if self.store is None:
+            return self._send_msg(topic, msg, retain, qos, encoded)
+        if self.sock is not None:
+            try:
+                return self._send_msg(topic, msg, retain, qos, encoded)
+            except OSError:
+                self.sock.close()
+                self.sock = None
+                if not self._queued:
+                    self.store.append(topic[2:] if encoded else topic, msg, retain, qos)
+                raise
+        self.store.append(topic[2:] if encoded else topic, msg, retain, qos)
+
+    # Sets _queued once the message has entered the in-flight table.
+    def _send_msg(self, topic, msg, retain, qos, encoded):
+        self._queued = False
+        if qos == 0:
+            self._send_publish(topic, msg, retain, 0, 0, False, encoded)
+            return
+        assert qos <= 2
+        # Kept as bytes for resending and the session file.
+        if isinstance(topic, str):
+            topic = topic.encode()
+        if isinstance(msg, str):
+            msg = msg.encode()
+        self._wait_acks(len(self._ifl_pid) - 1)
+        pid = self._next_pid()
+        i = self._ifl_pid.index(0)
+        self._ifl_pid[i] = pid
+        self._ifl_state[i] = qos
+        self._ifl_time[i] = time.ticks_ms()
+        self._ifl_msg[i] = (topic, msg, retain, encoded)
+        self._inflight += 1
+        self._queued = True
+        self._save_session()
+        self._send_publish(topic, msg, retain, qos, pid, False, encoded)
+        if self.max_inflight:
+            return pid
+        while self._inflight:
+            self.wait_msg()
+
+    # Publish up to batch messages from the offline store, oldest first,
+    # and return how many were sent. Call after connect() until it
+    # returns 0.
+    def drain(self, batch=16):
+        n = 0
+        it = self.store.read(batch)
+        try:
+            for topic, msg, retain, qos in it:
+                try:
+                    self._send_msg(topic, msg, retain, qos, False)
+                except OSError:
+                    if self._queued:
+                        # In flight already, move the read position past
+                        # it so that it is not read and sent again.
+                        next(it, None)
+                    raise
+                n += 1
+        finally:
+            it.close()
+            self.store.commit()
+        return n
+
+    # Wait until every in-flight QoS 1/2 flow has completed,
+    # retransmitting as needed. Returns False if timeout (ms) expires.
+    def flush(self, timeout=None):
+        return self._wait_acks(0, timeout)
 
     def subscribe(self, topic, qos=0):
         assert self.cb is not None, "Subscribe callback is not set"
         pkt = bytearray(b"\x82\0\0\0")
-        self.pid += 1
-        struct.pack_into("!BH", pkt, 1, 2 + 2 + len(topic) + 1, self.pid)
+        struct.pack_into("!BH", pkt, 1, 2 + 2 + len(topic) + 1, self._next_pid())
         #print(hex(len(pkt)), hexlify(pkt, ":"))
         self.sock.write(pkt)
         self._send_str(topic)
@@ -164,52 +521,77 @@ class MQTTClient:
         while 1:
             op = self.wait_msg()
             if op == 0x90:
-                resp = self.sock.read(4)
-                #print(resp)
-                assert resp[1] == pkt[2] and resp[2] == pkt[3]
-                if resp[3] == 0x80:
-                    raise MQTTException(resp[3])
+                p = self._pkt
+                resp = self._rbuf
+                assert resp[p] == pkt[2] and resp[p + 1] == pkt[3]
+                if resp[p + 2] == 0x80:
+                    raise MQTTException(resp[p + 2])
                 return
 
     # Wait for a single incoming MQTT message and process it.
     # Subscribed messages are delivered to a callback previously
     # set by .set_callback() method. Other (internal) MQTT
-    # messages processed internally.
+    # messages processed internally. For those, the packet body is
+    # left in the receive buffer at offset self._pkt.
     def wait_msg(self):
-        res = self.sock.read(1)
-        self.sock.setblocking(True)
-        if res is None:
-            return None
-        if res == b"":
-            raise OSError(-1)
-        if res == b"\xd0":  # PINGRESP
-            sz = self.sock.read(1)[0]
+        op = self._recv_byte()
+        sz = self._recv_len()
+        if op == 0xd0:  # PINGRESP
             assert sz == 0
             return None
-        op = res[0]
         if op & 0xf0 != 0x30:
+            self._fill(sz)
+            p = self._pkt = self._rpos
+            self._rpos += sz
+            if 0x40 <= op <= 0x70 and sz == 2:
+                pid = self._rbuf[p] << 8 | self._rbuf[p + 1]
+                if op == 0x40:  # PUBACK
+                    self._ack(pid, 1)
+                elif op == 0x50:  # PUBREC
+                    self._ack(pid, 2)
+                elif op == 0x70:  # PUBCOMP
+                    self._ack(pid, 3)
+                elif op == 0x62:  # PUBREL
+                    try:
+                        self._rx_pid[self._rx_pid.index(pid)] = 0
+                        self._save_session()
+                    except ValueError:
+                        pass
+                    self._send_ack(0x70, pid)
             return op
-        sz = self._recv_len()
-        topic_len = self.sock.read(2)
-        topic_len = (topic_len[0] << 8) | topic_len[1]
-        topic = self.sock.read(topic_len)
+        buf = self._rbuf
+        self._fill(2)
+        p = self._rpos
+        topic_len = (buf[p] << 8) | buf[p + 1]
+        self._rpos = p + 2
+        topic = self._read(topic_len)
         sz -= topic_len + 2
         if op & 6:
-            pid = self.sock.read(2)
-            pid = pid[0] << 8 | pid[1]
+            self._fill(2)
+            p = self._rpos
+            pid = buf[p] << 8 | buf[p + 1]
+            self._rpos = p + 2
             sz -= 2
-        msg = self.sock.read(sz)
+        msg = self._read(sz)
+        if op & 6 == 4:
+            # QoS 2: deliver only the first copy, until the PUBREL.
+            if pid not in self._rx_pid:
+                self.cb(topic, msg)
+                self._store_rx(pid)
+                self._save_session()
+            self._send_ack(0x50, pid)
+            return
         self.cb(topic, msg)
         if op & 6 == 2:
-            pkt = bytearray(b"\x40\x02\0\0")
-            struct.pack_into("!H", pkt, 2, pid)
-            self.sock.write(pkt)
-        elif op & 6 == 4:
-            assert 0
+            self._send_ack(0x40, pid)
 
     # Checks whether a pending message from server is available.
     # If not, returns immediately with None. Otherwise, does
-    # the same processing as wait_msg.
+    # the same processing as wait_msg. In-flight messages due for
+    # retransmission are resent first.
     def check_msg(self):
-        self.sock.setblocking(False)
+        if self._inflight:
+            self._retransmit()
+        if not self._fill(1, False):
+            return None
         return self.wait_msg()
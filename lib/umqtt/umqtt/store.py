@@ -0,0 +1,182 @@
+"""
+Copyright (c) 2026, Digi International, Inc.
+Module released under MIT License.
+
+Offline store-and-forward queue for umqtt.simple.MQTTClient.
+
+Messages are appended to a ring of segment files on the flash file system
+(<path>.<n>). Each record is framed with a magic byte, its lengths and a
+CRC32, so a record torn by a reset is detected and skipped instead of
+corrupting the rest of the log. Files are only ever appended to: when the
+ring is full the oldest segment is deleted, and the read position lives in
+its own 8-byte file (<path>.pos), rewritten once per drained batch.
+"""
+
+import uos
+import ustruct as struct
+from ubinascii import crc32
+
+_MAGIC = 0xA5
+_HDR = "!BBHHI"
+_HDR_SIZE = 10
+
+
+class MessageStore:
+
+    def __init__(self, path, max_size=32768, segments=4):
+        self.path = path
+        self.seg_size = max_size // segments
+        self.segments = segments
+        # Counters: messages appended and sent, segments evicted, payload
+        # bytes appended and bytes actually written to flash (framing and
+        # position updates included).
+        self.appended = 0
+        self.drained = 0
+        self.evicted = 0
+        self.payload_bytes = 0
+        self.flash_bytes = 0
+        i = path.rfind("/")
+        base = path[i + 1:] + "."
+        seqs = []
+        for name in uos.listdir(path[:i] if i > 0 else ("/" if i == 0 else ".")):
+            if name.startswith(base) and name[len(base):].isdigit():
+                seqs.append(int(name[len(base):]))
+        seqs.sort()
+        self._first = seqs[0] if seqs else 0
+        self._last = seqs[-1] if seqs else 0
+        self._wsize = 0
+        if seqs:
+            self._wsize = self._scan(self._last)
+            with open(self._seg(self._last), "rb") as f:
+                end = f.seek(0, 2)
+            if self._wsize != end:
+                # Torn tail, don't append after it.
+                self._last += 1
+                self._wsize = 0
+        self._rseq = self._first
+        self._roff = 0
+        try:
+            with open(path + ".pos", "rb") as f:
+                pos = f.read(8)
+            if len(pos) == 8:
+                self._rseq, self._roff = struct.unpack("!II", pos)
+        except OSError:
+            pass
+        if self._rseq < self._first:
+            self._rseq = self._first
+            self._roff = 0
+
+    def _seg(self, seq):
+        return "%s.%d" % (self.path, seq)
+
+    # Return the next valid record in f and its size, or None at the end
+    # of the segment or on a damaged record.
+    @staticmethod
+    def _next(f):
+        hdr = f.read(_HDR_SIZE)
+        if len(hdr) < _HDR_SIZE:
+            return None
+        magic, flags, tl, ml, crc = struct.unpack(_HDR, hdr)
+        if magic != _MAGIC:
+            return None
+        topic = f.read(tl)
+        msg = f.read(ml)
+        if len(topic) < tl or len(msg) < ml or crc32(msg, crc32(topic)) & 0xffffffff != crc:
+            return None
+        return topic, msg, flags & 1, flags >> 1, _HDR_SIZE + tl + ml
+
+    # Size of the valid data at the start of a segment.
+    def _scan(self, seq):
+        off = 0
+        with open(self._seg(seq), "rb") as f:
+            while 1:
+                rec = self._next(f)
+                if rec is None:
+                    return off
+                off += rec[4]
+
+    def _remove(self, seq):
+        try:
+            uos.remove(self._seg(seq))
+        except OSError:
+            pass
+
+    def _evict(self):
+        self._remove(self._first)
+        if self._rseq <= self._first:
+            self._rseq = self._first + 1
+            self._roff = 0
+        self._first += 1
+        self.evicted += 1
+
+    def empty(self):
+        return self._rseq >= self._last and self._roff >= self._wsize
+
+    def append(self, topic, msg, retain=False, qos=0):
+        if isinstance(topic, str):
+            topic = topic.encode()
+        if isinstance(msg, str):
+            msg = msg.encode()
+        n = _HDR_SIZE + len(topic) + len(msg)
+        if self._wsize and self._wsize + n > self.seg_size:
+            self._last += 1
+            self._wsize = 0
+            while self._last - self._first >= self.segments:
+                self._evict()
+        with open(self._seg(self._last), "ab") as f:
+            f.write(struct.pack(_HDR, _MAGIC, retain | qos << 1, len(topic), len(msg),
+                                crc32(msg, crc32(topic)) & 0xffffffff))
+            f.write(topic)
+            f.write(msg)
+        self._wsize += n
+        self.appended += 1
+        self.payload_bytes += len(topic) + len(msg)
+        self.flash_bytes += n
+
+    # Yield up to count stored (topic, msg, retain, qos), oldest first. The
+    # read position only moves past a message once the next one is asked
+    # for, so a message whose publish raised is read again later. Call
+    # commit() to make the new position persistent.
+    def read(self, count=-1):
+        f = None
+        try:
+            while count and not self.empty():
+                if f is None:
+                    try:
+                        f = open(self._seg(self._rseq), "rb")
+                        f.seek(self._roff)
+                    except OSError:
+                        f = None
+                rec = self._next(f) if f else None
+                if rec is None:
+                    if self._rseq >= self._last:
+                        break
+                    if f:
+                        f.close()
+                        f = None
+                    self._rseq += 1
+                    self._roff = 0
+                    continue
+                yield rec[0], rec[1], rec[2], rec[3]
+                self._roff += rec[4]
+                self.drained += 1
+                count -= 1
+        finally:
+            if f:
+                f.close()
+
+    def commit(self):
+        if self.empty():
+            # Everything was sent, start over with an empty ring.
+            for seq in range(self._first, self._last + 1):
+                self._remove(seq)
+            self._last += 1
+            self._first = self._rseq = self._last
+            self._roff = 0
+            self._wsize = 0
+        while self._first < self._rseq:
+            self._remove(self._first)
+            self._first += 1
+        with open(self.path + ".pos", "wb") as f:
+            f.write(struct.pack("!II", self._rseq, self._roff))
+        self.flash_bytes += 8
@@ -16,49 +16,372 @@ NOTE: Due to the extremely small amount of memory available for use on the
       so as to not run out of memory.
       When this functionality is used, the content and text values on
       the Response class are not longer valid.
+
+NOTE: data may also be a file object or an iterable of str/bytes pieces
+      (such as iter_json()), in which case the body is streamed through a
+      small fixed buffer with "Transfer-Encoding: chunked", or as is if a
+      "Content-Length" header is given.
+
+NOTE: A Session keeps HTTP/1.1 connections open per (scheme, host, port)
+      and reuses them for the following requests to the same server,
+      saving a TCP connection and, for https, a TLS handshake each time.
+
+NOTE: Redirects are followed, up to max_redirects hops. GET responses
+      carrying an ETag or Last-Modified header can be kept in a
+      ResponseCache on the file system; the next GET of the same URL is
+      then made conditional and a 304 answer is served from the cache.
+
+NOTE: params (a dict or a sequence of pairs) are added to the query string
+      of the URL, encoded with urllib.parse.iter_urlencode(); lib/urllib
+      must be installed to use them.
 """
 
 import usocket
+import ustruct
+
+# Size of the buffer streamed request bodies are sent through.
+BODY_BUFFER_SIZE = 512
+# Initial size of the buffer response headers are read into. It is grown
+# if the headers do not fit.
+HEADER_BUFFER_SIZE = 1024
+
+_GENERATOR = type((lambda: (yield))())
+
+
+def iter_json(obj):
+    """
+    Yields the JSON encoding of obj piece by piece, so that big dicts and
+    lists can be sent as a streamed request body (data=iter_json(obj))
+    without building the whole document in memory. Generators are encoded
+    as lists.
+    """
+    import ujson
+    if isinstance(obj, dict):
+        yield "{"
+        sep = ""
+        for k in obj:
+            yield sep
+            yield ujson.dumps(k)
+            yield ":"
+            yield from iter_json(obj[k])
+            sep = ","
+        yield "}"
+    elif isinstance(obj, (list, tuple, _GENERATOR)):
+        yield "["
+        sep = ""
+        for v in obj:
+            yield sep
+            yield from iter_json(v)
+            sep = ","
+        yield "]"
+    else:
+        yield ujson.dumps(obj)
+
+
+class Headers:
+    """
+    Read-only, case-insensitive mapping of the response headers.
+    """
+
+    def __init__(self, d):
+        self._d = d
+
+    def __getitem__(self, name):
+        return self._d[name.lower()]
+
+    def __contains__(self, name):
+        return name.lower() in self._d
+
+    def __iter__(self):
+        return iter(self._d)
+
+    def __len__(self):
+        return len(self._d)
+
+    def get(self, name, default=None):
+        return self._d.get(name.lower(), default)
+
+    def items(self):
+        return self._d.items()
+
+
+# True if the header line at buf[i:e] has the given (lowercase) name.
+def _is_header(buf, i, e, name):
+    if e - i <= len(name):
+        return False
+    for c in name:
+        if buf[i] | 0x20 != c:
+            return False
+        i += 1
+    return buf[i] == 0x3a
+
+
+# True if buf[i:e] contains the given lowercase word, ignoring case.
+def _has_word(buf, i, e, word):
+    n = len(word)
+    while i + n <= e:
+        j = 0
+        while j < n and buf[i + j] | 0x20 == word[j]:
+            j += 1
+        if j == n:
+            return True
+        i += 1
+    return False
+
+
+def _int(buf, i, e):
+    n = 0
+    for i in range(i, e):
+        c = buf[i]
+        if 0x30 <= c <= 0x39:
+            n = n * 10 + c - 0x30
+    return n
+
+
+def _int_value(buf, i, e):
+    while i < e and buf[i] != 0x3a:
+        i += 1
+    return _int(buf, i + 1, e)
+
 
 class Response:
 
-    def __init__(self, f, chunked_response):
+    # length is the body size from Content-Length, None if unknown. If
+    # session is given, the connection is handed back to it once the body
+    # has been read completely, unless keep_alive is False.
+    def __init__(self, f, chunked_response=False, length=None, session=None,
+                 key=None, keep_alive=False):
         self.raw = f
         self.encoding = "utf-8"
         self._cached = None
         self._chunked_response = chunked_response
         self._chunk_size = 0
+        self._length = length
+        self._session = session
+        self._key = key
+        self._keep_alive = keep_alive and (chunked_response or length is not None)
+        # Header block and any body bytes read along with it: the header
+        # lines are _buf[_hstart:_hend], the unread body bytes
+        # _buf[_pos:_end].
+        self._buf = None
+        self._hstart = self._hend = self._pos = self._end = 0
+        self._headers = None
+
+    # Read the status line and headers into a single buffer, reading from
+    # the socket as much as is available each time, and pick the framing
+    # headers straight from it. Raises OSError if the connection was
+    # closed before a status line arrived.
+    def _recv_head(self, method):
+        s = self.raw
+        buf = bytearray(HEADER_BUFFER_SIZE)
+        mv = memoryview(buf)
+        end = pos = i = 0
+        status_end = -1
+        keep_alive = False
+        chunked = False
+        length = None
+        while True:
+            while i < end and buf[i] != 0x0a:
+                i += 1
+            if i == end:
+                if end == len(buf):
+                    nbuf = bytearray(2 * len(buf))
+                    nbuf[:end] = buf
+                    buf = nbuf
+                    mv = memoryview(buf)
+                s.setblocking(False)
+                try:
+                    n = s.readinto(mv[end:])
+                finally:
+                    s.setblocking(True)
+                if n is None:
+                    n = s.readinto(mv[end:end + 1])
+                if not n:
+                    if status_end < 0:
+                        raise OSError(-1)
+                    break
+                end += n
+                continue
+            e = i - 1 if i > pos and buf[i - 1] == 0x0d else i
+            if status_end < 0:
+                # Status line: HTTP/1.x <status> <reason>
+                status_end = i + 1
+                keep_alive = _has_word(buf, pos, e, b"http/1.1")
+                j = pos
+                while j < e and buf[j] != 0x20:
+                    j += 1
+                self.status_code = status = _int(buf, j + 1, min(j + 4, e))
+                self.reason = bytes(mv[j + 5:e]) if j + 5 < e else ""
+            elif e == pos:
+                # Empty line, end of headers.
+                i += 1
+                break
+            elif _is_header(buf, pos, e, b"transfer-encoding"):
+                chunked = _has_word(buf, pos, e, b"chunked")
+            elif _is_header(buf, pos, e, b"content-length"):
+                length = _int_value(buf, pos, e)
+            elif _is_header(buf, pos, e, b"connection"):
+                keep_alive = not _has_word(buf, pos, e, b"close")
+            i += 1
+            pos = i
+        if method == "HEAD" or status in (204, 304) or 100 <= status <= 199:
+            chunked = False
+            length = 0
+        self._buf = buf
+        self._hstart = status_end
+        self._hend = pos
+        self._pos = i
+        self._end = end
+        self._chunked_response = chunked
+        self._length = length
+        self._keep_alive = keep_alive and (chunked or length is not None)
+
+    @property
+    def headers(self):
+        if self._headers is None:
+            d = {}
+            buf = self._buf
+            i = self._hstart
+            while i < self._hend:
+                j = i
+                while buf[j] != 0x0a:
+                    j += 1
+                line = str(bytes(buf[i:j]), "utf-8")
+                k = line.find(":")
+                if k > 0:
+                    d[line[:k].strip().lower()] = line[k + 1:].strip()
+                i = j + 1
+            self._headers = Headers(d)
+        return self._headers
+
+    # Socket access for the body, serving first the bytes read along with
+    # the headers.
+    def _raw_read(self, n=-1):
+        p = self._pos
+        k = self._end - p
+        if k <= 0:
+            return self.raw.read(n) if n >= 0 else self.raw.read()
+        if 0 <= n <= k:
+            self._pos = p + n
+            return bytes(self._buf[p:p + n])
+        self._pos = self._end
+        data = bytes(self._buf[p:self._end])
+        if n < 0:
+            return data + self.raw.read()
+        return data + self.raw.read(n - k)
+
+    def _raw_readline(self):
+        buf = self._buf
+        p = i = self._pos
+        while i < self._end:
+            if buf[i] == 0x0a:
+                self._pos = i + 1
+                return bytes(buf[p:i + 1])
+            i += 1
+        if p < self._end:
+            self._pos = self._end
+            return bytes(buf[p:self._end]) + self.raw.readline()
+        return self.raw.readline()
+
+    def _raw_readinto(self, mv):
+        n = min(self._end - self._pos, len(mv))
+        if n > 0:
+            mv[:n] = memoryview(self._buf)[self._pos:self._pos + n]
+            self._pos += n
+        else:
+            n = 0
+        if n < len(mv):
+            n += self.raw.readinto(mv[n:]) or 0
+        return n
 
     def close(self):
         if self.raw:
+            if self._session is not None and self._keep_alive:
+                # Drain the unread body so the connection can be reused.
+                try:
+                    while self.read(512):
+                        pass
+                except OSError:
+                    self._keep_alive = False
+            if self.raw:
+                self.raw.close()
+                self.raw = None
+        self._cached = None
+
+    # Body fully read: give the connection back to the session or close it.
+    def _done(self):
+        if self._session is not None and self._keep_alive:
+            self._session._release(self._key, self.raw)
+            self.raw = None
+        else:
             self.raw.close()
             self.raw = None
-        self._cached = None
+
+    # Move to the next chunk of a chunked body. Returns False at the end.
+    def _next_chunk(self):
+        l = self._raw_readline()
+        #print("chunk line:", l)
+        if l == b"":
+            return False
+        l = l.split(b";", 1)[0]
+        self._chunk_size = int(l, 16)
+        #print("chunk size:", self._chunk_size)
+        if self._chunk_size == 0:
+            # End of message
+            sep = self._raw_read(2)
+            assert sep == b"\r\n"
+            self._done()
+            return False
+        return True
+
+    def _end_chunk(self):
+        if self._chunk_size == 0:
+            sep = self._raw_read(2)
+            assert sep == b"\r\n"
 
     def read(self, sz=16 * 1024):
+        if not self.raw:
+            return b""
         if self._chunked_response:
-            if self._chunk_size == 0:
-                l = self.raw.readline()
-                #print("chunk line:", l)
-                if l == b"":
-                    return b""
-                l = l.split(b";", 1)[0]
-                self._chunk_size = int(l, 16)
-                #print("chunk size:", self._chunk_size)
-                if self._chunk_size == 0:
-                    # End of message
-                    sep = self.raw.read(2)
-                    assert sep == b"\r\n"
-                    return b""
-            data = self.raw.read(min(sz, self._chunk_size))
+            if self._chunk_size == 0 and not self._next_chunk():
+                return b""
+            data = self._raw_read(min(sz, self._chunk_size))
             self._chunk_size -= len(data)
-            if self._chunk_size == 0:
-                sep = self.raw.read(2)
-                assert sep == b"\r\n"
+            self._end_chunk()
+        elif self._length is not None:
+            data = self._raw_read(min(sz, self._length)) if self._length else b""
+            self._length -= len(data)
+            if self._length == 0:
+                self._done()
+            elif not data:
+                raise OSError(-1)
         else:
-            data = self.raw.read(sz)
+            data = self._raw_read(sz)
         return data
 
+    # Read up to len(buf) bytes of the body straight into buf. Returns the
+    # number of bytes read, 0 at the end of the body.
+    def readinto(self, buf):
+        if not self.raw:
+            return 0
+        mv = memoryview(buf)
+        if self._chunked_response:
+            if self._chunk_size == 0 and not self._next_chunk():
+                return 0
+            n = self._raw_readinto(mv[:min(len(mv), self._chunk_size)])
+            self._chunk_size -= n
+            self._end_chunk()
+        elif self._length is not None:
+            n = self._raw_readinto(mv[:min(len(mv), self._length)]) if self._length else 0
+            self._length -= n
+            if self._length == 0:
+                self._done()
+            elif not n:
+                raise OSError(-1)
+        else:
+            n = self._raw_readinto(mv)
+        return n
+
     @property
     def content(self):
         if self._cached is None:
@@ -72,11 +395,18 @@ class Response:
                             self._cached = data
                         else:
                             self._cached += data
+                elif self._length is not None:
+                    self._cached = self.read(self._length)
+                    if self._length:
+                        # Connection closed before the end of the body.
+                        raise OSError(-1)
                 else:
-                    self._cached = self.raw.read()
+                    self._cached = self._raw_read()
             finally:
-                self.raw.close()
-                self.raw = None
+                if self.raw:
+                    self._keep_alive = False
+                    self.raw.close()
+                    self.raw = None
         return self._cached
 
     @property
@@ -88,8 +418,7 @@ class Response:
         return ujson.loads(self.content)
 
 
-def request(method, url, data=None, json=None, headers={}, stream=None,
-            verify=None, cert=None, request_1_1=False):
+def _split_url(url):
     try:
         scheme, _, host, path = url.split("/", 3)
     except ValueError:
@@ -97,18 +426,23 @@ def request(method, url, data=None, json=None, headers={}, stream=None,
         path = ""
     if scheme == "http:":
         port = 80
-        proto = usocket.IPPROTO_TCP
     elif scheme == "https:":
-        import ussl
         port = 443
-        proto = usocket.IPPROTO_SEC
     else:
         raise ValueError("Unsupported scheme: " + scheme)
 
     if ":" in host:
         host, port = host.split(":", 1)
         port = int(port)
+    return scheme, host, port, path
+
 
+def _connect(scheme, host, port, verify, cert):
+    if scheme == "https:":
+        import ussl
+        proto = usocket.IPPROTO_SEC
+    else:
+        proto = usocket.IPPROTO_TCP
     s = usocket.socket(usocket.AF_INET, usocket.SOCK_STREAM, proto)
     try:
         if proto == usocket.IPPROTO_SEC:
@@ -120,58 +454,472 @@ def request(method, url, data=None, json=None, headers={}, stream=None,
                 wrap_params['ca_certs'] = verify
             s = ussl.wrap_socket(s, **wrap_params)
         s.connect((host, port))
-        if request_1_1:
-            s.write(b"%s /%s HTTP/1.1\r\n" % (method, path))
-        else:
-            s.write(b"%s /%s HTTP/1.0\r\n" % (method, path))
-        if not "Host" in headers:
-            s.write(b"Host: %s\r\n" % host)
-        s.write(b"Connection: close\r\n")
-        # Iterate over keys to avoid tuple alloc
-        for k in headers:
-            s.write(k)
-            s.write(b": ")
-            s.write(headers[k])
-            s.write(b"\r\n")
-        if json is not None:
-            assert data is None
-            import ujson
-            data = ujson.dumps(json)
-            s.write(b"Content-Type: application/json\r\n")
-        if data:
-            s.write(b"Content-Length: %d\r\n" % len(data))
+    except OSError:
+        s.close()
+        raise
+    return s
+
+
+def _is_stream(data):
+    return data is not None and not isinstance(data, (str, bytes, bytearray, memoryview))
+
+
+def _write_chunk(s, mv, n, chunked):
+    if chunked:
+        s.write(b"%x\r\n" % n)
+    s.write(mv[:n])
+    if chunked:
         s.write(b"\r\n")
-        if data:
-            s.write(data)
-
-        l = s.readline()
-        #print(l)
-        l = l.split(None, 2)
-        status = int(l[1])
-        reason = ""
-        if len(l) > 2:
-            reason = l[2].rstrip()
-        chunked = False
+
+
+# Send a file object or an iterable of pieces through a fixed buffer.
+def _send_stream(s, data, chunked):
+    buf = bytearray(BODY_BUFFER_SIZE)
+    mv = memoryview(buf)
+    if hasattr(data, "readinto"):
         while True:
-            l = s.readline()
-            if not l or l == b"\r\n":
+            n = data.readinto(buf)
+            if not n:
+                break
+            _write_chunk(s, mv, n, chunked)
+    else:
+        n = 0
+        for piece in data:
+            if isinstance(piece, str):
+                piece = piece.encode()
+            piece = memoryview(piece)
+            i = 0
+            while i < len(piece):
+                k = min(len(buf) - n, len(piece) - i)
+                buf[n:n + k] = piece[i:i + k]
+                n += k
+                i += k
+                if n == len(buf):
+                    _write_chunk(s, mv, n, chunked)
+                    n = 0
+        if n:
+            _write_chunk(s, mv, n, chunked)
+    if chunked:
+        s.write(b"0\r\n\r\n")
+
+
+def _send(s, method, host, path, data, json, headers, request_1_1, keep_alive):
+    stream = _is_stream(data)
+    chunked = stream and not "Content-Length" in headers
+    if request_1_1 or chunked:
+        s.write(b"%s /%s HTTP/1.1\r\n" % (method, path))
+    else:
+        s.write(b"%s /%s HTTP/1.0\r\n" % (method, path))
+    if not "Host" in headers:
+        s.write(b"Host: %s\r\n" % host)
+    if not keep_alive:
+        s.write(b"Connection: close\r\n")
+    # Iterate over keys to avoid tuple alloc
+    for k in headers:
+        s.write(k)
+        s.write(b": ")
+        s.write(headers[k])
+        s.write(b"\r\n")
+    if json is not None:
+        assert data is None
+        import ujson
+        data = ujson.dumps(json)
+        s.write(b"Content-Type: application/json\r\n")
+    if chunked:
+        s.write(b"Transfer-Encoding: chunked\r\n")
+    elif data and not stream:
+        s.write(b"Content-Length: %d\r\n" % len(data))
+    s.write(b"\r\n")
+    if stream:
+        _send_stream(s, data, chunked)
+    elif data:
+        s.write(data)
+
+
+def _join_url(base, location):
+    if "://" in location:
+        return location
+    i = base.find("/", base.find("//") + 2)
+    if i < 0:
+        base += "/"
+        i = len(base) - 1
+    if location.startswith("/"):
+        return base[:i] + location
+    return base[:base.rfind("/") + 1] + location
+
+
+# Headers that must not follow a redirect to another origin, and the cache
+# validators, which only apply to the URL they were looked up for.
+_ORIGIN_HEADERS = ("authorization", "proxy-authorization", "cookie", "host")
+_VALIDATOR_HEADERS = ("if-none-match", "if-modified-since")
+
+
+def _drop_headers(headers, names):
+    out = {}
+    for k in headers:
+        name = k.decode() if isinstance(k, bytes) else k
+        if name.lower() not in names:
+            out[k] = headers[k]
+    return out
+
+
+# Add params to the query string of url, leaving out None values.
+def _add_params(url, params):
+    from urllib.parse import iter_urlencode
+    if hasattr(params, "items"):
+        params = params.items()
+    params = [(k, v) for k, v in params if v is not None]
+    if not params:
+        return url
+    return url + ("&" if "?" in url else "?") + "".join(iter_urlencode(params))
+
+
+# Issue a request through send(method, url, data, json, headers),
+# following redirects and going through the cache, if any.
+def _fetch(send, method, url, data, json, headers, allow_redirects,
+           max_redirects, cache):
+    entry = None
+    key = url
+    if cache is not None and method == "GET":
+        entry = cache._lookup(key)
+        if entry is not None:
+            headers = dict(headers)
+            if entry[1]:
+                headers["If-None-Match"] = entry[1]
+            if entry[2]:
+                headers["If-Modified-Since"] = entry[2]
+    hops = 0
+    while True:
+        resp = send(method, url, data, json, headers)
+        if not allow_redirects or resp.status_code not in (301, 302, 303, 307, 308):
+            break
+        location = resp.headers.get("location")
+        if location is None:
+            break
+        target = _join_url(url, location)
+        origin = _split_url(url)[:3]
+        target_origin = _split_url(target)[:3]
+        if origin[0] == "https:" and target_origin[0] != "https:":
+            # Never downgrade to plain text, hand back the redirect.
+            break
+        if resp.status_code in (307, 308):
+            # Method and body are kept, which a stream does not allow.
+            if _is_stream(data):
                 break
-            #print(l)
-            if l.startswith(b"Transfer-Encoding:"):
-                if b"chunked" in l:
-                    chunked = True
-            elif l.startswith(b"Location:") and not 200 <= status <= 299:
-                raise NotImplementedError("Redirects not yet supported")
+        elif method != "HEAD":
+            method = "GET"
+            data = json = None
+        resp.close()
+        hops += 1
+        if hops > max_redirects:
+            raise RuntimeError("Too many redirects")
+        if target_origin != origin:
+            headers = _drop_headers(headers, _ORIGIN_HEADERS + _VALIDATOR_HEADERS)
+        elif entry is not None:
+            headers = _drop_headers(headers, _VALIDATOR_HEADERS)
+        url = target
+    if cache is not None and method == "GET":
+        if resp.status_code == 304 and entry is not None:
+            resp.close()
+            cache.hits += 1
+            return cache._response(entry)
+        if resp.status_code == 200:
+            cache.misses += 1
+            return cache._store(key, resp)
+    return resp
+
+
+def _request(method, url, data, json, headers, verify, cert, request_1_1):
+    scheme, host, port, path = _split_url(url)
+    s = _connect(scheme, host, port, verify, cert)
+    try:
+        _send(s, method, host, path, data, json, headers, request_1_1, False)
+        resp = Response(s)
+        resp._recv_head(method)
     except OSError:
         s.close()
         raise
-
-    resp = Response(s, chunked)
-    resp.status_code = status
-    resp.reason = reason
     return resp
 
 
+def request(method, url, data=None, json=None, headers={}, stream=None,
+            verify=None, cert=None, request_1_1=False, allow_redirects=True,
+            max_redirects=5, cache=None, params=None):
+    if params:
+        url = _add_params(url, params)
+    send = lambda method, url, data, json, headers: _request(
+        method, url, data, json, headers, verify, cert, request_1_1)
+    return _fetch(send, method, url, data, json, headers, allow_redirects,
+                  max_redirects, cache)
+
+
+# The unread part of the body of resp, as a stream.
+class _Rest:
+
+    def __init__(self, resp):
+        self.resp = resp
+
+    def read(self, n=-1):
+        if n < 0:
+            return self.resp.content or b""
+        return self.resp.read(n)
+
+    def readinto(self, buf):
+        return self.resp.readinto(buf)
+
+    def close(self):
+        self.resp.close()
+
+
+class ResponseCache:
+    """
+    Keeps the body of GET responses that carry an ETag or Last-Modified
+    header in a directory of the file system, one file per URL, up to
+    max_size bytes in total. Least recently used entries are evicted
+    first.
+    """
+
+    def __init__(self, directory, max_size=16 * 1024):
+        import uos
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        # File name -> [size, last use].
+        self._index = {}
+        self._size = 0
+        self._tick = 0
+        try:
+            uos.mkdir(directory)
+        except OSError:
+            pass
+        for name in uos.listdir(directory):
+            path = self._path(name)
+            if name.endswith(".tmp"):
+                uos.remove(path)
+                continue
+            with open(path, "rb") as f:
+                size = f.seek(0, 2)
+            self._index[name] = [size, 0]
+            self._size += size
+
+    def _path(self, name):
+        return self.directory + "/" + name
+
+    @staticmethod
+    def _name(url):
+        import ubinascii
+        return "%08x" % (ubinascii.crc32(url.encode()) & 0xffffffff)
+
+    def _remove(self, name):
+        import uos
+        size = self._index.pop(name)[0]
+        self._size -= size
+        try:
+            uos.remove(self._path(name))
+        except OSError:
+            pass
+
+    # Entry layout: url, ETag and Last-Modified lengths (3 x 16 bits),
+    # those three strings and the body.
+    def _lookup(self, url):
+        name = self._name(url)
+        if name not in self._index:
+            return None
+        try:
+            with open(self._path(name), "rb") as f:
+                ul, el, ll = ustruct.unpack("!HHH", f.read(6))
+                if f.read(ul) != url.encode():
+                    return None
+                etag = str(f.read(el), "utf-8")
+                last_modified = str(f.read(ll), "utf-8")
+        except (OSError, ValueError):
+            self._remove(name)
+            return None
+        self._tick += 1
+        self._index[name][1] = self._tick
+        return name, etag, last_modified, 6 + ul + el + ll
+
+    def _response(self, entry):
+        name, etag, last_modified, offset = entry
+        f = open(self._path(name), "rb")
+        f.seek(offset)
+        resp = Response(f, False, self._index[name][0] - offset)
+        resp.status_code = 200
+        resp.reason = b"OK"
+        h = {}
+        if etag:
+            h["etag"] = etag
+        if last_modified:
+            h["last-modified"] = last_modified
+        resp._headers = Headers(h)
+        return resp
+
+    def _store(self, url, resp):
+        import uos
+        etag = resp.headers.get("etag")
+        last_modified = resp.headers.get("last-modified")
+        if not etag and not last_modified:
+            return resp
+        if resp._length is not None and resp._length > self.max_size:
+            return resp
+        name = self._name(url)
+        if name in self._index:
+            self._remove(name)
+        url = url.encode()
+        etag = (etag or "").encode()
+        last_modified = (last_modified or "").encode()
+        tmp = self._path(name + ".tmp")
+        try:
+            with open(tmp, "wb") as f:
+                f.write(ustruct.pack("!HHH", len(url), len(etag), len(last_modified)))
+                f.write(url)
+                f.write(etag)
+                f.write(last_modified)
+                size = offset = 6 + len(url) + len(etag) + len(last_modified)
+                buf = bytearray(BODY_BUFFER_SIZE)
+                mv = memoryview(buf)
+                while size <= self.max_size:
+                    n = resp.readinto(buf)
+                    if not n:
+                        break
+                    f.write(mv[:n])
+                    size += n
+            if size > self.max_size:
+                # Chunked or of unknown length, and too big after all:
+                # serve what was written, then the rest of the body.
+                with open(tmp, "rb") as f:
+                    f.seek(offset)
+                    head = f.read()
+                uos.remove(tmp)
+                out = Response(_Rest(resp))
+                out.status_code = resp.status_code
+                out.reason = resp.reason
+                out._headers = resp.headers
+                out._buf = head
+                out._end = len(head)
+                return out
+            uos.rename(tmp, self._path(name))
+        except:
+            resp.close()
+            try:
+                uos.remove(tmp)
+            except OSError:
+                pass
+            raise
+        self._tick += 1
+        self._index[name] = [size, self._tick]
+        self._size += size
+        # Make room for the new entry, at most max_size bytes itself.
+        while self._size > self.max_size and len(self._index) > 1:
+            lru = None
+            for n in self._index:
+                if n != name and (lru is None or self._index[n][1] < self._index[lru][1]):
+                    lru = n
+            self._remove(lru)
+        return self._response((name, str(etag, "utf-8"), str(last_modified, "utf-8"),
+                               offset))
+
+
+class Session:
+    """
+    Keeps one HTTP/1.1 connection open per (scheme, host, port) and reuses
+    it for the following requests. The connection is handed back once the
+    response body has been read completely or the response is closed; a
+    new request to the same server closes (draining its body) the previous
+    response if that was not done yet. Requests over a connection the
+    server has dropped meanwhile are retried once over a new one.
+    """
+
+    def __init__(self, verify=None, cert=None, cache=None):
+        self.verify = verify
+        self.cert = cert
+        self.cache = cache
+        self._pool = {}
+        self._active = {}
+        # Connections opened and requests served over a reused one.
+        self.connections = 0
+        self.reused = 0
+
+    def _release(self, key, s):
+        self._active.pop(key, None)
+        old = self._pool.get(key)
+        if old is not None:
+            old.close()
+        self._pool[key] = s
+
+    @property
+    def reuse_rate(self):
+        total = self.connections + self.reused
+        return self.reused / total if total else 0.0
+
+    def close(self):
+        active = self._active
+        self._active = {}
+        for resp in active.values():
+            resp.close()
+        for s in self._pool.values():
+            s.close()
+        self._pool = {}
+
+    def request(self, method, url, data=None, json=None, headers={}, stream=None,
+                allow_redirects=True, max_redirects=5, params=None):
+        if params:
+            url = _add_params(url, params)
+        return _fetch(self._request, method, url, data, json, headers,
+                      allow_redirects, max_redirects, self.cache)
+
+    def _request(self, method, url, data, json, headers):
+        scheme, host, port, path = _split_url(url)
+        key = (scheme, host, port)
+        prev = self._active.pop(key, None)
+        if prev is not None and prev.raw:
+            prev.close()
+        s = self._pool.pop(key, None)
+        while True:
+            reused = s is not None
+            if not reused:
+                s = _connect(scheme, host, port, self.verify, self.cert)
+                self.connections += 1
+            try:
+                _send(s, method, host, path, data, json, headers, True, True)
+                resp = Response(s, session=self, key=key)
+                resp._recv_head(method)
+                break
+            except OSError:
+                s.close()
+                s = None
+                # A streamed body cannot be sent again.
+                if not reused or _is_stream(data):
+                    raise
+        if reused:
+            self.reused += 1
+
+        if resp._length == 0:
+            resp._done()
+        else:
+            self._active[key] = resp
+        return resp
+
+    def head(self, url, **kw):
+        return self.request("HEAD", url, **kw)
+
+    def get(self, url, **kw):
+        return self.request("GET", url, **kw)
+
+    def post(self, url, **kw):
+        return self.request("POST", url, **kw)
+
+    def put(self, url, **kw):
+        return self.request("PUT", url, **kw)
+
+    def patch(self, url, **kw):
+        return self.request("PATCH", url, **kw)
+
+    def delete(self, url, **kw):
+        return self.request("DELETE", url, **kw)
+
+
 def head(url, **kw):
     return request("HEAD", url, **kw)
 
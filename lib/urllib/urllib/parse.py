@@ -11,6 +11,7 @@ _ALWAYS_SAFE = frozenset(b'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
                          b'0123456789'
                          b'_.-~')
 _ALWAYS_SAFE_BYTES = bytes(_ALWAYS_SAFE)
+# Quoting tables by safe set, see _quote_table().
 _safe_quoters = {}
 
 
@@ -36,7 +37,14 @@ class Quoter(dict):
         return res
 
     def __getitem__(self, item):
-        return self.get(item, self.__missing__(item))
+        res = self.get(item)
+        return res if res is not None else self.__missing__(item)
+
+
+def _quote_table(safe):
+    # The percent-encoded form of each byte value, None for safe bytes.
+    safe = _ALWAYS_SAFE.union(safe)
+    return tuple(None if b in safe else '%{:02X}'.format(b) for b in range(256))
 
 
 def quote_plus(string, safe='', encoding=None, errors=None):
@@ -123,13 +131,34 @@ def quote_from_bytes(bs, safe='/'):
     if not bs.rstrip(_ALWAYS_SAFE_BYTES + safe):
         return bs.decode()
     try:
-        quoter = _safe_quoters[safe]
+        table = _safe_quoters[safe]
     except KeyError:
-        _safe_quoters[safe] = quoter = Quoter(safe).__getitem__
-    return ''.join([quoter(char) for char in bs])
+        _safe_quoters[safe] = table = _quote_table(safe)
+    # Runs of safe bytes are copied as a whole.
+    res = []
+    start = 0
+    for i in range(len(bs)):
+        quoted = table[bs[i]]
+        if quoted is not None:
+            if i > start:
+                res.append(bs[start:i].decode())
+            res.append(quoted)
+            start = i + 1
+    if start < len(bs):
+        res.append(bs[start:].decode())
+    return ''.join(res)
 
 
 def urlencode(query, doseq=False, safe='', encoding=None, errors=None, quote_via=quote_plus):
+    return ''.join(iter_urlencode(query, doseq, safe, encoding, errors, quote_via))
+
+
+def iter_urlencode(query, doseq=False, safe='', encoding=None, errors=None, quote_via=quote_plus):
+    """Like urlencode(), but yields the encoded string one "name=value"
+    piece at a time (each but the first prefixed with "&"), so that it can
+    be written to a socket, or sent as a streamed urequests body, without
+    building it first.
+    """
     if hasattr(query, "items"):
         query = query.items()
     else:
@@ -147,7 +176,7 @@ def urlencode(query, doseq=False, safe='', encoding=None, errors=None, quote_via
             ##ty, va, tb = sys.exc_info()
             ##raise TypeError("not a valid non-string sequence "
                             ##"or mapping object").with_traceback(tb)
-    l = []
+    sep = ''
     for k, v in query:
         if isinstance(k, bytes):
             k = quote_via(k, safe)
@@ -155,10 +184,10 @@ def urlencode(query, doseq=False, safe='', encoding=None, errors=None, quote_via
             k = quote_via(str(k), safe, encoding, errors)
         if isinstance(v, bytes):
             v = quote_via(v, safe)
-            l.append(k + '=' + v)
+            yield sep + k + '=' + v
         elif isinstance(v, str):
             v = quote_via(v, safe, encoding, errors)
-            l.append(k + '=' + v)
+            yield sep + k + '=' + v
         else:
             try:
                 # Is this a sufficient test for sequence-ness?
@@ -166,7 +195,7 @@ def urlencode(query, doseq=False, safe='', encoding=None, errors=None, quote_via
             except TypeError:
                 # not a sequence
                 v = quote_via(str(v), safe, encoding, errors)
-                l.append(k + '=' + v)
+                yield sep + k + '=' + v
             else:
                 # loop over the sequence
                 for elt in v:
@@ -174,5 +203,155 @@ def urlencode(query, doseq=False, safe='', encoding=None, errors=None, quote_via
                         elt = quote_via(elt, safe)
                     else:
                         elt = quote_via(str(elt), safe, encoding, errors)
-                    l.append(k + '=' + elt)
-    return '&'.join(l)
+                    yield sep + k + '=' + elt
+                    sep = '&'
+                continue
+        sep = '&'
+
+
+def _hex_value(c):
+    # Value of the hex digit byte c, -1 if it is not one.
+    if 0x30 <= c <= 0x39:
+        return c - 0x30
+    c |= 0x20
+    if 0x61 <= c <= 0x66:
+        return c - 0x57
+    return -1
+
+
+def unquote_to_bytes(string):
+    """unquote_to_bytes('abc%20def') -> b'abc def'.
+    string may be a str or a bytes-like object. Invalid escapes are kept
+    as they are.
+    """
+    if isinstance(string, str):
+        string = string.encode('utf-8')
+    i = string.find(b'%')
+    if i < 0:
+        return bytes(string)
+    # Copy the runs between escapes as a whole, from a view of the input.
+    mv = memoryview(string)
+    n = len(string)
+    res = bytearray()
+    start = 0
+    while i >= 0:
+        res.extend(mv[start:i])
+        hi = _hex_value(string[i + 1]) if i + 2 < n else -1
+        lo = _hex_value(string[i + 2]) if hi >= 0 else -1
+        if lo >= 0:
+            res.append(hi << 4 | lo)
+            start = i + 3
+        else:
+            res.append(0x25)
+            start = i + 1
+        i = string.find(b'%', start)
+    res.extend(mv[start:])
+    return bytes(res)
+
+
+def unquote(string, encoding='utf-8', errors='replace'):
+    """Replace %xx escapes by their single-character equivalent. The
+    optional encoding and errors parameters specify how to decode
+    percent-encoded sequences into Unicode characters, as accepted by the
+    bytes.decode() method.
+    unquote('abc%20def') -> 'abc def'.
+    """
+    if '%' not in string:
+        return string
+    return unquote_to_bytes(string).decode(encoding, errors)
+
+
+def _iter_qsl(qs, keep_blank_values, encoding, errors):
+    if isinstance(qs, str):
+        qs = qs.encode('utf-8')
+    elif not isinstance(qs, (bytes, bytearray)):
+        qs = bytes(qs)
+    n = len(qs)
+    start = 0
+    while start < n:
+        end = qs.find(b'&', start)
+        if end < 0:
+            end = n
+        eq = qs.find(b'=', start, end)
+        if eq < 0:
+            eq = end
+        if end > start and (keep_blank_values or end > eq + 1):
+            name = unquote_to_bytes(qs[start:eq].replace(b'+', b' '))
+            value = unquote_to_bytes(qs[eq + 1:end].replace(b'+', b' '))
+            yield name.decode(encoding, errors), value.decode(encoding, errors)
+        start = end + 1
+
+
+def parse_qsl(qs, keep_blank_values=False, encoding='utf-8', errors='replace'):
+    """Parse a query string (str or bytes-like, such as a request body),
+    returning a list of (name, value) str pairs in order. Fields with an
+    empty value are left out unless keep_blank_values is true.
+    """
+    return list(_iter_qsl(qs, keep_blank_values, encoding, errors))
+
+
+def parse_qs(qs, keep_blank_values=False, encoding='utf-8', errors='replace'):
+    """Parse a query string like parse_qsl(), returning a dict of lists
+    of values by name.
+    """
+    parsed = {}
+    for name, value in _iter_qsl(qs, keep_blank_values, encoding, errors):
+        if name in parsed:
+            parsed[name].append(value)
+        else:
+            parsed[name] = [value]
+    return parsed
+
+
+def urlsplit(url, scheme='', allow_fragments=True):
+    """Split a URL into 5 components:
+    <scheme>://<netloc>/<path>?<query>#<fragment>
+    Return a (scheme, netloc, path, query, fragment) tuple of str. The
+    delimiters are removed, except for the "/" starting the path. scheme
+    is the default scheme if the URL has none.
+    """
+    i = url.find(':')
+    if i > 0 and url[0].isalpha():
+        for c in url[1:i]:
+            if not (c.isalpha() or c.isdigit() or c in '+-.'):
+                break
+        else:
+            scheme = url[:i].lower()
+            url = url[i + 1:]
+    netloc = query = fragment = ''
+    if url[:2] == '//':
+        end = len(url)
+        for c in '/?#':
+            i = url.find(c, 2)
+            if 0 <= i < end:
+                end = i
+        netloc = url[2:end]
+        url = url[end:]
+    if allow_fragments:
+        i = url.find('#')
+        if i >= 0:
+            fragment = url[i + 1:]
+            url = url[:i]
+    i = url.find('?')
+    if i >= 0:
+        query = url[i + 1:]
+        url = url[:i]
+    return scheme, netloc, url, query, fragment
+
+
+def urlunsplit(components):
+    """Combine the elements of a tuple as returned by urlsplit() into a
+    complete URL.
+    """
+    scheme, netloc, url, query, fragment = components
+    if netloc:
+        if url and url[:1] != '/':
+            url = '/' + url
+        url = '//' + netloc + url
+    if scheme:
+        url = scheme + ':' + url
+    if query:
+        url = url + '?' + query
+    if fragment:
+        url = url + '#' + fragment
+    return url
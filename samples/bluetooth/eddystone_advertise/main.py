@@ -66,6 +66,11 @@ uid = os.urandom(16)
 # The TLM frame advertises the beacon's battery voltage if available. It is set to 0 if unavailable.
 battery_voltage = 0
 
+# The frames are created once and updated in place.
+tlm_frame = EddystoneTLMFrame(advertisement_count=0, time_sec=0, battery_voltage=battery_voltage)
+uid_frame = EddystoneUIDFrame(ranging_data=calibrated_ranging_data, uid=uid)
+url_frame = EddystoneURLFrame(ranging_data=calibrated_ranging_data, url=url)
+
 while True:
     time_alive = time.ticks_diff(time.ticks_ms(), start_time) / 1000
     beacon_temperature = xbee.atcmd('TP')
@@ -75,21 +80,19 @@ while True:
     # If the %V command is supported (XBee 3 LTE-M) the following line can be uncommented.
     # battery_voltage = xbee.atcmd('%V') / 1000
 
-    frame = EddystoneTLMFrame(
-        battery_voltage=battery_voltage, beacon_temperature=beacon_temperature,
-        advertisement_count=count, time_sec=time_alive
-    )
+    tlm_frame.battery_voltage = battery_voltage
+    tlm_frame.beacon_temperature = beacon_temperature
+    tlm_frame.advertisement_count = count
+    tlm_frame.time_sec = time_alive
     print("Advertising TLM with timestamp: {}seconds\tbattery voltage: {}V\t" \
           "beacon temperature: {}*C\tadvertisement count: {}\n"
           .format(time_alive, battery_voltage, beacon_temperature, count))
-    count += advertise_payload_for(frame.get_bytes(), TIME_BETWEEN_BEACON_TYPES_SEC, ADVERTISE_INTERVAL_USEC)
+    count += advertise_payload_for(tlm_frame.frame, TIME_BETWEEN_BEACON_TYPES_SEC, ADVERTISE_INTERVAL_USEC)
 
-    frame = EddystoneUIDFrame(ranging_data=calibrated_ranging_data, uid=uid)
     print("Advertising UID with UID: {}\tranging data {}dBm\n"
           .format(binascii.hexlify(uid), calibrated_ranging_data))
-    count += advertise_payload_for(frame.get_bytes(), TIME_BETWEEN_BEACON_TYPES_SEC, ADVERTISE_INTERVAL_USEC)
+    count += advertise_payload_for(uid_frame.frame, TIME_BETWEEN_BEACON_TYPES_SEC, ADVERTISE_INTERVAL_USEC)
 
-    frame = EddystoneURLFrame(ranging_data=calibrated_ranging_data, url=url)
     print("Advertising URL with URL: {}\tranging data: {}dBm\n"
           .format(url, calibrated_ranging_data))
-    count += advertise_payload_for(frame.get_bytes(), TIME_BETWEEN_BEACON_TYPES_SEC, ADVERTISE_INTERVAL_USEC)
+    count += advertise_payload_for(url_frame.frame, TIME_BETWEEN_BEACON_TYPES_SEC, ADVERTISE_INTERVAL_USEC)
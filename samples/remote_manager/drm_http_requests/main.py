@@ -35,23 +35,22 @@ STREAM_UNITS = "Celsius"
 
 def create_datastream(id, description, type, units=""):
     """
-    Creates a datastream in Digi Remote Manager.
+    Creates a datastream in Digi Remote Manager, unless it already exists.
 
     :param id: The identifier of the datastream to create.
     :param description: The description of the datastream.
     :param type: Data type of the datastream.
     :param units: The units of the datastream.
 
-    :return: `True` if the datastream is created successfully, `False`
-        otherwise.
+    :return: `True` if the datastream exists or is created successfully,
+        `False` otherwise.
     """
     stream_info = {"description": description,
                    "id": id,
                    "type": type,
                    "units": units}
     try:
-        response = rm.create_datastream(stream_info)
-        return response is not None
+        return rm.ensure_datastream(stream_info) is not None
     except OSError:
         return False
 
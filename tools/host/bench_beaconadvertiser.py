@@ -0,0 +1,88 @@
+# Copyright (c) 2026, Digi International, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+beaconadvertiser benchmark: iBeacon major/minor updates in place against
+building a new frame, and the cost of a rotation for growing frame sets.
+
+    python tools/host/bench_beaconadvertiser.py
+"""
+
+import time
+
+import hostenv  # noqa: F401
+import iBeacon
+import EddystoneBeacon as eddystone
+from beaconadvertiser import RotatingAdvertiser
+
+UUID = bytes(range(16))
+
+
+class _NullBLE:
+
+    def gap_advertise(self, interval_us, adv_data=None):
+        pass
+
+
+# Building the frame on every change, as the advertise samples did.
+def _build(uuid, power, major, minor):
+    frame = bytearray(b"\x02\x01\x06\x1a\xff\x4c\x00\x02\x15")
+    frame.extend(uuid)
+    frame.extend(major.to_bytes(2, "big"))
+    frame.extend(minor.to_bytes(2, "big"))
+    frame.extend(bytes((power & 0xff,)))
+    iBeacon.is_proximity_beacon(bytes(frame))
+    return frame
+
+
+def bench_updates(count=100000):
+    beacon = iBeacon.ProximityBeaconFrame(UUID, -59)
+    print("%d iBeacon major/minor changes:" % count)
+    start = time.monotonic()
+    for i in range(count):
+        _build(UUID, -59, i & 0xffff, i >> 16)
+    print("  build    %8.0f/s" % (count / (time.monotonic() - start)))
+    start = time.monotonic()
+    for i in range(count):
+        beacon.set(i & 0xffff, i >> 16)
+    print("  in place %8.0f/s" % (count / (time.monotonic() - start)))
+
+
+def bench_rotation(count=100000, sizes=(2, 8, 32)):
+    print("%d rotations:" % count)
+    for n in sizes:
+        frames = []
+        for i in range(n):
+            if i % 2:
+                frames.append(eddystone.EddystoneTLMFrame(i, i))
+            else:
+                frames.append(iBeacon.ProximityBeaconFrame(UUID, -59, i, i))
+        adv = RotatingAdvertiser(frames, dwell=1, ble=_NullBLE())
+        adv.start(now=0)
+        start = time.monotonic()
+        for t in range(1, count + 1):
+            adv.poll(now=t)
+        elapsed = time.monotonic() - start
+        print("  %2d frames %6.2f us/rotation" % (n, elapsed / adv.rotations * 1e6))
+
+
+if __name__ == "__main__":
+    bench_updates()
+    bench_rotation()
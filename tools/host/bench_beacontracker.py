@@ -0,0 +1,66 @@
+# Copyright (c) 2026, Digi International, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+beacontracker benchmark: ingest rate and events reported on a synthetic
+scan of beacons at fixed distances with noisy RSSI, among other adverts.
+
+    python tools/host/bench_beacontracker.py
+"""
+
+import random
+import time
+
+import hostenv  # noqa: F401
+from beacontracker import BeaconTracker
+
+_PREFIX = bytes.fromhex("0201061AFF4C000215") + bytes(range(16))
+_OTHER = bytes.fromhex("0201060DFF06000109200200") + bytes(10)
+
+
+def _scan(count, beacons, seed=1):
+    rnd = random.Random(seed)
+    rssi = [rnd.randint(-90, -50) for i in range(beacons)]
+    payloads = [_PREFIX + bytes((i >> 8, i & 0xff, 0, 1, 0xc5)) for i in range(beacons)]
+    scan = []
+    for t in range(count):
+        if rnd.random() < 0.3:
+            scan.append(({"payload": _OTHER, "rssi": -70}, t * 5))
+        else:
+            i = rnd.randrange(beacons)
+            scan.append(({"payload": payloads[i], "rssi": rssi[i] + rnd.randint(-6, 6)}, t * 5))
+    return scan
+
+
+def bench_ingest(count=50000, beacons=(16, 64), capacity=32):
+    for n in beacons:
+        scan = _scan(count, n)
+        events = []
+        tracker = BeaconTracker(lambda *args: events.append(args), capacity=capacity)
+        start = time.monotonic()
+        for adv, now in scan:
+            tracker.ingest(adv, now)
+        elapsed = time.monotonic() - start
+        print("%d adverts from %d beacons, capacity %d: %8.0f adverts/s  %d events" % (
+            count, n, capacity, count / elapsed, len(events)))
+
+
+if __name__ == "__main__":
+    bench_ingest()
@@ -0,0 +1,181 @@
+# Copyright (c) 2026, Digi International, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+EddystoneBeacon benchmarks: TLM updates, against the setters that rebuilt
+the frame by concatenation before, and scanning a corpus of adverts with
+parse() against eddystone_type() and the parse_* functions, and URL
+encoding and decoding against the character at a time code used before.
+CPython grows a str in place on +=, which MicroPython cannot, so the
+decoding figures favour the old code here.
+
+    python tools/host/bench_eddystone.py
+"""
+
+import random
+import struct
+import time
+
+import hostenv  # noqa: F401
+import EddystoneBeacon as eddystone
+
+
+class _SlicingTLMFrame(eddystone.EddystoneTLMFrame):
+
+    # The TLM count setters before frames were written in place.
+    @property
+    def advertisement_count(self):
+        return struct.unpack('>I', self._frame[17:21])[0]
+
+    @advertisement_count.setter
+    def advertisement_count(self, count):
+        self._frame = bytearray(self._frame[:17]) + struct.pack('>I', count) + self._frame[21:]
+
+    @property
+    def time_sec(self):
+        return struct.unpack('>I', self._frame[21:25])[0] / 10.0
+
+    @time_sec.setter
+    def time_sec(self, time_sec):
+        self._frame = bytearray(self._frame[:21]) + struct.pack('>I', int(time_sec * 10))
+
+
+def bench_tlm(count=50000):
+    print("%d TLM updates (count and time):" % count)
+    for name, cls in (("concatenate", _SlicingTLMFrame), ("in place", eddystone.EddystoneTLMFrame)):
+        tlm = cls(0, 0)
+        start = time.monotonic()
+        for i in range(count):
+            tlm.advertisement_count = i
+            tlm.time_sec = i
+        elapsed = time.monotonic() - start
+        # Frame buffers made by an update.
+        frame = tlm.frame
+        tlm.advertisement_count = 1
+        made = tlm.frame is not frame
+        frame = tlm.frame
+        tlm.time_sec = 1
+        made += tlm.frame is not frame
+        print("  %-11s %8.0f updates/s  %d frame buffers/update" % (name, count / elapsed, made))
+
+
+# Adverts a gateway could see: Eddystone frames of each type, some with a
+# local name after them, and iBeacons.
+def _corpus(count, seed=1):
+    rnd = random.Random(seed)
+    kinds = [
+        lambda: eddystone.EddystoneUIDFrame(-20, bytes(rnd.getrandbits(8) for i in range(16))).get_bytes(),
+        lambda: eddystone.EddystoneURLFrame(-10, rnd.choice(["https://www.digi.com/", "http://goo.gl/x1z"])).get_bytes(),
+        lambda: eddystone.EddystoneTLMFrame(rnd.getrandbits(20), rnd.getrandbits(16), 22.5, 3.1).get_bytes(),
+        lambda: eddystone.EddystoneTLMFrame(rnd.getrandbits(20), 1.0).get_bytes() + b"\x05\x09XB3a",
+        lambda: bytes.fromhex("0201061AFF4C000215") + bytes(rnd.getrandbits(8) for i in range(21)),
+    ]
+    return [rnd.choice(kinds)() for i in range(count)]
+
+
+def _scan_parse(adv):
+    try:
+        return eddystone.parse(adv)
+    except TypeError:
+        return None
+
+
+def _scan_fields(adv):
+    adv = memoryview(adv)
+    kind = eddystone.eddystone_type(adv)
+    if kind == eddystone.TYPE_UID:
+        return eddystone.parse_uid(adv)
+    if kind == eddystone.TYPE_URL:
+        return eddystone.parse_url(adv)
+    if kind == eddystone.TYPE_TLM:
+        return eddystone.parse_tlm(adv)
+    return None
+
+
+def bench_scan(count=20000):
+    corpus = _corpus(count)
+    print("%d adverts, %d Eddystone:" % (count, sum(1 for adv in corpus if _scan_fields(adv))))
+    for name, scan in (("parse", _scan_parse), ("fields", _scan_fields)):
+        start = time.monotonic()
+        for adv in corpus:
+            scan(adv)
+        print("  %-6s %8.0f adverts/s" % (name, count / (time.monotonic() - start)))
+
+
+URLS = ["https://www.digi.com/", "https://goo.gl/S6zT6P", "http://example.org/a.b", "https://www.x.edu/y.net/z",
+        "http://10.0.0.1/i", "https://www.digi.com/xbee"]
+
+
+# The URL encoding and decoding of the URL frame before the lookup table.
+def _char_encode(url):
+    for scheme_id in range(len(eddystone._SCHEMES)):
+        if url.startswith(eddystone._SCHEMES[scheme_id]):
+            break
+    out = bytearray((scheme_id,))
+    pos = len(eddystone._SCHEMES[scheme_id])
+    while pos < len(url):
+        for ext_id in range(len(eddystone._EXTENSIONS)):
+            if url.startswith(eddystone._EXTENSIONS[ext_id], pos):
+                out += struct.pack('>b', ext_id)
+                pos += len(eddystone._EXTENSIONS[ext_id])
+                break
+        else:
+            out.append(ord(url[pos]))
+            pos += 1
+    return out
+
+
+def _char_decode(encoded):
+    url = eddystone._SCHEMES[encoded[0]]
+    for c in encoded[1:]:
+        if c < len(eddystone._EXTENSIONS):
+            url += eddystone._EXTENSIONS[c]
+        elif 0x21 <= c < 0x7F:
+            url += chr(c)
+        else:
+            raise ValueError("Invalid URL")
+    return url
+
+
+def bench_url(count=20000):
+    encoded = [eddystone.encode_url(url) for url in URLS]
+    print("%d URL encodings and decodings:" % count)
+    for name, encode, decode in (("character", _char_encode, _char_decode),
+                                 ("table", eddystone.encode_url, eddystone.decode_url)):
+        start = time.monotonic()
+        for i in range(count):
+            encode(URLS[i % len(URLS)])
+        encoding = time.monotonic() - start
+        start = time.monotonic()
+        for i in range(count):
+            decode(encoded[i % len(encoded)])
+        decoding = time.monotonic() - start
+        print("  %-9s %8.0f encodes/s %8.0f decodes/s" % (name, count / encoding, count / decoding))
+    frame = eddystone.EddystoneURLFrame(0, URLS[0])
+    start = time.monotonic()
+    for i in range(count):
+        frame.url = URLS[i % len(URLS)]
+    print("  URL frame setter, cached: %8.0f/s" % (count / (time.monotonic() - start)))
+
+
+if __name__ == "__main__":
+    bench_tlm()
+    bench_scan()
+    bench_url()
@@ -0,0 +1,58 @@
+# Copyright (c) 2026, Digi International, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+umqtt.store benchmark: append and drain rates and flash write
+amplification, with a temporary directory as the file system.
+
+    python tools/host/bench_store.py
+"""
+
+import os
+import tempfile
+import time
+
+import hostenv
+from umqtt.simple import MQTTClient
+from umqtt.store import MessageStore
+
+
+def bench_store(count=2000, size=48, batches=(1, 16, 64)):
+    print("%d offline messages of %d bytes:" % (count, size))
+    for batch in batches:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = MessageStore(os.path.join(tmp, "q"), max_size=256 * 1024)
+            client = MQTTClient("bench", "host", store=store)
+            msg = bytes(size)
+            start = time.monotonic()
+            for i in range(count):
+                client.publish("bench/offline", msg)
+            appended = time.monotonic() - start
+            client.sock = hostenv.MemorySocket()
+            start = time.monotonic()
+            while client.drain(batch):
+                pass
+            drained = time.monotonic() - start
+            print("  drain batch=%-3d %8.0f appends/s %8.0f drained/s  write amplification %.2f" % (
+                batch, count / appended, store.drained / drained, store.flash_bytes / store.payload_bytes))
+
+
+if __name__ == "__main__":
+    bench_store()
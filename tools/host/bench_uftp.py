@@ -0,0 +1,140 @@
+# Copyright (c) 2026, Digi International, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+uftp benchmarks, on the loopback FTP server: control reply parsing
+against the byte at a time reader uftp used before, and RETR and STOR
+throughput and peak heap with a block allocated per recv() or read()
+against a single reused buffer. The server runs in another process for
+the transfers, to keep its allocations out of the heap figures. CPython
+reuses a freed block right away, so the peaks differ little; on the
+device, every block allocated is garbage the collector has to reclaim.
+
+    python tools/host/bench_uftp.py
+"""
+
+import multiprocessing
+import os
+import tempfile
+import time
+import tracemalloc
+
+import hostenv  # noqa: F401
+import uftp
+from ftp_server import Server
+
+
+class _ByteReaderFTP(uftp.FTP):
+
+    # The reply reader of uftp before the block buffered one.
+    def getline(self):
+        line = ""
+        for i in range(uftp.MAXLINE):
+            buf = str(self.sock.recv(1), self.encoding)
+            if buf == '\r':
+                buf2 = str(self.sock.recv(1), self.encoding)
+                if buf2 == '\n':
+                    break
+            line += buf
+        if not line:
+            raise EOFError
+        return line
+
+
+class _CountingSocket:
+
+    def __init__(self, sock):
+        self._sock = sock
+        self.recvs = 0
+
+    def recv(self, n):
+        self.recvs += 1
+        return self._sock.recv(n)
+
+    def __getattr__(self, name):
+        return getattr(self._sock, name)
+
+
+def bench_replies(count=500):
+    server = Server({"firmware.bin": bytes(1000)})
+    try:
+        print("%d SIZE commands:" % count)
+        for name, cls in (("byte", _ByteReaderFTP), ("buffered", uftp.FTP)):
+            client = cls(server.host, server.port, "user", "pass")
+            client.sock = sock = _CountingSocket(client.sock)
+            start = time.monotonic()
+            for i in range(count):
+                client.sendcmd("SIZE firmware.bin")
+            elapsed = time.monotonic() - start
+            client.quit()
+            print("  %-8s %6.1f us/reply %5.1f recv calls/reply" % (
+                name, elapsed / count * 1e6, sock.recvs / count))
+    finally:
+        server.close()
+
+
+def _serve(conn, files):
+    server = Server(files)
+    conn.send((server.host, server.port))
+    conn.recv()
+
+
+def bench_transfers(size=256 * 1024, blocksize=uftp.MAXLINE):
+    conn, child = multiprocessing.Pipe()
+    proc = multiprocessing.Process(target=_serve, args=(child, {"fw.bin": os.urandom(size)}), daemon=True)
+    proc.start()
+    host, port = conn.recv()
+    client = uftp.FTP(host, port, "user", "pass")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            local = os.path.join(tmp, "fw.bin")
+
+            def retr(f):
+                client.retr("fw.bin", callback=f.write, blocksize=blocksize)
+
+            def retr_into(f):
+                client.retr_into("fw.bin", f, bytearray(blocksize))
+
+            def stor(f):
+                client.stor(local, "up.bin", blocksize=blocksize)
+
+            def stor_buffer(f):
+                client.stor(local, "up.bin", buffer=bytearray(blocksize))
+
+            print("%d KB transfers, %d byte blocks:" % (size // 1024, blocksize))
+            for name, run in (("retr", retr), ("retr_into", retr_into), ("stor", stor),
+                              ("stor buffer", stor_buffer)):
+                with open(local, "wb" if name.startswith("retr") else "rb") as f:
+                    tracemalloc.start()
+                    start = time.monotonic()
+                    run(f)
+                    elapsed = time.monotonic() - start
+                    peak = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+                print("  %-11s %7.0f KB/s  peak heap %6d bytes" % (name, size / 1024 / elapsed, peak))
+    finally:
+        client.close()
+        conn.send(None)
+        proc.join()
+
+
+if __name__ == "__main__":
+    bench_replies()
+    bench_transfers()
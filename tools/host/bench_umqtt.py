@@ -0,0 +1,143 @@
+# Copyright (c) 2026, Digi International, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+umqtt benchmarks against the loopback broker stand-in.
+
+    python tools/host/bench_umqtt.py [--latency MS]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import hostenv  # noqa: F401
+from mqtt_broker import Broker
+from umqtt.simple import MQTTClient, encode_topic
+
+
+class _NullSocket:
+
+    def __init__(self):
+        self.writes = 0
+
+    def write(self, buf, n=None):
+        self.writes += 1
+
+
+def bench_publish(latency, count=100, windows=(0, 4, 16)):
+    """
+    QoS 1 publish throughput with a broker answering after latency ms, for
+    stop-and-wait (max_inflight=0) and in-flight windows.
+    """
+    print("QoS 1 publish, %d ms broker latency:" % latency)
+    for window in windows:
+        broker = Broker(latency)
+        client = MQTTClient("bench", broker.host, broker.port, max_inflight=window)
+        client.connect()
+        n = count if window else max(count // 10, 5)
+        start = time.monotonic()
+        for i in range(n):
+            client.publish(b"bench/pub", b"reading %d" % i, qos=1)
+        client.flush()
+        elapsed = time.monotonic() - start
+        client.disconnect()
+        broker.close()
+        print("  max_inflight=%-3d %7.1f msg/s" % (window, n / elapsed))
+
+
+def bench_receive(count=5000, size=64, rbuf_sizes=(64, 512, 2048)):
+    """
+    Inbound QoS 0 packets per second, and socket reads per packet, for a
+    burst of count messages of size bytes pushed by the broker.
+    """
+    print("Receive %d x %d byte messages:" % (count, size))
+    for rbuf_size in rbuf_sizes:
+        broker = Broker()
+        client = MQTTClient("bench", broker.host, broker.port, rbuf_size=rbuf_size)
+        got = [0]
+
+        def cb(topic, msg):
+            got[0] += 1
+
+        client.set_callback(cb)
+        client.connect()
+        client.subscribe(b"bench/sub")
+        reads = [0]
+        readinto = client.sock.readinto
+
+        def counting_readinto(*args):
+            reads[0] += 1
+            return readinto(*args)
+
+        client.sock.readinto = counting_readinto
+        broker.push(b"bench/sub", bytes(size), count=count)
+        client.wait_msg()
+        start = time.monotonic()
+        while got[0] < count:
+            client.wait_msg()
+        elapsed = time.monotonic() - start
+        client.disconnect()
+        broker.close()
+        print("  rbuf_size=%-5d %9.0f packets/s %6.2f reads/packet" % (rbuf_size, count / elapsed,
+                                                                      reads[0] / count))
+
+
+def bench_publish_alloc(count=1000):
+    """
+    Socket writes and peak transient heap per QoS 0 publish of a small
+    telemetry message, measured with tracemalloc. CPython objects are
+    bigger than MicroPython ones: compare the rows, not the bytes.
+    """
+    print("QoS 0 publish, %d calls:" % count)
+    client = MQTTClient("bench", "host")
+    client.sock = _NullSocket()
+    etopic = encode_topic("bench/telemetry")
+    msg = b'{"temp": 21.5}'
+    cases = (
+        ("publish(str, str)", lambda: client.publish("bench/telemetry", '{"temp": 21.5}')),
+        ("publish(bytes, bytes)", lambda: client.publish(b"bench/telemetry", msg)),
+        ("publish_encoded()", lambda: client.publish_encoded(etopic, msg)),
+    )
+    for name, call in cases:
+        call()
+        client.sock.writes = 0
+        tracemalloc.start()
+        peak = 0
+        for i in range(count):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            call()
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+        tracemalloc.stop()
+        print("  %-22s %4.1f writes/call %5d peak bytes/call" % (name, client.sock.writes / count, peak))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=int, default=100, help="broker latency in ms (default 100)")
+    args = parser.parse_args()
+    bench_receive()
+    bench_publish_alloc()
+    bench_publish(args.latency)
+
+
+if __name__ == "__main__":
+    main()
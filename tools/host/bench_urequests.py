@@ -0,0 +1,120 @@
+# Copyright (c) 2026, Digi International, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+urequests benchmarks: response head parsing cost against the readline
+parser urequests used before, and requests per second and TCP connections
+opened for a Session against one connection per request, on the loopback
+HTTP server. Under CPython the byte loops of the buffer parser cost more
+time than the C readline; on the device, the socket reads dominate.
+
+    python tools/host/bench_urequests.py
+"""
+
+import time
+import tracemalloc
+
+import hostenv
+from http_server import Server
+
+urequests = hostenv.urequests
+
+
+HEAD = (b"HTTP/1.1 200 OK\r\nDate: Sun, 18 Oct 2026 10:00:00 GMT\r\nServer: nginx\r\n"
+        b"Content-Type: application/json\r\nContent-Length: 2\r\nConnection: keep-alive\r\n"
+        b"Cache-Control: max-age=0, no-cache\r\nETag: \"5f3a-1c\"\r\n"
+        b"Last-Modified: Sat, 17 Oct 2026 08:00:00 GMT\r\nVary: Accept-Encoding\r\n"
+        b"X-Request-Id: 0123456789abcdef\r\n\r\n{}")
+
+
+# The status line and header parsing of urequests before the single
+# buffer parser, for comparison.
+def _readline_head(s):
+    l = s.readline()
+    l = l.split(None, 2)
+    status = int(l[1])
+    reason = ""
+    if len(l) > 2:
+        reason = l[2].rstrip()
+    chunked = False
+    while True:
+        l = s.readline()
+        if not l or l == b"\r\n":
+            break
+        if l.startswith(b"Transfer-Encoding:"):
+            if b"chunked" in l:
+                chunked = True
+    return status, reason, chunked
+
+
+def _recv_head(s):
+    resp = urequests.Response(s)
+    resp._recv_head("GET")
+    return resp
+
+
+class _LineSocket(hostenv.MemorySocket):
+
+    # Reading a line from a MicroPython socket costs a read per byte.
+    def readline(self):
+        self.reads += self.inb.find(b"\n") + 1
+        return super().readline()
+
+
+def bench_parse(count=2000):
+    print("%d response heads of %d bytes:" % (count, len(HEAD)))
+    for name, parse in (("readline", _readline_head), ("buffer", _recv_head)):
+        socks = [_LineSocket(HEAD) for i in range(count)]
+        start = time.monotonic()
+        for s in socks:
+            parse(s)
+        elapsed = time.monotonic() - start
+        tracemalloc.start()
+        parse(_LineSocket(HEAD))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print("  %-8s %6.1f us/head %5.0f socket reads/head  peak %d bytes" % (
+            name, elapsed / count * 1e6, sum(s.reads for s in socks) / count, peak))
+
+
+def _run(server, get, path, count):
+    opened = server.connections
+    start = time.monotonic()
+    for i in range(count):
+        get(server.base + path).content
+    return count / (time.monotonic() - start), server.connections - opened
+
+
+def bench_keep_alive(count=300, paths=("/bytes/100", "/chunked/1000")):
+    server = Server()
+    try:
+        for path in paths:
+            print("%d x GET %s:" % (count, path))
+            print("  request  %8.0f requests/s %5d connections" % _run(server, urequests.get, path, count))
+            session = urequests.Session()
+            print("  Session  %8.0f requests/s %5d connections" % _run(server, session.get, path, count))
+            session.close()
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    bench_parse()
+    bench_keep_alive()
@@ -0,0 +1,98 @@
+# Copyright (c) 2026, Digi International, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+urllib.parse benchmark: quote() and quote_plus() through the 256-entry
+table, against the Quoter lookups used before, and unquote(), urlsplit(),
+parse_qs() and iter_urlencode(), with CPython's urllib.parse (partly
+written in C and with caches of its own) as a reference.
+
+    python tools/host/bench_urllib.py
+"""
+
+import time
+import urllib.parse as cpython
+
+import hostenv
+
+parse = hostenv.urllib_parse
+
+
+class _EagerQuoter(parse.Quoter):
+
+    # The lookup before, which formatted the escape even on a cache hit.
+    def __getitem__(self, item):
+        return self.get(item, self.__missing__(item))
+
+
+def _quoter_quote(string, safe="/"):
+    bs = string.encode("utf-8")
+    if isinstance(safe, str):
+        safe = safe.encode("ascii", "ignore")
+    if not bs.rstrip(parse._ALWAYS_SAFE_BYTES + safe):
+        return bs.decode()
+    quoter = _EagerQuoter(safe).__getitem__
+    return "".join([quoter(char) for char in bs])
+
+
+STRINGS = ["https://myhub.azure-devices.net/devices/xbee-0013A20012345678",
+           "/api/v1/streams/history?start_time=2026-10-18T12:00:00Z&size=100",
+           "temp sensor #3 (\u00b0C)", "plain-ascii-token_0123456789"]
+
+
+def bench_quote(count=20000):
+    print("%d quote() calls:" % count)
+    for name, quote in (("Quoter", _quoter_quote), ("table", parse.quote)):
+        start = time.monotonic()
+        for i in range(count):
+            quote(STRINGS[i % len(STRINGS)])
+        print("  %-6s %8.0f calls/s" % (name, count / (time.monotonic() - start)))
+    start = time.monotonic()
+    for i in range(count):
+        parse.quote_plus(STRINGS[i % len(STRINGS)])
+    print("  quote_plus() %8.0f calls/s" % (count / (time.monotonic() - start)))
+
+
+URLS = ["https://remotemanager.digi.com/ws/v1/streams/inventory.json?size=100&cursor=a1b2",
+        "http://10.0.0.1:8080/cgi?x=%20y%2Fz&name=xb%C3%A9#frag", "mqtts://broker.example.org:8883"]
+QUERY = "start_time=2026-10-18T12%3A00%3A00Z&end_time=&size=100&unit=%C2%B0C&tag=a&tag=b+c"
+PARAMS = [("stream_id", "xbee/temperature"), ("value", 22.5), ("tags", ["a", "b c"]), ("note", "caf\u00e9 & more")]
+
+
+def bench_parse(count=20000):
+    print("%d calls each, lib/urllib against CPython:" % count)
+    for name, lib, ref, args in (
+            ("unquote", parse.unquote, cpython.unquote, [QUERY, URLS[1]]),
+            ("urlsplit", parse.urlsplit, cpython.urlsplit, URLS),
+            ("parse_qs", parse.parse_qs, cpython.parse_qs, [QUERY]),
+            ("urlencode", lambda q: list(parse.iter_urlencode(q, True)),
+             lambda q: cpython.urlencode(q, True), [PARAMS])):
+        rates = []
+        for func in (lib, ref):
+            start = time.monotonic()
+            for i in range(count):
+                func(args[i % len(args)])
+            rates.append(count / (time.monotonic() - start))
+        print("  %-9s %8.0f calls/s  (CPython %8.0f calls/s)" % (name, rates[0], rates[1]))
+
+
+if __name__ == "__main__":
+    bench_quote()
+    bench_parse()
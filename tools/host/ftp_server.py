@@ -0,0 +1,244 @@
+# Copyright (c) 2026, Digi International, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Loopback FTP server stand-in for host tests and benchmarks.
+
+It serves files from memory in passive mode: USER, PASS, TYPE, NOOP, SIZE,
+MDTM, REST, PASV, RETR, STOR, DELE, RNFR, RNTO, CWD, PWD, MLSD, NLST and
+QUIT; any other command gets a 502. Transfers can be cut after a number of bytes,
+closing the data and control connections, to stand in for a dropped
+cellular link.
+"""
+
+import socket
+import threading
+import time
+
+
+class _Connection:
+
+    def __init__(self, server, sock):
+        self.server = server
+        self.sock = sock
+        self.file = sock.makefile("rb")
+        self.rest = 0
+        self.pasv = None
+        self.rnfr = None
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def reply(self, line):
+        self.sock.sendall(line.encode() + b"\r\n")
+
+    def _accept(self):
+        if self.pasv is None:
+            self.reply("425 Use PASV first")
+            return None
+        data, _ = self.pasv.accept()
+        self.pasv.close()
+        self.pasv = None
+        self.reply("150 Opening data connection")
+        return data
+
+    # Bytes a transfer may move before the link is cut, None for no limit.
+    def _limit(self):
+        server = self.server
+        with server.lock:
+            if server.drop_after is None or not server.drops:
+                return None
+            server.drops -= 1
+            return server.drop_after
+
+    def _retr(self, name):
+        server = self.server
+        if name not in server.files:
+            self.reply("550 No such file")
+            return True
+        data = self._accept()
+        if data is None:
+            return True
+        body = server.files[name][self.rest:]
+        limit = self._limit()
+        if limit is not None:
+            body = body[:limit]
+        data.sendall(body)
+        data.close()
+        if limit is not None:
+            return False
+        self.reply("226 Transfer complete")
+        return True
+
+    def _stor(self, name):
+        server = self.server
+        data = self._accept()
+        if data is None:
+            return True
+        body = bytearray(server.files.get(name, b"")[:self.rest] if self.rest else b"")
+        limit = self._limit()
+        got = 0
+        cut = False
+        while True:
+            k = data.recv(4096)
+            if not k:
+                break
+            if limit is not None and got + len(k) > limit:
+                body += k[:limit - got]
+                cut = True
+                break
+            body += k
+            got += len(k)
+        data.close()
+        server.files[name] = bytes(body)
+        server.mtimes[name] = time.strftime("%Y%m%d%H%M%S", time.gmtime())
+        if cut:
+            return False
+        self.reply("226 Transfer complete")
+        return True
+
+    def _listing(self, cmd):
+        data = self._accept()
+        if data is None:
+            return
+        server = self.server
+        if cmd == "MLSD":
+            lines = ["type=cdir;modify=20260101000000;perm=el; .", "type=pdir;modify=20260101000000;perm=el; .."]
+            lines += ["Type=dir;Modify=20260101000000.5;perm=el; %s" % name for name in server.dirs]
+            lines += ["type=file;size=%d;modify=%s;perm=r; %s" % (len(body), server.mtimes.get(name, "20260101000000"),
+                                                                  name)
+                      for name, body in server.files.items()]
+        else:
+            lines = list(server.dirs) + list(server.files)
+        data.sendall("".join(line + "\r\n" for line in lines).encode())
+        data.close()
+        self.reply("226 Transfer complete")
+
+    def _run(self):
+        server = self.server
+        try:
+            self.sock.sendall(b"220-Stand-in FTP server\r\n220 Ready\r\n")
+            while True:
+                line = self.file.readline()
+                if not line:
+                    break
+                cmd, _, arg = line.decode("latin-1").strip().partition(" ")
+                cmd = cmd.upper()
+                with server.lock:
+                    server.log.append(cmd)
+                if cmd == "USER":
+                    self.reply("331 Password required")
+                elif cmd == "PASS":
+                    self.reply("230 Logged in")
+                elif cmd in ("TYPE", "NOOP"):
+                    self.reply("200 OK")
+                elif cmd == "SIZE" and arg in server.files:
+                    self.reply("213 %d" % len(server.files[arg]))
+                elif cmd == "MDTM" and server.mdtm and arg in server.files:
+                    self.reply("213 " + server.mtimes.get(arg, "20260101000000"))
+                elif cmd in ("SIZE", "MDTM") and (server.mdtm or cmd == "SIZE"):
+                    self.reply("550 No such file")
+                elif cmd == "REST":
+                    self.rest = int(arg)
+                    self.reply("350 Restarting at %d" % self.rest)
+                elif cmd == "PASV":
+                    if self.pasv is not None:
+                        self.pasv.close()
+                    self.pasv = socket.socket()
+                    self.pasv.bind(("127.0.0.1", 0))
+                    self.pasv.listen(1)
+                    port = self.pasv.getsockname()[1]
+                    self.reply("227 Entering Passive Mode (127,0,0,1,%d,%d)" % (port >> 8, port & 255))
+                elif cmd in ("RETR", "STOR"):
+                    ok = self._retr(arg) if cmd == "RETR" else self._stor(arg)
+                    self.rest = 0
+                    if not ok:
+                        break
+                elif cmd == "DELE" and arg in server.files:
+                    del server.files[arg]
+                    self.reply("250 Deleted")
+                elif cmd == "RNFR" and arg in server.files:
+                    self.rnfr = arg
+                    self.reply("350 Ready for RNTO")
+                elif cmd == "RNTO" and self.rnfr:
+                    server.files[arg] = server.files.pop(self.rnfr)
+                    if self.rnfr in server.mtimes:
+                        server.mtimes[arg] = server.mtimes.pop(self.rnfr)
+                    self.rnfr = None
+                    self.reply("250 Renamed")
+                elif cmd in ("DELE", "RNFR"):
+                    self.reply("550 No such file")
+                elif cmd == "CWD":
+                    self.reply("250 OK")
+                elif cmd == "PWD":
+                    self.reply('257 "/" is the current directory')
+                elif cmd == "NLST" or cmd == "MLSD" and server.mlsd:
+                    self._listing(cmd)
+                elif cmd == "QUIT":
+                    self.reply("221 Bye")
+                    break
+                else:
+                    self.reply("502 Command not implemented")
+        except OSError:
+            pass
+        finally:
+            if self.pasv is not None:
+                self.pasv.close()
+            self.sock.close()
+
+
+class Server:
+    """
+    FTP server stand-in listening on a free local port. files maps names
+    to contents and mtimes names to MDTM times ("YYYYMMDDHHMMSS"), both
+    updated by STOR and RNTO; dirs holds directory names, only listed;
+    log holds every command received. Set drop_after to
+    cut the next drops transfers after that many bytes, and clear mdtm or
+    mlsd to answer those commands with a 502.
+    """
+
+    def __init__(self, files=None, drop_after=None, drops=1):
+        self.files = dict(files or {})
+        self.mtimes = {}
+        self.dirs = []
+        self.drop_after = drop_after
+        self.drops = drops
+        self.mdtm = True
+        self.mlsd = True
+        self.log = []
+        self.connections = 0
+        self.lock = threading.Lock()
+        self._sock = socket.socket()
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind(("127.0.0.1", 0))
+        self._sock.listen(4)
+        self.host, self.port = self._sock.getsockname()
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                sock, _ = self._sock.accept()
+            except OSError:
+                return
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.connections += 1
+            _Connection(self, sock)
+
+    def close(self):
+        self._sock.close()
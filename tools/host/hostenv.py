@@ -0,0 +1,185 @@
+# Copyright (c) 2026, Digi International, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Host environment for running the libraries under CPython.
+
+Importing this module puts the MicroPython module shims (utime, usocket,
+digi.ble...) and the library directories on sys.path, so that the tests,
+benchmarks and stand-ins in this directory import the libraries as they
+are on the device.
+"""
+
+import builtins
+import os
+import re
+import sys
+import types
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(os.path.dirname(HERE))
+LIB = os.path.join(ROOT, "lib")
+
+# lib/urllib is left out: it would shadow the urllib of CPython, which the
+# stand-in servers need. Its parse module is loaded below instead.
+for _name in ("umqtt", "uftp", "remotemanager", "eddystonebeacon", "iBeacon", "beacontracker", "advfilter",
+              "beaconadvertiser"):
+    sys.path.insert(0, os.path.join(LIB, _name))
+sys.path.insert(0, os.path.join(HERE, "shims"))
+
+
+def _load(name, path, source=None, namespace=None):
+    if source is None:
+        with open(path) as f:
+            source = f.read()
+    module = types.ModuleType(name)
+    module.__file__ = path
+    if namespace:
+        module.__dict__.update(namespace)
+    exec(compile(source, path, "exec"), module.__dict__)
+    return module
+
+
+# lib/urllib/urllib/parse.py, not registered in sys.modules.
+urllib_parse = _load("urllib.parse", os.path.join(LIB, "urllib", "urllib", "parse.py"))
+
+
+# "from urllib.parse import ..." in the libraries gets lib/urllib.
+def _lib_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if name == "urllib.parse" and fromlist:
+        return urllib_parse
+    return builtins.__import__(name, globals, locals, fromlist, level)
+
+
+def _load_urequests():
+    # MicroPython formats str arguments into bytes with %s, CPython does
+    # not: those format strings are made str (the socket shim encodes
+    # them) before the module is executed.
+    path = os.path.join(LIB, "urequests", "urequests.py")
+    with open(path) as f:
+        source = re.sub(r'b"([^"]*%s[^"]*)" %', r'"\1" %', f.read())
+    module = _load("urequests", path, source, {"__builtins__": dict(vars(builtins), __import__=_lib_import)})
+    sys.modules["urequests"] = module
+    return module
+
+
+urequests = _load_urequests()
+
+
+class Clock:
+    """
+    utime stand-in whose time only moves when slept, so that ages, TTLs
+    and delays are exact. Install it in place of the utime module of a
+    library with patch(module).
+    """
+
+    def __init__(self):
+        self.now = 0
+
+    def ticks_ms(self):
+        return self.now
+
+    def ticks_diff(self, a, b):
+        return a - b
+
+    def ticks_add(self, a, b):
+        return a + b
+
+    def sleep_ms(self, ms):
+        self.now += ms
+
+    # Set module.utime to this clock; returns a function undoing it.
+    def patch(self, module):
+        utime = module.utime
+        module.utime = self
+        return lambda: setattr(module, "utime", utime)
+
+
+class MemorySocket:
+    """
+    In-memory socket with the MicroPython stream methods: reads come from
+    the bytes fed to it, writes are kept in out. recv() and non-blocking
+    reads return at most chunk bytes, to split packets the way a modem
+    does. Writes raise OSError once fail_after bytes have been written.
+    """
+
+    def __init__(self, data=b"", chunk=1024, fail_after=None):
+        self.inb = bytearray(data)
+        self.out = bytearray()
+        self.chunk = chunk
+        self.fail_after = fail_after
+        self.blocking = True
+        self.reads = 0
+        self.writes = 0
+        self.closed = False
+
+    def feed(self, data):
+        self.inb += data
+
+    def setblocking(self, flag):
+        self.blocking = flag
+
+    def settimeout(self, t):
+        pass
+
+    def connect(self, addr):
+        pass
+
+    def readinto(self, buf, n=-1):
+        self.reads += 1
+        mv = memoryview(buf)
+        if n < 0 or n > len(mv):
+            n = len(mv)
+        if not self.blocking:
+            n = min(n, self.chunk)
+        if not self.inb:
+            return None if not self.blocking else 0
+        k = min(n, len(self.inb))
+        mv[:k] = self.inb[:k]
+        del self.inb[:k]
+        return k
+
+    def recv(self, n):
+        self.reads += 1
+        return self.read(min(n, self.chunk))
+
+    def read(self, n=-1):
+        if n < 0:
+            n = len(self.inb)
+        data = bytes(self.inb[:n])
+        del self.inb[:n]
+        return data
+
+    def readline(self):
+        i = self.inb.find(b"\n") + 1 or len(self.inb)
+        return self.read(i)
+
+    def write(self, buf, n=None):
+        if isinstance(buf, str):
+            buf = buf.encode()
+        data = bytes(buf) if n is None else bytes(memoryview(buf)[:n])
+        if self.fail_after is not None and len(self.out) + len(data) > self.fail_after:
+            raise OSError(104)
+        self.writes += 1
+        self.out += data
+        return len(data)
+
+    def close(self):
+        self.closed = True
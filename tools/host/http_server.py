@@ -0,0 +1,233 @@
+# Copyright (c) 2026, Digi International, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Loopback HTTP/1.1 server stand-in for host tests and benchmarks. It keeps
+connections alive and counts them, and serves:
+
+* GET /bytes/<n>: n bytes with a Content-Length.
+* GET /chunked/<n>[?etag=1]: n bytes, chunked, with an ETag if asked.
+* GET /close: a short body, then closes the connection.
+* GET /headers: the request headers, as a JSON object.
+* GET /etag: a body with an ETag, or 304 if If-None-Match matches it.
+* GET /redirect?to=<url>&code=<status>: a redirect to url.
+* POST, PUT /echo: the request body, sent with Content-Length or chunked;
+  /redirect as for GET.
+* DELETE, HEAD on any path: an empty 204 or 200 response.
+* /ws/v1/streams/...: the datastream API of Remote Manager, on the streams
+  and history of the server (see Server).
+"""
+
+import http.server
+import json
+import socket
+import threading
+import urllib.parse
+
+ETAG = '"v1"'
+STREAMS = "/ws/v1/streams/"
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+            self.server.open.append(self.connection)
+
+    def _send(self, status, body=b"", headers=()):
+        self.send_response(status)
+        for k, v in headers:
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _body(self):
+        if self.headers.get("Transfer-Encoding") == "chunked":
+            data = bytearray()
+            while True:
+                n = int(self.rfile.readline().strip(), 16)
+                if not n:
+                    self.rfile.readline()
+                    return bytes(data)
+                data += self.rfile.read(n)
+                self.rfile.readline()
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    # Remote Manager stand-in: inventory pages (cursor is the index of the
+    # first stream), inventory/<id>.json, create, update and delete, and
+    # history/ recording the datapoints posted.
+    def _streams(self, method, path, query, body):
+        server = self.server
+        with server.lock:
+            server.log.append((method, self.path[len(STREAMS):]))
+            fail = server.fail.pop(0) if server.fail else None
+        if fail is not None:
+            status, after = fail
+            self._send(status, headers=[("Retry-After", after)] if after else [])
+            return
+        json_type = [("Content-Type", "application/json")]
+        if path == "inventory.json":
+            ids = sorted(server.streams)
+            start = int(query.get("cursor", 0))
+            size = int(query.get("size", 1000))
+            page = {"count": len(ids[start:start + size]), "size": size,
+                    "list": [server.streams[k] for k in ids[start:start + size]]}
+            if start + size < len(ids):
+                page["cursor"] = str(start + size)
+            self._send(200, json.dumps(page).encode(), json_type)
+        elif path.startswith("inventory/") and method == "GET":
+            info = server.streams.get(path[10:-5])
+            if info is None:
+                self._send(404)
+            else:
+                self._send(200, json.dumps(info).encode(), json_type)
+        elif path == "inventory/" and method == "POST":
+            info = json.loads(body)
+            server.streams[info["id"]] = info
+            self._send(201)
+        elif path.startswith("inventory/") and method == "PUT":
+            server.streams[path[10:]].update(json.loads(body))
+            self._send(200)
+        elif path.startswith("inventory/") and method == "DELETE":
+            self._send(204 if server.streams.pop(path[10:], None) else 404)
+        elif path == "history/" and method == "POST":
+            points = json.loads(body)
+            server.history.append(points if isinstance(points, list) else [points])
+            self._send(201)
+        else:
+            self._send(404)
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests += 1
+        url = urllib.parse.urlsplit(self.path)
+        parts = url.path.strip("/").split("/")
+        query = dict(urllib.parse.parse_qsl(url.query))
+        if url.path.startswith(STREAMS):
+            self._streams("GET", url.path[len(STREAMS):], query, None)
+        elif parts[0] == "bytes":
+            self._send(200, b"x" * int(parts[1]))
+        elif parts[0] == "chunked":
+            self.send_response(200)
+            self.send_header("Transfer-Encoding", "chunked")
+            if query.get("etag"):
+                self.send_header("ETag", ETAG)
+            self.end_headers()
+            n = int(parts[1])
+            for i in range(0, n, 100):
+                piece = b"x" * min(100, n - i)
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(piece), piece))
+            self.wfile.write(b"0\r\n\r\n")
+        elif parts[0] == "close":
+            self.close_connection = True
+            self._send(200, b"bye", [("Connection", "close")])
+        elif parts[0] == "headers":
+            self._send(200, json.dumps(dict(self.headers.items())).encode(), [("Content-Type", "application/json")])
+        elif parts[0] == "etag":
+            if self.headers.get("If-None-Match") == ETAG:
+                self._send(304, headers=[("ETag", ETAG)])
+            else:
+                self._send(200, b"cached body", [("ETag", ETAG)])
+        elif parts[0] == "redirect":
+            self._send(int(query.get("code", 302)), headers=[("Location", query["to"])])
+        else:
+            self._send(404)
+
+    def do_POST(self):
+        with self.server.lock:
+            self.server.requests += 1
+        body = self._body()
+        if self.path.startswith(STREAMS):
+            self._streams(self.command, self.path[len(STREAMS):], {}, body)
+        elif self.path.startswith("/redirect"):
+            query = dict(urllib.parse.parse_qsl(urllib.parse.urlsplit(self.path).query))
+            self._send(int(query.get("code", 302)), headers=[("Location", query["to"])])
+        else:
+            self._send(200, body)
+
+    do_PUT = do_POST
+
+    def do_DELETE(self):
+        if self.path.startswith(STREAMS):
+            self._streams("DELETE", self.path[len(STREAMS):], {}, None)
+        else:
+            self._send(204)
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "50")
+        self.end_headers()
+
+
+class Server(http.server.ThreadingHTTPServer):
+    """
+    Server stand-in on a free local port. connections counts the TCP
+    connections accepted and requests the GET/POST/PUT requests served;
+    drop() closes the open connections, as a server timing out idle ones
+    would.
+
+    For the Remote Manager API, streams maps stream ids to their metadata
+    and history holds the lists of datapoints posted; log has the method
+    and path, query included, under /ws/v1/streams/ of each request. Each (status,
+    Retry-After) in fail answers the next one of those requests instead.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+        self.open = []
+        self.streams = {}
+        self.history = []
+        self.log = []
+        self.fail = []
+        self.base = "http://127.0.0.1:%d" % self.server_address[1]
+        threading.Thread(target=self.serve_forever, args=(0.01,), daemon=True).start()
+
+    # Clients closing a connection mid-response are expected.
+    def handle_error(self, request, client_address):
+        pass
+
+    def drop(self):
+        with self.lock:
+            conns, self.open = self.open, []
+        for conn in conns:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def close(self):
+        self.drop()
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,223 @@
+# Copyright (c) 2026, Digi International, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Loopback MQTT 3.1.1 broker stand-in for host tests and benchmarks.
+
+It accepts any client, acknowledges QoS 1 and 2 publishes (delivering a
+QoS 2 message only once per packet id until its PUBREL, like a real
+broker), answers SUBSCRIBE and PINGREQ, and can push messages to the
+subscribed clients. Every packet it sends is delayed by latency ms, to
+stand in for a cellular link.
+"""
+
+import queue
+import socket
+import struct
+import threading
+import time
+
+
+def encode_publish(topic, msg, qos=0, pid=0, dup=False, retain=False):
+    if isinstance(topic, str):
+        topic = topic.encode()
+    if isinstance(msg, str):
+        msg = msg.encode()
+    body = struct.pack("!H", len(topic)) + topic + (struct.pack("!H", pid) if qos else b"") + msg
+    return bytes((0x30 | dup << 3 | qos << 1 | retain,)) + _encode_len(len(body)) + body
+
+
+def _encode_len(n):
+    out = bytearray()
+    while True:
+        b = n & 0x7f
+        n >>= 7
+        out.append(b | 0x80 if n else b)
+        if not n:
+            return bytes(out)
+
+
+class _Connection:
+
+    def __init__(self, broker, sock):
+        self.broker = broker
+        self.sock = sock
+        self.file = sock.makefile("rb")
+        self.subscribed = False
+        self.pending = None
+        self._out = queue.Queue()
+        threading.Thread(target=self._writer, daemon=True).start()
+        threading.Thread(target=self._reader, daemon=True).start()
+
+    def send(self, data):
+        self._out.put((time.monotonic() + self.broker.latency / 1000, data))
+
+    def close(self):
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+    def _writer(self):
+        while True:
+            due, data = self._out.get()
+            if data is None:
+                return
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            try:
+                self.sock.sendall(data)
+            except OSError:
+                return
+
+    def _read_packet(self):
+        head = self.file.read(1)
+        if not head:
+            return None, None
+        n = 0
+        shift = 0
+        while True:
+            b = self.file.read(1)[0]
+            n |= (b & 0x7f) << shift
+            if not b & 0x80:
+                break
+            shift += 7
+        return head[0], self.file.read(n)
+
+    def _reader(self):
+        broker = self.broker
+        try:
+            while True:
+                op, body = self._read_packet()
+                if op is None:
+                    break
+                kind = op & 0xf0
+                if kind == 0x10:  # CONNECT
+                    # QoS 2 packet ids waiting for PUBREL are kept per
+                    # client id, unless a clean session is asked for.
+                    cid_len = struct.unpack_from("!H", body, 10)[0]
+                    cid = bytes(body[12:12 + cid_len])
+                    with broker.lock:
+                        if body[7] & 2 or cid not in broker.sessions:
+                            broker.sessions[cid] = set()
+                        self.pending = broker.sessions[cid]
+                    self.send(b"\x20\x02\x00\x00")
+                elif kind == 0x30:  # PUBLISH
+                    qos = (op >> 1) & 3
+                    tl = struct.unpack_from("!H", body)[0]
+                    topic = body[2:2 + tl]
+                    pos = 2 + tl
+                    pid = 0
+                    if qos:
+                        pid = struct.unpack_from("!H", body, pos)[0]
+                        pos += 2
+                    msg = body[pos:]
+                    with broker.lock:
+                        broker.received.append((topic, msg, qos, bool(op & 8), pid))
+                        if qos < 2 or pid not in self.pending:
+                            broker.delivered.append((topic, msg))
+                        if qos == 2:
+                            self.pending.add(pid)
+                    if not broker.ack:
+                        continue
+                    if qos == 1:
+                        self.send(struct.pack("!BBH", 0x40, 2, pid))
+                    elif qos == 2:
+                        self.send(struct.pack("!BBH", 0x50, 2, pid))
+                elif kind == 0x60:  # PUBREL
+                    pid = struct.unpack("!H", body)[0]
+                    self.pending.discard(pid)
+                    if broker.ack:
+                        self.send(struct.pack("!BBH", 0x70, 2, pid))
+                elif kind == 0x50:  # PUBREC of a message pushed to the client
+                    self.send(struct.pack("!BBH", 0x62, 2, struct.unpack("!H", body)[0]))
+                elif kind in (0x40, 0x70):  # PUBACK, PUBCOMP
+                    with broker.lock:
+                        broker.acks += 1
+                elif kind == 0x80:  # SUBSCRIBE
+                    self.subscribed = True
+                    self.send(b"\x90\x03" + body[:2] + bytes((body[-1],)))
+                elif kind == 0xc0:  # PINGREQ
+                    self.send(b"\xd0\x00")
+                elif kind == 0xe0:  # DISCONNECT
+                    break
+        except (OSError, IndexError, ValueError):
+            pass
+        finally:
+            self._out.put((0, None))
+            self.close()
+
+
+class Broker:
+    """
+    Broker stand-in listening on a free local port. received holds every
+    PUBLISH as (topic, msg, qos, dup, pid), duplicates included; delivered
+    holds what a real broker would forward, as (topic, msg). Clear ack to
+    stop acknowledging publishes (as if the acknowledgements were lost), to
+    exercise retransmission. QoS 2 state is kept per client id.
+    """
+
+    def __init__(self, latency=0):
+        self.latency = latency
+        self.ack = True
+        self.lock = threading.Lock()
+        self.received = []
+        self.sessions = {}
+        self.delivered = []
+        self.acks = 0
+        self.connections = []
+        self._sock = socket.socket()
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind(("127.0.0.1", 0))
+        self._sock.listen(4)
+        self.host, self.port = self._sock.getsockname()
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                sock, _ = self._sock.accept()
+            except OSError:
+                return
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.connections.append(_Connection(self, sock))
+
+    def push(self, topic, msg, qos=0, count=1):
+        """
+        Send count PUBLISH packets to every subscribed client, in one write.
+        """
+        data = b"".join(encode_publish(topic, msg, qos, i % 65535 + 1) for i in range(count))
+        for conn in self.connections:
+            if conn.subscribed:
+                conn.send(data)
+
+    def drop(self):
+        """
+        Close every client connection, as a lost link would.
+        """
+        for conn in self.connections:
+            conn.close()
+        self.connections = []
+
+    def close(self):
+        self.drop()
+        self._sock.close()
@@ -0,0 +1,17 @@
+# digi.ble for CPython: records what is advertised instead of sending it.
+# calls holds (time.monotonic(), interval_us, payload or None) tuples.
+import time as _time
+
+calls = []
+_active = False
+
+
+def active(flag=None):
+    global _active
+    if flag is not None:
+        _active = bool(flag)
+    return _active
+
+
+def gap_advertise(interval_us, adv_data=None):
+    calls.append((_time.monotonic(), interval_us, None if adv_data is None else bytes(adv_data)))
@@ -0,0 +1,5 @@
+from os import *
+from os import urandom, replace
+
+# Not in the XBee uos module.
+del stat  # noqa: F821
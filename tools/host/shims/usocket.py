@@ -0,0 +1,83 @@
+# usocket for CPython, with the stream methods of MicroPython sockets:
+# read()/readinto() on a blocking socket wait until n bytes or EOF, and
+# return None instead of raising on a non-blocking one with no data.
+import socket as _socket
+
+AF_INET = _socket.AF_INET
+SOCK_STREAM = _socket.SOCK_STREAM
+IPPROTO_TCP = _socket.IPPROTO_TCP
+IPPROTO_SEC = 4
+
+
+def getaddrinfo(host, port, af=0, type=0, proto=0, flags=0):
+    return _socket.getaddrinfo(host, port, af, type, proto, flags)
+
+
+class socket:
+
+    def __init__(self, af=AF_INET, type=SOCK_STREAM, proto=IPPROTO_TCP):
+        self._s = _socket.socket(af, type)
+        if type == SOCK_STREAM:
+            # Send small writes right away, as the modem does.
+            self._s.setsockopt(_socket.IPPROTO_TCP, _socket.TCP_NODELAY, 1)
+
+    def connect(self, addr):
+        self._s.connect(addr)
+
+    def settimeout(self, t):
+        self._s.settimeout(t)
+
+    def setblocking(self, flag):
+        self._s.setblocking(flag)
+
+    def write(self, buf, n=None):
+        if isinstance(buf, str):
+            buf = buf.encode()
+        if n is not None:
+            buf = memoryview(buf)[:n]
+        self._s.sendall(buf)
+        return len(buf)
+
+    def send(self, buf, flags=0):
+        return self._s.send(buf, flags)
+
+    def recv(self, n):
+        return self._s.recv(n)
+
+    def readinto(self, buf, n=-1):
+        mv = memoryview(buf)
+        if n < 0 or n > len(mv):
+            n = len(mv)
+        if not self._s.getblocking():
+            try:
+                return self._s.recv_into(mv[:n])
+            except BlockingIOError:
+                return None
+        got = 0
+        while got < n:
+            k = self._s.recv_into(mv[got:n])
+            if not k:
+                break
+            got += k
+        return got
+
+    def read(self, n=-1):
+        out = bytearray()
+        while n < 0 or len(out) < n:
+            k = self._s.recv(4096 if n < 0 else n - len(out))
+            if not k:
+                break
+            out += k
+        return bytes(out)
+
+    def readline(self):
+        out = bytearray()
+        while not out.endswith(b"\n"):
+            c = self._s.recv(1)
+            if not c:
+                break
+            out += c
+        return bytes(out)
+
+    def close(self):
+        self._s.close()
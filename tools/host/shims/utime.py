@@ -0,0 +1,30 @@
+# utime for CPython: millisecond ticks from the monotonic clock.
+import time as _time
+
+
+def ticks_ms():
+    return int(_time.monotonic() * 1000)
+
+
+def ticks_us():
+    return int(_time.monotonic() * 1000000)
+
+
+def ticks_diff(a, b):
+    return a - b
+
+
+def ticks_add(a, b):
+    return a + b
+
+
+def sleep_ms(ms):
+    _time.sleep(ms / 1000)
+
+
+def sleep(s):
+    _time.sleep(s)
+
+
+def time():
+    return int(_time.time())
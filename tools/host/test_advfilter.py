@@ -0,0 +1,99 @@
+# Copyright (c) 2026, Digi International, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+
+import hostenv  # noqa: F401
+import advfilter
+import EddystoneBeacon as eddystone
+from advfilter import AdvFilter
+
+UUID = bytes.fromhex("0102030405060708090a0b0c0d0e0f10")
+IBEACON = bytes.fromhex("0201061AFF4C000215") + UUID + bytes((0, 1, 0, 2, 0xc5))
+# Flags, complete name "XBeeMobile", Digi manufacturer data.
+DIGI = bytes.fromhex("020106") + b"\x0b\x09XBeeMobile" + bytes.fromhex("06FFDB02") + b"hey"
+UID = eddystone.EddystoneUIDFrame(-20, UUID).get_bytes()
+TLM = eddystone.EddystoneTLMFrame(1, 1).get_bytes()
+HEART_RATE = bytes.fromhex("020106" "050302180F18")  # Heart rate and battery services
+ADDRESS = b"\x00\x40\x9d\x00\x00\x01"
+
+
+def adv(payload, rssi=-60, address=b"\0" * 6):
+    return {"payload": payload, "rssi": rssi, "address": address}
+
+
+class AdvFilterTest(unittest.TestCase):
+
+    def matches(self, rule, payloads=(IBEACON, DIGI, UID, TLM, HEART_RATE)):
+        f = AdvFilter([rule])
+        return [p for p in payloads if f.match(adv(p)) == 0]
+
+    def test_criteria(self):
+        self.assertEqual(self.matches({"ad_type": advfilter.AD_NAME_COMPLETE}), [DIGI])
+        self.assertEqual(self.matches({"company_id": advfilter.COMPANY_ID_DIGI}), [DIGI])
+        self.assertEqual(self.matches({"company_id": advfilter.COMPANY_ID_APPLE}), [IBEACON])
+        self.assertEqual(self.matches({"service_uuid": advfilter.UUID_EDDYSTONE}), [UID, TLM])
+        self.assertEqual(self.matches({"service_uuid": 0x180F}), [HEART_RATE])
+        self.assertEqual(self.matches({"ibeacon_uuid": b""}), [IBEACON])
+        self.assertEqual(self.matches({"ibeacon_uuid": UUID[:4]}), [IBEACON])
+        self.assertEqual(self.matches({"ibeacon_uuid": b"\x01\x02\xff"}), [])
+        self.assertEqual(self.matches({"eddystone_type": eddystone.TYPE_TLM}), [TLM])
+        self.assertEqual(self.matches({}), [IBEACON, DIGI, UID, TLM, HEART_RATE])
+
+    def test_address_and_rssi(self):
+        f = AdvFilter([{"addresses": [ADDRESS], "rssi_min": -70}])
+        self.assertEqual(f.match(adv(TLM, -65, ADDRESS)), 0)
+        self.assertIsNone(f.match(adv(TLM, -75, ADDRESS)))
+        self.assertIsNone(f.match(adv(TLM, -65)))
+
+    def test_first_matching_rule(self):
+        f = AdvFilter([
+            {"ibeacon_uuid": UUID[:2], "rssi_min": -50},
+            {"company_id": advfilter.COMPANY_ID_DIGI},
+            {"ad_type": advfilter.AD_FLAGS},
+        ])
+        self.assertEqual(f.match(adv(IBEACON, -40)), 0)
+        self.assertEqual(f.match(adv(IBEACON, -60)), 2)
+        self.assertEqual(f.match(adv(DIGI, -40)), 1)
+        self.assertIsNone(f.match(adv(b"")))
+        self.assertEqual(list(f.filter([adv(DIGI), adv(b"\x03\x19\x00\x00")])), [(1, adv(DIGI))])
+
+    def test_malformed_payloads(self):
+        f = AdvFilter([{"ibeacon_uuid": b""}, {"eddystone_type": 0}, {"service_uuid": 0x180F}])
+        for payload in (IBEACON[:12], UID[:9], HEART_RATE[:-1] + b"\x07", b"\x00\x00\x00", b"\x05\xff\x4c"):
+            self.assertIsNone(f.match(adv(payload)), payload)
+
+    def test_no_state_kept_between_adverts(self):
+        # The AD types seen are marked with a generation number, which
+        # wraps around after 255 adverts.
+        f = AdvFilter([{"ad_type": advfilter.AD_NAME_COMPLETE}])
+        for i in range(600):
+            self.assertEqual(f.match(adv(DIGI)), 0)
+            self.assertIsNone(f.match(adv(IBEACON)))
+
+    def test_unknown_criterion(self):
+        with self.assertRaises(ValueError):
+            AdvFilter([{"company": 1}])
+        with self.assertRaises(ValueError):
+            AdvFilter([{"ibeacon_uuid": bytes(17)}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+# Copyright (c) 2026, Digi International, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+
+import hostenv
+import iBeacon
+import EddystoneBeacon as eddystone
+import beaconadvertiser
+from beaconadvertiser import RotatingAdvertiser
+
+UUID = bytes(range(16))
+
+
+class ProximityBeaconFrameTest(unittest.TestCase):
+
+    def test_updated_in_place(self):
+        beacon = iBeacon.ProximityBeaconFrame(UUID, -59, 1, 2)
+        frame = beacon.frame
+        self.assertEqual(iBeacon.parse_proximity_beacon(bytes(frame)), (UUID, 0xc5, 1, 2))
+        beacon.set(300, 400, -70)
+        beacon.minor += 1
+        self.assertIs(beacon.frame, frame)
+        self.assertEqual(iBeacon.parse_proximity_beacon(bytes(frame)), (UUID, 0xba, 300, 401))
+        self.assertEqual((beacon.uuid, beacon.major, beacon.minor, beacon.power), (UUID, 300, 401, 0xba))
+        self.assertTrue(iBeacon.is_proximity_beacon(bytes(frame)))
+
+    def test_make_proximity_beacon(self):
+        self.assertEqual(bytes(iBeacon.make_proximity_beacon(UUID, 0xc5, 0x0102, 0x0304)),
+                         bytes.fromhex("0201061AFF4C000215") + UUID + bytes.fromhex("01020304C5"))
+        with self.assertRaises(ValueError):
+            iBeacon.ProximityBeaconFrame(UUID[:8], -59)
+
+
+class _Recorder:
+
+    def __init__(self):
+        self.calls = []
+
+    def gap_advertise(self, interval_us, adv_data=None):
+        self.calls.append(None if adv_data is None else bytes(adv_data))
+
+
+class RotatingAdvertiserTest(unittest.TestCase):
+
+    def setUp(self):
+        self.ibeacon = iBeacon.ProximityBeaconFrame(UUID, -59, 1, 1)
+        self.tlm = eddystone.EddystoneTLMFrame(0, 0)
+        self.url = eddystone.EddystoneURLFrame(-10, "https://www.digi.com/").get_bytes()
+        self.ble = _Recorder()
+
+    def test_schedule(self):
+        adv = RotatingAdvertiser([self.ibeacon, self.tlm, self.url], dwell=[100, 200, 300], ble=self.ble)
+        waits = [adv.poll(now=t) for t in range(0, 1300, 50)]
+        self.assertEqual(adv.index, 0)
+        self.assertEqual(adv.rotations, 7)
+        self.assertEqual(waits[:8], [100, 50, 200, 150, 100, 50, 300, 250])
+        self.assertEqual(self.ble.calls[:3], [bytes(self.ibeacon.frame), self.tlm.get_bytes(), self.url])
+        self.assertEqual((adv.late_ms, adv.max_late_ms), (0, 0))
+
+    def test_frames_updated_in_place_are_advertised(self):
+        adv = RotatingAdvertiser([self.ibeacon, self.tlm], dwell=100, ble=self.ble)
+        adv.start(now=0)
+        self.tlm.advertisement_count = 42
+        adv.poll(now=100)
+        self.ibeacon.minor = 7
+        adv.poll(now=200)
+        self.assertEqual(eddystone.parse_tlm(self.ble.calls[1])[2], 42)
+        self.assertEqual(iBeacon.parse_proximity_beacon(self.ble.calls[2])[3], 7)
+
+    def test_late_polls_do_not_drift(self):
+        adv = RotatingAdvertiser([self.url, self.url], dwell=100, ble=self.ble)
+        adv.start(now=0)
+        # Polled 30 ms late every time, the rotations stay on the 100 ms grid.
+        for t in range(130, 1000, 100):
+            self.assertEqual(adv.poll(now=t), 70)
+        self.assertEqual((adv.rotations, adv.max_late_ms), (10, 30))
+        # Too late to catch up: the schedule restarts.
+        self.assertEqual(adv.poll(now=1500), 100)
+        self.assertEqual(adv.poll(now=1550), 50)
+
+    def test_run_timing(self):
+        clock = hostenv.Clock()
+        self.addCleanup(clock.patch(beaconadvertiser))
+        sleep_ms = clock.sleep_ms
+        # Every sleep runs 5 ms over, as on a busy device.
+        clock.sleep_ms = lambda ms: sleep_ms(ms + 5)
+        times = []
+        self.ble.gap_advertise = lambda interval_us, adv_data=None: times.append((clock.now, adv_data is not None))
+        adv = RotatingAdvertiser([self.ibeacon, self.url], dwell=40, ble=self.ble)
+        adv.run(duration=400)
+        # The schedule keeps to the grid of the first rotation, and stops
+        # with the first sleep that reaches the duration.
+        self.assertEqual(times, [(0, True)] + [(t + 5, True) for t in range(40, 401, 40)] + [(405, False)])
+        self.assertEqual((adv.rotations, adv.max_late_ms), (11, 5))
+        self.assertFalse(adv.running)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            RotatingAdvertiser([], ble=self.ble)
+        with self.assertRaises(ValueError):
+            RotatingAdvertiser([self.url], dwell=[1, 2], ble=self.ble)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+# Copyright (c) 2026, Digi International, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import random
+import unittest
+
+import hostenv  # noqa: F401
+import beacontracker
+import EddystoneBeacon as eddystone
+from beacontracker import BeaconTracker, ENTER, EXIT, MOVE, IMMEDIATE, NEAR, FAR
+
+UUID = bytes(range(16))
+
+
+def ibeacon(minor, power=-59):
+    return bytes.fromhex("0201061AFF4C000215") + UUID + bytes((0, 1, 0, minor, power & 0xff))
+
+
+def adv(payload, rssi):
+    return {"payload": payload, "rssi": rssi, "address": b"\0" * 6}
+
+
+class TrackerTestCase(unittest.TestCase):
+
+    def tracker(self, **kw):
+        self.events = []
+        return BeaconTracker(lambda event, key, rssi, zone: self.events.append((event, key[-2:], zone)), **kw)
+
+
+class KeyTest(unittest.TestCase):
+
+    def test_beacon_key(self):
+        self.assertEqual(beacontracker.beacon_key(ibeacon(7)), (UUID + b"\0\1\0\7", -59))
+        uid = eddystone.EddystoneUIDFrame(-20, UUID).get_bytes()
+        self.assertEqual(beacontracker.beacon_key(uid), (UUID, -61))
+        self.assertEqual(beacontracker.beacon_key(memoryview(uid[:7] + b"\x15" + uid[8:29])), (UUID, -61))
+        # Other AD structures may follow the service data.
+        self.assertEqual(beacontracker.beacon_key(uid + b"\x05\x09XB3a"), (UUID, -61))
+        self.assertIsNone(beacontracker.beacon_key(uid + b"\x05\x09XB3"))
+        self.assertIsNone(beacontracker.beacon_key(eddystone.EddystoneTLMFrame(0, 0).get_bytes()))
+        self.assertIsNone(beacontracker.beacon_key(ibeacon(7)[:-1]))
+
+
+class TrackerTest(TrackerTestCase):
+
+    def test_enter_move_exit(self):
+        tracker = self.tracker(timeout=5000)
+        self.assertIsNone(tracker.ingest(adv(b"\x02\x01\x06", -40), now=0))
+        key = tracker.ingest(adv(ibeacon(1), -59), now=0)
+        self.assertEqual(tracker.zone(key), NEAR)
+        self.assertAlmostEqual(tracker.distance(key), 1.0)
+        for t in range(1, 40):
+            tracker.ingest(adv(ibeacon(1), -85), now=t * 100)
+        self.assertEqual(tracker.zone(key), FAR)
+        self.assertGreater(tracker.distance(key), 3)
+        self.assertEqual(tracker.seen(key), (0, 3900))
+        tracker.expire(now=9000)
+        self.assertEqual(self.events, [(ENTER, b"\0\1", NEAR), (MOVE, b"\0\1", FAR), (EXIT, b"\0\1", FAR)])
+        self.assertEqual(len(tracker), 0)
+        with self.assertRaises(KeyError):
+            tracker.rssi(key)
+
+    def test_duplicates_are_not_reported(self):
+        tracker = self.tracker()
+        for t in range(100):
+            for minor in range(5):
+                tracker.ingest(adv(ibeacon(minor), -50 - minor), now=t * 10)
+        self.assertEqual(tracker.ingested, 500)
+        self.assertEqual([e for e, _, _ in self.events], [ENTER] * 5)
+
+    def test_least_recently_heard_dropped_when_full(self):
+        tracker = self.tracker(capacity=3)
+        for minor in range(3):
+            tracker.ingest(adv(ibeacon(minor), -60), now=minor)
+        tracker.ingest(adv(ibeacon(0), -60), now=10)
+        tracker.ingest(adv(ibeacon(9), -60), now=11)
+        self.assertEqual(self.events[-2:], [(EXIT, b"\0\1", NEAR), (ENTER, b"\0\x09", NEAR)])
+        self.assertEqual(sorted(key[-1] for key in tracker.beacons()), [0, 2, 9])
+
+    def test_noise_at_zone_limit_does_not_move(self):
+        # A beacon standing at about the NEAR/FAR limit (3 m, 9.5 dB below
+        # the power at 1 m) with +-6 dB of noise on every reading.
+        for hysteresis, confirm in ((0, 1), (3.0, 3)):
+            rnd = random.Random(3)
+            tracker = self.tracker(hysteresis=hysteresis, confirm=confirm)
+            tracker.ingest(adv(ibeacon(1), -62), now=0)
+            for t in range(1, 3000):
+                tracker.ingest(adv(ibeacon(1), -68 + rnd.randint(-6, 6)), now=t * 100)
+            moves = [e for e, _, _ in self.events if e == MOVE]
+            if hysteresis:
+                self.assertEqual(moves, [])
+            else:
+                self.assertGreater(len(moves), 100)
+        # Walking away is a single move.
+        for t in range(3000, 3100):
+            tracker.ingest(adv(ibeacon(1), -80 + rnd.randint(-6, 6)), now=t * 100)
+        self.assertEqual(self.events[1:], [(MOVE, b"\0\1", FAR)])
+
+    def test_immediate_zone(self):
+        tracker = self.tracker(alpha=1.0, confirm=1)
+        key = tracker.ingest(adv(ibeacon(1), -50), now=0)
+        self.assertEqual(tracker.zone(key), IMMEDIATE)
+        tracker.ingest(adv(ibeacon(1), -75), now=1)
+        self.assertEqual(self.events[-1], (MOVE, b"\0\1", FAR))
+
+
+if __name__ == "__main__":
+    unittest.main()
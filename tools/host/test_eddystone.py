@@ -0,0 +1,190 @@
+# Copyright (c) 2026, Digi International, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+
+import hostenv  # noqa: F401
+import EddystoneBeacon as eddystone
+
+UID = bytes(range(16))
+
+
+class FrameTest(unittest.TestCase):
+
+    def test_tlm_updated_in_place(self):
+        tlm = eddystone.EddystoneTLMFrame(0, 0, beacon_temperature=21.5, battery_voltage=3.3)
+        frame = tlm.frame
+        for i in range(1, 50):
+            tlm.advertisement_count = i * 1000
+            tlm.time_sec = i * 0.1
+            self.assertIs(tlm.frame, frame)
+            self.assertEqual(eddystone.parse_tlm(frame), (3300, 21 * 256 + 128, i * 1000, i))
+        self.assertEqual((tlm.advertisement_count, tlm.time_sec), (49000, 4.9))
+        self.assertEqual((tlm.battery_voltage, tlm.beacon_temperature), (3.3, 21.5))
+        self.assertTrue(tlm.validate_payload())
+        self.assertEqual(eddystone.eddystone_type(frame), eddystone.TYPE_TLM)
+
+    def test_uid_and_ranging_data(self):
+        uid = eddystone.EddystoneUIDFrame(-20, UID)
+        frame = uid.frame
+        uid.ranging_data = -59
+        uid.uid = bytes(reversed(UID))
+        self.assertIs(uid.frame, frame)
+        self.assertEqual((uid.ranging_data, uid.uid), (-59, bytes(reversed(UID))))
+        self.assertEqual(len(frame), 31)
+        self.assertTrue(uid.validate_payload())
+
+    def test_url_length_changes(self):
+        url = eddystone.EddystoneURLFrame(-10, "https://www.digi.com/")
+        self.assertEqual(bytes(url.frame[12:]), b"\xf6\x01digi\x00")
+        url.url = "https://example.org/xb3"
+        self.assertEqual(url.url, "https://example.org/xb3")
+        self.assertEqual(len(url.frame), url.frame[7] + 8)
+        self.assertTrue(url.validate_payload())
+        url.ranging_data = 5
+        self.assertEqual((url.ranging_data, url.url), (5, "https://example.org/xb3"))
+        # Same length: the view is kept. Another length: a new one.
+        frame = url.frame
+        url.url = "https://example.org/xb4"
+        self.assertIs(url.frame, frame)
+        self.assertEqual(eddystone.decode_url(frame[13:]), "https://example.org/xb4")
+        url.url = "https://example.org/"
+        self.assertIsNot(url.frame, frame)
+        self.assertEqual(url.url, "https://example.org/")
+
+    def test_out_of_range(self):
+        tlm = eddystone.EddystoneTLMFrame(0, 0)
+        before = tlm.get_bytes()
+        for name, value in (("advertisement_count", 1 << 32), ("time_sec", 1 << 29), ("battery_voltage", 70.0),
+                            ("beacon_temperature", 128.0)):
+            with self.assertRaises(ValueError):
+                setattr(tlm, name, value)
+        self.assertEqual(tlm.get_bytes(), before)
+        with self.assertRaises(ValueError):
+            eddystone.EddystoneUIDFrame(0, UID[:10])
+        with self.assertRaises(ValueError):
+            eddystone.EddystoneURLFrame(0, "https://" + "x" * 20)
+
+
+NAME = b"\x05\x09XB3a"  # Complete local name AD structure
+
+
+class ParseTest(unittest.TestCase):
+
+    def setUp(self):
+        self.uid = eddystone.EddystoneUIDFrame(-20, UID).get_bytes()
+        self.url = eddystone.EddystoneURLFrame(-10, "https://www.digi.com/").get_bytes()
+        self.tlm = eddystone.EddystoneTLMFrame(7, 1.5, 20.0, 3.0).get_bytes()
+
+    def test_fields_read_in_place(self):
+        for tail in (b"", NAME):
+            # Without the two reserved bytes, to make room for the tail.
+            uid = memoryview(self.uid[:7] + b"\x15" + self.uid[8:29] + tail)
+            self.assertEqual(eddystone.eddystone_type(uid), eddystone.TYPE_UID)
+            power, namespace, instance = eddystone.parse_uid(uid)
+            self.assertEqual((power, bytes(namespace), bytes(instance)), (-20, UID[:10], UID[10:]))
+            self.assertIsInstance(namespace, memoryview)
+            url = memoryview(self.url + tail)
+            self.assertEqual(eddystone.eddystone_type(url), eddystone.TYPE_URL)
+            power, encoded = eddystone.parse_url(url)
+            self.assertEqual((power, eddystone.decode_url(encoded)), (-10, "https://www.digi.com/"))
+            tlm = memoryview(self.tlm + tail)
+            self.assertEqual(eddystone.eddystone_type(tlm), eddystone.TYPE_TLM)
+            self.assertEqual(eddystone.parse_tlm(tlm), (3000, 20 * 256, 7, 15))
+
+    def test_parse_with_trailing_structures(self):
+        for adv, kind in ((self.uid, eddystone.TYPE_UID), (self.url, eddystone.TYPE_URL),
+                          (self.tlm, eddystone.TYPE_TLM)):
+            eddy_type, frame = eddystone.parse(adv + NAME)
+            self.assertEqual(eddy_type, kind)
+            self.assertEqual(frame.get_bytes(), adv)
+
+    def test_invalid(self):
+        bad = [
+            b"",
+            self.uid[:20],
+            self.tlm[:-1],
+            self.tlm + b"\x05\x09XB",  # Trailing length past the end
+            self.url[:5] + b"\xAB" + self.url[6:],  # Not the Eddystone UUID
+            self.tlm[:12] + b"\x01" + self.tlm[13:],  # Encrypted TLM
+            self.uid[:11] + b"\x30" + self.uid[12:],  # Unknown frame type
+            bytes.fromhex("0201061AFF4C000215") + bytes(21),  # iBeacon
+        ]
+        for adv in bad:
+            self.assertIsNone(eddystone.eddystone_type(adv), adv)
+            with self.assertRaises(TypeError):
+                eddystone.parse(adv)
+
+
+URLS = [
+    "https://www.digi.com/", "http://www.digi.com", "https://goo.gl/S6zT6P", "http://example.org/a.b",
+    "https://a.info/x", "http://b.biz.gov/", "https://www.x.edu/y.net/z", "http://10.0.0.1/i", "https://c.combo/",
+    "http://d.com.", "https://e.", "http://", "https://www.g.org/.org/",
+]
+
+
+# Encoding by trying every extension at every position, as the URL setter
+# did before the lookup table.
+def reference_encode(url):
+    for scheme_id in range(len(eddystone._SCHEMES)):
+        if url.startswith(eddystone._SCHEMES[scheme_id]):
+            break
+    out = bytearray((scheme_id,))
+    pos = len(eddystone._SCHEMES[scheme_id])
+    while pos < len(url):
+        for ext_id in range(len(eddystone._EXTENSIONS)):
+            if url.startswith(eddystone._EXTENSIONS[ext_id], pos):
+                out.append(ext_id)
+                pos += len(eddystone._EXTENSIONS[ext_id])
+                break
+        else:
+            out.append(ord(url[pos]))
+            pos += 1
+    return bytes(out)
+
+
+class URLTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        for url in URLS:
+            encoded = eddystone.encode_url(url)
+            self.assertEqual(encoded, reference_encode(url), url)
+            self.assertEqual(eddystone.decode_url(encoded), url)
+            self.assertEqual(eddystone.decode_url(memoryview(encoded)), url)
+        self.assertEqual(eddystone.encode_url("https://www.digi.com/"), b"\x01digi\x00")
+        self.assertEqual(eddystone.decode_url(b""), "")
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            eddystone.encode_url("ftp://digi.com")
+        for encoded in (b"\x04digi", b"\x00di gi", b"\x00\x7f"):
+            with self.assertRaises(ValueError):
+                eddystone.decode_url(encoded)
+
+    def test_cache_is_bounded(self):
+        frame = eddystone.EddystoneURLFrame(0, "https://www.digi.com/")
+        for i in range(3 * eddystone._URL_CACHE_SIZE):
+            frame.url = "http://%d.com/" % (i % 10)
+            self.assertEqual(frame.url, "http://%d.com/" % (i % 10))
+            self.assertLessEqual(len(eddystone._url_cache), eddystone._URL_CACHE_SIZE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,227 @@
+# Copyright (c) 2026, Digi International, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+
+import hostenv
+import remotemanager
+from http_server import Server
+
+
+class RemoteManagerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.server = Server()
+        self.addCleanup(self.server.close)
+        self.clock = hostenv.Clock()
+        self.addCleanup(self.clock.patch(remotemanager))
+        uri = remotemanager.STREAMS_URI
+        remotemanager.STREAMS_URI = self.server.base + "/ws/v1/streams/"
+        self.addCleanup(setattr, remotemanager, "STREAMS_URI", uri)
+
+    def connection(self, **kw):
+        rm = remotemanager.RemoteManagerConnection({"token": "t"}, "Bearer", **kw)
+        self.addCleanup(rm.close)
+        return rm
+
+    def requests(self, method, path):
+        return self.server.log.count((method, path))
+
+
+class BatchTest(RemoteManagerTestCase):
+
+    def test_flushed_at_count(self):
+        rm = self.connection(batch_count=3)
+        self.assertIsNone(rm.queue_datapoint("s", 1))
+        self.assertIsNone(rm.queue_datapoint("s", 2))
+        self.assertEqual(self.server.history, [])
+        self.assertEqual(rm.queue_datapoint("s", 3, 1000).status_code, 201)
+        self.assertEqual(self.server.history, [[{"stream_id": "s", "value": 1}, {"stream_id": "s", "value": 2},
+                                                {"stream_id": "s", "value": 3, "timestamp": 1000}]])
+        self.assertEqual((rm.datapoints_sent, rm.batch_requests, rm.requests_saved), (3, 1, 2))
+        self.assertGreater(rm.bytes_saved, 0)
+
+    def test_flushed_at_size(self):
+        rm = self.connection(batch_bytes=100)
+        i = 0
+        while not self.server.history:
+            rm.queue_datapoint("stream", i)
+            i += 1
+        # Each datapoint is 35 bytes of JSON and a separator.
+        self.assertEqual([p["value"] for p in self.server.history[0]], [0, 1, 2])
+
+    def test_flushed_at_age_or_forced(self):
+        rm = self.connection()
+        rm.queue_datapoint("s", 1)
+        self.clock.sleep_ms(59999)
+        self.assertIsNone(rm.flush_datapoints(False))
+        self.clock.sleep_ms(1)
+        self.assertIsNotNone(rm.flush_datapoints(False))
+        rm.queue_datapoint("s", 2)
+        self.assertIsNotNone(rm.flush_datapoints())
+        self.assertIsNone(rm.flush_datapoints())
+        self.assertEqual(len(self.server.history), 2)
+        self.assertEqual(self.requests("POST", "history/"), 2)
+
+    def test_batch_kept_when_request_fails(self):
+        rm = self.connection(batch_count=2)
+        rm.queue_datapoint("s", 1)
+        self.server.fail.append((400, None))
+        with self.assertRaises(ConnectionError):
+            rm.queue_datapoint("s", 2)
+        self.assertEqual(rm.flush_datapoints().status_code, 201)
+        self.assertEqual([p["value"] for p in self.server.history[0]], [1, 2])
+
+
+
+class InventoryTest(RemoteManagerTestCase):
+
+    def setUp(self):
+        super().setUp()
+        for i in range(7):
+            self.server.streams["s%d" % i] = {
+                "id": "s%d" % i, "type": "FLOAT",
+                # Quotes, escapes, brackets and commas inside strings, and
+                # nested objects and arrays.
+                "description": 'say "hi", {not} [an] \\ object' + "\u00e9" * i,
+                "units": {"name": "C", "scale": [1, [2, {"k": "]},"}]]},
+                "tags": [],
+            }
+
+    def test_pages_followed_across_cursor(self):
+        rm = self.connection()
+        got = list(rm.iter_datastreams(size=3))
+        self.assertEqual(got, [self.server.streams["s%d" % i] for i in range(7)])
+        self.assertEqual(rm.get_datastreams(), ["s%d" % i for i in range(7)])
+        self.assertEqual([path for _, path in self.server.log],
+                         ["inventory.json?size=3", "inventory.json?size=3&cursor=3",
+                          "inventory.json?size=3&cursor=6", "inventory.json?size=100"])
+
+    def test_stopped_early(self):
+        rm = self.connection()
+        it = rm.iter_datastreams(size=3)
+        self.assertEqual(next(it)["id"], "s0")
+        # Other requests go through while a page is being read.
+        rm.queue_datapoint("s0", 1)
+        self.assertIsNotNone(rm.flush_datapoints())
+        self.assertEqual(next(it)["id"], "s1")
+        it.close()
+        self.assertEqual(len(self.server.log), 2)
+
+
+
+class StreamCacheTest(RemoteManagerTestCase):
+
+    STREAM = {"id": "temp", "type": "FLOAT", "units": "C"}
+
+    def test_hit_within_ttl(self):
+        self.server.streams["temp"] = dict(self.STREAM)
+        rm = self.connection(stream_cache_ttl=1000)
+        for i in range(3):
+            self.assertEqual(rm.get_stream_metadata("temp"), self.STREAM)
+        self.assertEqual(self.requests("GET", "inventory/temp.json"), 1)
+        self.assertEqual((rm.stream_cache_hits, rm.stream_cache_misses), (2, 1))
+        self.clock.sleep_ms(1000)
+        rm.get_stream_metadata("temp")
+        self.assertEqual(self.requests("GET", "inventory/temp.json"), 2)
+
+    def test_invalidated_by_create_and_delete(self):
+        rm = self.connection()
+        # Missing, then created: cached from the request, no lookup needed.
+        self.assertEqual(rm.ensure_datastream(dict(self.STREAM)), self.STREAM)
+        self.assertEqual(rm.ensure_datastream(dict(self.STREAM)), self.STREAM)
+        self.assertEqual(self.requests("POST", "inventory/"), 1)
+        self.assertEqual(self.requests("GET", "inventory/temp.json"), 1)
+        rm.delete_datastream("temp")
+        self.assertIsNone(rm.get_stream_metadata("temp"))
+        self.assertEqual(self.requests("GET", "inventory/temp.json"), 2)
+        self.assertNotIn("temp", self.server.streams)
+
+    def test_updated_and_bounded(self):
+        rm = self.connection(stream_cache_size=2)
+        for name in ("a", "b", "c"):
+            self.server.streams[name] = {"id": name}
+            rm.get_stream_metadata(name)
+        self.assertEqual(sorted(rm._streams), ["b", "c"])
+        rm.update_datastream("c", {"units": "V"})
+        self.assertEqual(rm.get_stream_metadata("c"), {"id": "c", "units": "V"})
+        self.assertEqual(rm.stream_cache_hits, 0)
+
+
+
+class RetryTest(RemoteManagerTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.server.streams["temp"] = {"id": "temp"}
+
+    def test_retry_after_honored(self):
+        rm = self.connection()
+        self.server.fail += [(503, "2"), (429, "1")]
+        self.assertEqual(rm.get_stream_metadata("temp"), {"id": "temp"})
+        self.assertEqual((rm.retries, rm.throttled_ms, self.clock.now), (2, 3000, 3000))
+        self.assertEqual(self.requests("GET", "inventory/temp.json"), 3)
+
+    def test_backoff_doubles(self):
+        rm = self.connection(retry_delay=1000)
+        self.server.fail += [(500, None), (502, None), (504, None)]
+        rm.get_stream_metadata("temp")
+        self.assertEqual(rm.retries, 3)
+        # Jittered between half and all of 1000 + 2000 + 4000 ms.
+        self.assertTrue(3500 <= rm.throttled_ms <= 7000, rm.throttled_ms)
+
+    def test_gives_up(self):
+        rm = self.connection(max_retries=2)
+        self.server.fail += [(503, None)] * 3
+        with self.assertRaises(ConnectionError):
+            rm.get_datastream_info("temp")
+        self.assertEqual(self.requests("GET", "inventory/temp.json"), 3)
+        # Too long a Retry-After is not waited for.
+        self.server.fail.append((503, "3600"))
+        with self.assertRaises(ConnectionError):
+            rm.get_datastream_info("temp")
+        self.assertEqual(self.requests("GET", "inventory/temp.json"), 4)
+
+    def test_post_retried_only_if_not_handled(self):
+        rm = self.connection()
+        self.server.fail.append((500, None))
+        with self.assertRaises(ConnectionError):
+            rm.add_datapoint("temp", 1)
+        self.server.fail += [(429, None), (503, None)]
+        rm.add_datapoint("temp", 2)
+        self.assertEqual(self.requests("POST", "history/"), 4)
+        self.assertEqual(self.server.history, [[{"stream_id": "temp", "value": 2}]])
+
+    def test_token_bucket(self):
+        rm = self.connection(rate_limit=2, rate_burst=2)
+        for i in range(5):
+            rm.get_datastream_info("temp")
+        # A burst of two, then one request every 500 ms (rounded up).
+        self.assertEqual((rm.throttled_ms, self.clock.now), (3 * 501, 3 * 501))
+        self.clock.sleep_ms(1000)
+        rm.throttled_ms = 0
+        for i in range(2):
+            rm.get_datastream_info("temp")
+        self.assertEqual(rm.throttled_ms, 0)
+        self.assertEqual(rm.retries, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+# Copyright (c) 2026, Digi International, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import tempfile
+import unittest
+
+import hostenv
+from mqtt_broker import Broker, encode_publish
+from umqtt.simple import MQTTClient
+from umqtt.store import MessageStore
+
+
+class StoreTestCase(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        self.path = os.path.join(tmp.name, "q")
+
+    def segments(self):
+        return sorted(name for name in os.listdir(self.dir) if not name.endswith(".pos"))
+
+
+class MessageStoreTest(StoreTestCase):
+
+    def test_read_oldest_first(self):
+        store = MessageStore(self.path)
+        for i in range(5):
+            store.append("t/%d" % i, "m%d" % i, qos=i % 3)
+        self.assertEqual(list(store.read()), [(b"t/%d" % i, b"m%d" % i, False, i % 3) for i in range(5)])
+        store.commit()
+        self.assertTrue(store.empty())
+
+    def test_bounded_with_oldest_evicted(self):
+        store = MessageStore(self.path, max_size=400, segments=4)
+        for i in range(30):
+            store.append("t", "msg%03d" % i)
+        self.assertLessEqual(len(self.segments()), 4)
+        self.assertGreater(store.evicted, 0)
+        msgs = [m for _, m, _, _ in store.read()]
+        self.assertEqual(msgs[-1], b"msg029")
+        self.assertEqual(msgs, sorted(msgs))
+        self.assertNotIn(b"msg000", msgs)
+
+    def test_torn_record_is_skipped(self):
+        store = MessageStore(self.path)
+        store.append("t", "before")
+        with open(os.path.join(self.dir, self.segments()[-1]), "ab") as f:
+            f.write(b"\xa5\x00\x00")
+        store = MessageStore(self.path)
+        store.append("t", "after")
+        self.assertEqual([m for _, m, _, _ in store.read()], [b"before", b"after"])
+
+    def test_position_survives_reopen(self):
+        store = MessageStore(self.path)
+        for i in range(4):
+            store.append("t", "m%d" % i)
+        it = store.read(2)
+        self.assertEqual([m for _, m, _, _ in it], [b"m0", b"m1"])
+        store.commit()
+        store = MessageStore(self.path)
+        self.assertEqual([m for _, m, _, _ in store.read()], [b"m2", b"m3"])
+
+
+class StoreAndForwardTest(StoreTestCase):
+
+    def test_offline_publishes_drain_in_order(self):
+        store = MessageStore(self.path)
+        client = MQTTClient("test", "host", store=store)
+        for i in range(10):
+            client.publish("t", "m%d" % i)
+        client.sock = hostenv.MemorySocket()
+        self.assertEqual(client.drain(4), 4)
+        while client.drain(4):
+            pass
+        self.assertTrue(store.empty())
+        self.assertEqual(bytes(client.sock.out), b"".join(encode_publish(b"t", b"m%d" % i) for i in range(10)))
+
+    def test_failed_drain_resumes_without_loss(self):
+        store = MessageStore(self.path)
+        client = MQTTClient("test", "host", store=store)
+        for i in range(10):
+            client.publish("t", "m%02d" % i)
+        client.sock = hostenv.MemorySocket(fail_after=30)
+        with self.assertRaises(OSError):
+            client.drain()
+        sent = bytes(client.sock.out)
+        client.sock = hostenv.MemorySocket()
+        while client.drain():
+            pass
+        out = sent + bytes(client.sock.out)
+        self.assertEqual(sorted(set(out[i:i + 3] for i in range(len(out)) if out[i:i + 1] == b"m")),
+                         [b"m%02d" % i for i in range(10)])
+
+    def test_failed_qos_publish_is_sent_once(self):
+        for qos in (1, 2):
+            broker = Broker()
+            self.addCleanup(broker.close)
+            store = MessageStore(self.path + str(qos))
+            client = MQTTClient("test%d" % qos, broker.host, broker.port, max_inflight=4, store=store)
+            client.connect()
+
+            def fail(*args):
+                raise OSError(104)
+
+            # The link drops while the PUBLISH, already in flight, is sent.
+            client.sock.write = fail
+            with self.assertRaises(OSError):
+                client.publish(b"t", b"m1", qos=qos)
+            client.connect(clean_session=False)
+            self.addCleanup(client.sock.close)
+            client.drain()
+            self.assertTrue(client.flush(1000))
+            copies = [r for r in broker.received if r[1] == b"m1"]
+            self.assertEqual(len(copies), 1, copies)
+
+    def test_failed_qos_publish_survives_clean_connect(self):
+        broker = Broker()
+        self.addCleanup(broker.close)
+        store = MessageStore(self.path)
+        client = MQTTClient("test", broker.host, broker.port, max_inflight=4, store=store)
+        client.connect()
+
+        def fail(*args):
+            raise OSError(104)
+
+        client.sock.write = fail
+        with self.assertRaises(OSError):
+            client.publish(b"t", b"m1", qos=1)
+        # A clean session drops the in-flight table, not the message.
+        client.connect()
+        self.addCleanup(client.sock.close)
+        self.assertEqual(client.drain(), 1)
+        self.assertTrue(client.flush(1000))
+        self.assertEqual([r[1] for r in broker.received], [b"m1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,307 @@
+# Copyright (c) 2026, Digi International, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import io
+import os
+import tempfile
+import unittest
+
+import hostenv
+import uftp
+from ftp_server import Server
+
+
+def ftp(data, chunk=1024):
+    client = uftp.FTP()
+    client.sock = hostenv.MemorySocket(data, chunk=chunk)
+    return client
+
+
+class ServerTestCase(unittest.TestCase):
+
+    files = {}
+
+    def setUp(self):
+        self.server = Server(self.files)
+        self.addCleanup(self.server.close)
+
+    def client(self):
+        client = uftp.FTP(self.server.host, self.server.port, "user", "pass")
+        self.addCleanup(client.close)
+        return client
+
+
+class ReplyTest(unittest.TestCase):
+
+    def test_lines_split_across_reads(self):
+        for chunk in (1, 3, 1024):
+            client = ftp(b"220-Hello\r\n220-there\r\n220 Ready\r\n331 Password\r\n230 OK\r\n", chunk)
+            self.assertEqual(client.getresp(), "220-Hello\n220-there\n220 Ready")
+            self.assertEqual(client.getresp(), "331 Password")
+            self.assertEqual(client.getline(), "230 OK")
+            with self.assertRaises(EOFError):
+                client.getline()
+
+    def test_one_read_per_block(self):
+        client = ftp(b"200 OK\r\n" * 100)
+        for i in range(100):
+            client.getresp()
+        self.assertLess(client.sock.reads, 3)
+
+    def test_long_line_is_cut(self):
+        client = ftp(b"200 " + b"x" * (2 * uftp.MAXLINE) + b"\r\n250 Next\r\n")
+        self.assertEqual(len(client.getline()), uftp.MAXLINE)
+
+    def test_errors(self):
+        client = ftp(b"450 Busy\r\n550 Missing\r\n")
+        with self.assertRaises(uftp.TempError):
+            client.getresp()
+        with self.assertRaises(uftp.PermError):
+            client.getresp()
+
+
+class SessionTest(ServerTestCase):
+
+    files = {"a.bin": b"a" * 5000, "b.txt": b"b"}
+
+    def test_login_and_commands(self):
+        client = self.client()
+        self.assertEqual(client.pwd(), "/")
+        self.assertEqual(client.size("a.bin"), 5000)
+        self.assertEqual(sorted(client.nlst()), ["a.bin", "b.txt"])
+        self.assertEqual(sorted((name, size) for name, size, _, _ in client.listdir()),
+                         [("a.bin", 5000), ("b.txt", 1)])
+        got = []
+        client.retr("a.bin", callback=got.append)
+        self.assertEqual(b"".join(got), self.files["a.bin"])
+        client.quit()
+        self.assertEqual(self.server.log[:3], ["USER", "PASS", "TYPE"])
+
+    def test_listdir_falls_back_to_nlst(self):
+        self.server.mlsd = False
+        client = self.client()
+        self.assertEqual(sorted(client.listdir()), [("a.bin", None, None, None), ("b.txt", None, None, None)])
+        list(client.listdir())
+        self.assertEqual(self.server.log.count("MLSD"), 1)
+
+
+class ListingTest(ServerTestCase):
+
+    files = {"a.bin": b"a" * 5000, "my file.txt": b"b"}
+
+    def setUp(self):
+        super().setUp()
+        self.server.dirs.append("logs")
+        self.server.mtimes["a.bin"] = "20261018120000"
+        self.clock = hostenv.Clock()
+        self.addCleanup(self.clock.patch(uftp))
+
+    def client(self, cache_ttl=1000):
+        client = uftp.FTP(self.server.host, self.server.port, "user", "pass", cache_ttl=cache_ttl)
+        self.addCleanup(client.close)
+        client.pwd()
+        return client
+
+    def count(self, cmd):
+        return self.server.log.count(cmd)
+
+    def test_mlsd_entries(self):
+        self.assertEqual(sorted(self.client().mlsd()), [
+            ("a.bin", 5000, "20261018120000", "file"),
+            ("logs", None, "20260101000000", "dir"),
+            ("my file.txt", 1, "20260101000000", "file"),
+        ])
+        self.assertEqual(uftp.parse_mlsd("type=pdir; .."), None)
+        self.assertEqual(uftp.parse_mlsd("no-facts"), None)
+
+    def test_cached_within_ttl(self):
+        client = self.client()
+        listing = list(client.mlsd())
+        self.clock.sleep_ms(999)
+        self.assertEqual(list(client.mlsd()), listing)
+        self.assertEqual(list(client.listdir("/")), listing)
+        # Sizes come with the listing, and the working directory is known.
+        self.assertEqual(client.size("a.bin"), 5000)
+        client.cwd("/")
+        client.cwd("/")
+        self.assertEqual((self.count("MLSD"), self.count("SIZE"), self.count("CWD")), (1, 0, 1))
+        self.clock.sleep_ms(1)
+        self.assertEqual(list(client.mlsd()), listing)
+        self.assertEqual(client.size("a.bin"), 5000)
+        self.assertEqual((self.count("MLSD"), self.count("SIZE")), (2, 0))
+        self.clock.sleep_ms(1000)
+        client.size("a.bin")
+        self.assertEqual(self.count("SIZE"), 1)
+
+    def test_uncached(self):
+        client = self.client(0)
+        for i in range(2):
+            list(client.mlsd())
+            client.size("a.bin")
+        self.assertEqual((self.count("MLSD"), self.count("SIZE")), (2, 2))
+
+    def test_stopped_listing_not_cached(self):
+        client = self.client()
+        listing = client.mlsd()
+        next(listing)
+        listing.close()
+        self.assertEqual(len(list(client.mlsd())), 3)
+        self.assertEqual(self.count("MLSD"), 2)
+
+    def test_invalidated_by_changes(self):
+        client = self.client()
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(b"new")
+        self.addCleanup(os.remove, f.name)
+        changes = [
+            (lambda: client.stor(f.name, "new.bin"), "new.bin"),
+            (lambda: client.rename("new.bin", "renamed.bin"), "renamed.bin"),
+            (lambda: client.delete("renamed.bin"), None),
+        ]
+        names = lambda: sorted(name for name, _, _, _ in client.mlsd())
+        self.assertEqual(names(), ["a.bin", "logs", "my file.txt"])
+        for i, (change, name) in enumerate(changes):
+            change()
+            self.assertEqual(names(), sorted(["a.bin", "logs", "my file.txt"] + ([name] if name else [])))
+            self.assertEqual(self.count("MLSD"), i + 2)
+        self.assertEqual(self.count("RNFR"), 1)
+        with self.assertRaises(uftp.PermError):
+            client.delete("renamed.bin")
+
+
+class BufferTest(ServerTestCase):
+
+    files = {"fw.bin": bytes(range(256)) * 40}
+
+    def test_retr_into_reuses_buffer(self):
+        buf = bytearray(1000)
+        writes = []
+
+        class Sink(io.BytesIO):
+            def write(self, data):
+                writes.append(data.obj is buf)
+                return super().write(data)
+
+        sink = Sink()
+        self.client().retr_into("fw.bin", sink, buf)
+        self.assertEqual(sink.getvalue(), self.files["fw.bin"])
+        self.assertEqual(len(writes), 11)
+        self.assertTrue(all(writes))
+        sink = io.BytesIO()
+        self.client().retr_into("fw.bin", sink, rest=10000)
+        self.assertEqual(sink.getvalue(), self.files["fw.bin"][10000:])
+
+    def test_stor_through_buffer(self):
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(self.files["fw.bin"])
+        self.addCleanup(os.remove, f.name)
+        self.client().stor(f.name, "up.bin", buffer=bytearray(777))
+        self.assertEqual(self.server.files["up.bin"], self.files["fw.bin"])
+
+
+class ResumeTest(ServerTestCase):
+
+    files = {"fw.bin": bytes(range(256)) * 40}
+
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        self.local = os.path.join(tmp.name, "fw.bin")
+
+    def read_local(self):
+        self.assertEqual(sorted(os.listdir(self.dir)), ["fw.bin"])
+        with open(self.local, "rb") as f:
+            return f.read()
+
+    def test_download_resumes_after_drop(self):
+        self.server.drop_after = 3000
+        client = self.client()
+        client.retr_to_file("fw.bin", self.local)
+        self.assertEqual(self.read_local(), self.files["fw.bin"])
+        self.assertEqual(client.bytes_resumed, 3000)
+        self.assertIn("REST", self.server.log)
+
+    def test_download_resumes_after_reset(self):
+        for mdtm in (True, False):
+            self.server.mdtm = mdtm
+            self.server.drop_after, self.server.drops = 3000, 1
+            with self.assertRaises((OSError, EOFError)):
+                self.client().retr_to_file("fw.bin", self.local, retries=0)
+            # A new session, as after a reset, picks up the partial file.
+            client = self.client()
+            client.retr_to_file("fw.bin", self.local)
+            self.assertEqual(self.read_local(), self.files["fw.bin"])
+            self.assertEqual(client.bytes_resumed, 3000)
+            os.remove(self.local)
+
+    def test_download_restarts_when_remote_file_changes(self):
+        for new in (bytes(reversed(self.files["fw.bin"])), b"z" * 20000):
+            self.server.drop_after, self.server.drops = 3000, 1
+            with self.assertRaises((OSError, EOFError)):
+                self.client().retr_to_file("fw.bin", self.local, retries=0)
+            self.server.files["fw.bin"] = new
+            self.server.mtimes["fw.bin"] = "20260102%06d" % len(new)
+            client = self.client()
+            client.retr_to_file("fw.bin", self.local)
+            self.assertEqual(self.read_local(), new)
+            self.assertEqual(client.bytes_resumed, 0)
+
+    def test_upload_resumes_after_drop(self):
+        with open(self.local, "wb") as f:
+            f.write(self.files["fw.bin"])
+        self.server.drop_after = 3000
+        client = self.client()
+        client.stor_from_file(self.local, "up.bin")
+        self.assertEqual(self.server.files["up.bin"], self.files["fw.bin"])
+        self.assertEqual(client.bytes_resumed, 3000)
+        # What was written past the cut had to be sent again.
+        self.assertGreater(client.bytes_resent, 0)
+        self.assertLessEqual(client.bytes_resent, len(self.files["fw.bin"]) - 3000)
+        self.assertEqual(os.listdir(self.dir), ["fw.bin"])
+
+    def test_upload_over_stale_remote_file(self):
+        with open(self.local, "wb") as f:
+            f.write(self.files["fw.bin"])
+        for stale in (b"s" * 3000, b"s" * len(self.files["fw.bin"])):
+            for retries in (0, 3):
+                self.server.files["up.bin"] = stale
+                client = self.client()
+
+                def drop(cmd, rest=None):
+                    # The link goes down before the STOR is accepted.
+                    del client.ntransfercmd
+                    raise OSError(104)
+
+                client.ntransfercmd = drop
+                if not retries:
+                    # Nothing was sent: after a reset, no upload to resume.
+                    with self.assertRaises(OSError):
+                        client.stor_from_file(self.local, "up.bin", retries)
+                    self.assertEqual(os.listdir(self.dir), ["fw.bin"])
+                client.stor_from_file(self.local, "up.bin", retries)
+                self.assertEqual(self.server.files["up.bin"], self.files["fw.bin"])
+                self.assertEqual(client.bytes_resumed, 0)
+                self.assertEqual(os.listdir(self.dir), ["fw.bin"])
+
+
+if __name__ == "__main__":
+    unittest.main()
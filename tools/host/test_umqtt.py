@@ -0,0 +1,240 @@
+# Copyright (c) 2026, Digi International, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import tempfile
+import time
+import unittest
+
+import hostenv
+from mqtt_broker import Broker, encode_publish
+from umqtt.simple import MQTTClient, encode_topic
+
+
+def wait_for(cond, timeout=2.0):
+    end = time.monotonic() + timeout
+    while not cond():
+        if time.monotonic() > end:
+            raise AssertionError("timed out")
+        time.sleep(0.005)
+
+
+class BrokerTestCase(unittest.TestCase):
+
+    latency = 0
+
+    def setUp(self):
+        self.broker = Broker(self.latency)
+        self.addCleanup(self.broker.close)
+
+    def client(self, **kw):
+        client = MQTTClient("test", self.broker.host, self.broker.port, **kw)
+        client.connect()
+        self.addCleanup(client.sock.close)
+        return client
+
+
+class ReceiveTest(unittest.TestCase):
+
+    def test_packets_split_across_reads(self):
+        # Payloads from empty to bigger than the receive buffer, QoS 0 and
+        # 1, with other packets in between, arriving 7 bytes at a time.
+        data = b"".join(encode_publish(b"t/%d" % i, b"m" * (i * 13), i % 2, i) for i in range(20))
+        data += b"\xd0\x00" + b"\x40\x02\x00\x05"
+        client = MQTTClient("test", "host", rbuf_size=64)
+        client.sock = hostenv.MemorySocket(data, chunk=7)
+        got = []
+        client.set_callback(lambda topic, msg: got.append((topic, bytes(msg))))
+        ops = []
+        while client.sock.inb or client._rend > client._rpos:
+            ops.append(client.check_msg())
+        self.assertEqual(got, [(b"t/%d" % i, b"m" * (i * 13)) for i in range(20)])
+        self.assertEqual(ops[-2:], [None, 0x40])
+        # One PUBACK per QoS 1 message.
+        self.assertEqual(bytes(client.sock.out), b"".join(b"\x40\x02\x00" + bytes((i,)) for i in range(1, 20, 2)))
+        self.assertIsNone(client.check_msg())
+
+    def test_subscription_burst(self):
+        broker = Broker()
+        self.addCleanup(broker.close)
+        client = MQTTClient("test", broker.host, broker.port)
+        got = []
+        client.set_callback(lambda topic, msg: got.append(msg))
+        client.connect()
+        self.addCleanup(client.sock.close)
+        client.subscribe(b"t")
+        broker.push(b"t", b"x" * 100, count=200)
+        while len(got) < 200:
+            client.wait_msg()
+        self.assertEqual(set(got), {b"x" * 100})
+
+
+class PublishTest(unittest.TestCase):
+
+    def setUp(self):
+        self.client = MQTTClient("test", "host", max_inflight=2)
+        self.client.sock = hostenv.MemorySocket()
+
+    def test_single_write(self):
+        self.client.publish("t/1", '{"a": 1}')
+        self.assertEqual(self.client.sock.writes, 1)
+        self.assertEqual(bytes(self.client.sock.out), encode_publish(b"t/1", b'{"a": 1}'))
+
+    def test_encoded_topic(self):
+        self.client.publish_encoded(encode_topic("t/1"), b"zz", qos=1)
+        self.assertEqual(self.client.sock.writes, 1)
+        self.assertEqual(bytes(self.client.sock.out), encode_publish(b"t/1", b"zz", 1, 1))
+
+    def test_big_topic_and_payload(self):
+        self.client.publish("t" * 200, b"y" * 300, retain=True)
+        self.assertEqual(bytes(self.client.sock.out), encode_publish(b"t" * 200, b"y" * 300, retain=True))
+
+    def test_str_payload_length_is_in_bytes(self):
+        for payload in ("\xe9" * 10, "\xe9" * 200):
+            self.client.sock.out = bytearray()
+            self.client.publish(b"t", payload)
+            self.assertEqual(bytes(self.client.sock.out), encode_publish(b"t", payload.encode()))
+
+
+class InflightWindowTest(BrokerTestCase):
+
+    latency = 50
+
+    def test_window_pipelines_publishes(self):
+        client = self.client(max_inflight=4)
+        start = time.monotonic()
+        pids = [client.publish(b"t", b"m%d" % i, qos=1) for i in range(8)]
+        self.assertTrue(client.flush(2000))
+        # Two windows of four, not eight round trips.
+        self.assertLess(time.monotonic() - start, 0.3)
+        self.assertEqual(pids, list(range(1, 9)))
+        self.assertEqual(client._inflight, 0)
+        self.assertEqual([m for t, m in self.broker.delivered], [b"m%d" % i for i in range(8)])
+
+    def test_stop_and_wait_without_window(self):
+        client = self.client()
+        self.assertIsNone(client.publish(b"t", b"m", qos=1))
+        self.assertEqual(client._inflight, 0)
+
+    def test_unacknowledged_publish_is_resent_with_dup(self):
+        client = self.client(max_inflight=2, retry_timeout=50)
+        self.broker.ack = False
+        client.publish(b"t", b"m", qos=1)
+        self.assertFalse(client.flush(200))
+        self.broker.ack = True
+        self.assertTrue(client.flush(1000))
+        copies = [r for r in self.broker.received if r[1] == b"m"]
+        self.assertGreater(len(copies), 1)
+        self.assertFalse(copies[0][3])
+        self.assertTrue(all(dup for _, _, _, dup, _ in copies[1:]))
+        self.assertEqual(len({pid for _, _, _, _, pid in copies}), 1)
+
+    def test_check_msg_retransmits(self):
+        client = MQTTClient("test", "host", max_inflight=4, retry_timeout=50)
+        client.sock = hostenv.MemorySocket()
+        client.publish(b"t", b"m", qos=1)
+        self.assertIsNone(client.check_msg())
+        self.assertEqual(bytes(client.sock.out), encode_publish(b"t", b"m", 1, 1))
+        time.sleep(0.06)
+        self.assertIsNone(client.check_msg())
+        self.assertEqual(bytes(client.sock.out), encode_publish(b"t", b"m", 1, 1) + encode_publish(b"t", b"m", 1, 1, dup=True))
+
+
+class QoS2Test(BrokerTestCase):
+
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.session_file = os.path.join(tmp.name, "session")
+
+    def test_exactly_once(self):
+        client = self.client(max_inflight=4)
+        for i in range(6):
+            client.publish(b"t", b"m%d" % i, qos=2)
+        self.assertTrue(client.flush(1000))
+        self.assertEqual(self.broker.delivered, [(b"t", b"m%d" % i) for i in range(6)])
+
+    def test_session_resumes_without_duplicates(self):
+        client = self.client(max_inflight=4, session_file=self.session_file)
+        self.broker.ack = False
+        client.publish(b"t", b"a", qos=2)
+        client.publish(b"t", b"b", qos=1)
+        wait_for(lambda: len(self.broker.received) == 2)
+        self.broker.drop()
+        self.broker.ack = True
+
+        # A new client, as after a reset, resumes from the session file.
+        client = MQTTClient("test", self.broker.host, self.broker.port, max_inflight=4,
+                            session_file=self.session_file)
+        client.connect(clean_session=False)
+        self.addCleanup(client.sock.close)
+        pid = client.publish(b"t", b"c", qos=1)
+        self.assertNotIn(pid, (1, 2))
+        self.assertTrue(client.flush(1000))
+        self.assertEqual(sorted(m for _, m in self.broker.delivered), [b"a", b"b", b"b", b"c"])
+        resent = [r for r in self.broker.received if r[3]]
+        self.assertEqual(sorted((m, pid) for _, m, _, _, pid in resent), [(b"a", 1), (b"b", 2)])
+
+        # Everything completed: a further restart has nothing to resend.
+        client = MQTTClient("test", "host", session_file=self.session_file)
+        client._load_session()
+        self.assertEqual(client._inflight, 0)
+
+    def test_session_saves_str_topic_and_msg(self):
+        client = self.client(max_inflight=4, session_file=self.session_file)
+        self.broker.ack = False
+        client.publish("temp/\u00b0C", "22.5", qos=1)
+        client = MQTTClient("test", "host", session_file=self.session_file)
+        client._load_session()
+        self.assertEqual(client._inflight, 1)
+        self.assertEqual(client._ifl_msg[0], ("temp/\u00b0C".encode(), b"22.5", 0, 0))
+
+    def test_inbound_delivered_once(self):
+        client = MQTTClient("test", "host")
+        got = []
+        client.set_callback(lambda topic, msg: got.append(msg))
+        pkt = encode_publish(b"t", b"X", 2, 9)
+        client.sock = hostenv.MemorySocket(pkt + encode_publish(b"t", b"X", 2, 9, dup=True) + b"\x62\x02\x00\x09")
+        for i in range(3):
+            client.wait_msg()
+        self.assertEqual(got, [b"X"])
+        # PUBREC for both copies, PUBCOMP for the PUBREL.
+        self.assertEqual(bytes(client.sock.out), b"\x50\x02\x00\x09" * 2 + b"\x70\x02\x00\x09")
+        self.assertNotIn(9, client._rx_pid)
+
+    def test_many_inbound_flows_delivered_once(self):
+        client = MQTTClient("test", "host")
+        got = []
+        client.set_callback(lambda topic, msg: got.append(msg))
+        pids = range(1, 11)
+        # Ten flows waiting for PUBREL, all redelivered before released.
+        data = b"".join(encode_publish(b"t", b"m%d" % pid, 2, pid) for pid in pids)
+        data += b"".join(encode_publish(b"t", b"m%d" % pid, 2, pid, dup=True) for pid in pids)
+        data += b"".join(b"\x62\x02\x00" + bytes([pid]) for pid in pids)
+        client.sock = hostenv.MemorySocket(data)
+        for i in range(30):
+            client.wait_msg()
+        self.assertEqual(got, [b"m%d" % pid for pid in pids])
+        self.assertFalse(any(client._rx_pid))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,298 @@
+# Copyright (c) 2026, Digi International, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import hostenv
+from http_server import Server
+
+urequests = hostenv.urequests
+
+
+def response(data, method="GET", chunk=1024):
+    resp = urequests.Response(hostenv.MemorySocket(data, chunk=chunk))
+    resp._recv_head(method)
+    return resp
+
+
+HEAD = (b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nX-Long: " + b"v" * 1500 +
+        b"\r\nETag: \"e1\"\r\ncontent-LENGTH: 5\r\n\r\n")
+
+
+class ResponseTest(unittest.TestCase):
+
+    def test_headers(self):
+        for chunk in (1024, 7):
+            resp = response(HEAD + b"hello", chunk=chunk)
+            self.assertEqual((resp.status_code, resp.reason), (200, b"OK"))
+            self.assertEqual(resp.headers["content-type"], "application/json")
+            self.assertEqual(resp.headers.get("ETAG"), '"e1"')
+            self.assertEqual(resp.headers["X-Long"], "v" * 1500)
+            self.assertIn("Content-Length", resp.headers)
+            self.assertIsNone(resp.headers.get("Location"))
+            self.assertEqual(resp.content, b"hello")
+
+    def test_content_length_bounds_body(self):
+        # The connection stays open with the next response queued: the
+        # body ends at Content-Length, not at the end of the stream.
+        resp = response(HEAD + b"helloHTTP/1.1 200 OK\r\n")
+        self.assertEqual(resp.read(3), b"hel")
+        self.assertEqual(resp.read(), b"lo")
+        self.assertEqual(resp.read(), b"")
+        self.assertEqual(response(HEAD + b"hello, again").content, b"hello")
+
+    def test_truncated_body_raises(self):
+        resp = response(HEAD + b"hel")
+        with self.assertRaises(OSError):
+            resp.content
+
+    def test_readinto(self):
+        chunked = b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n3\r\nabc\r\n4;x=y\r\ndefg\r\n0\r\n\r\n"
+        for data, body in ((HEAD + b"hello", b"hello"), (chunked, b"abcdefg")):
+            resp = response(data, chunk=5)
+            buf = bytearray(2)
+            got = bytearray()
+            while True:
+                n = resp.readinto(buf)
+                if not n:
+                    break
+                got += buf[:n]
+            self.assertEqual(bytes(got), body)
+
+    def test_no_body(self):
+        self.assertEqual(response(HEAD, "HEAD").content, b"")
+        self.assertEqual(response(b"HTTP/1.1 304 Not Modified\r\nContent-Length: 9\r\n\r\n").content, b"")
+
+    def test_closed_before_status_line(self):
+        with self.assertRaises(OSError):
+            response(b"")
+
+
+class ServerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.server = Server()
+        self.addCleanup(self.server.close)
+        self.base = self.server.base
+
+
+class SessionTest(ServerTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.session = urequests.Session()
+        self.addCleanup(self.session.close)
+
+    def test_connection_reused(self):
+        for i in range(5):
+            self.assertEqual(self.session.get(self.base + "/bytes/10").content, b"x" * 10)
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual((self.session.connections, self.session.reused), (1, 4))
+        self.assertAlmostEqual(self.session.reuse_rate, 0.8)
+
+    def test_unread_bodies_are_drained(self):
+        for path in ("/bytes/2000", "/chunked/2000"):
+            resp = self.session.get(self.base + path)
+            self.assertEqual(resp.read(10), b"x" * 10)
+            # Not closed: the next request drains the rest first.
+            self.assertEqual(self.session.get(self.base + "/bytes/3").content, b"xxx")
+            resp = self.session.get(self.base + path)
+            resp.read(10)
+            resp.close()
+            self.assertEqual(self.session.get(self.base + "/bytes/3").content, b"xxx")
+        self.assertEqual(self.server.connections, 1)
+
+    def test_head_and_post(self):
+        self.assertEqual(self.session.head(self.base + "/h").status_code, 200)
+        self.assertEqual(self.session.post(self.base + "/echo", json={"a": 1}).json(), {"a": 1})
+        self.assertEqual(self.session.post(self.base + "/echo", data="v").text, "v")
+        self.assertEqual(self.server.connections, 1)
+
+    def test_connection_close_response(self):
+        self.assertEqual(self.session.get(self.base + "/close").text, "bye")
+        self.assertEqual(self.session.get(self.base + "/bytes/1").text, "x")
+        self.assertEqual(self.server.connections, 2)
+        self.assertEqual(self.session.reused, 0)
+
+    def test_stale_connection_is_replaced(self):
+        self.session.get(self.base + "/bytes/1")
+        self.server.drop()
+        self.assertEqual(self.session.get(self.base + "/bytes/5").content, b"x" * 5)
+        self.assertEqual(self.session.connections, 2)
+
+    def test_plain_requests_close(self):
+        for i in range(3):
+            self.assertEqual(urequests.get(self.base + "/chunked/150").content, b"x" * 150)
+        self.assertEqual(self.server.connections, 3)
+
+
+def pieces(n, size=75):
+    for i in range(n):
+        yield ("%02d" % i) * (size // 2) + "|"
+
+
+class UploadTest(ServerTestCase):
+
+    def send(self, data, headers={}):
+        sock = hostenv.MemorySocket()
+        urequests._send(sock, "POST", "h", "echo", data, None, headers, False, False)
+        head, _, body = bytes(sock.out).partition(b"\r\n\r\n")
+        return head, body
+
+    def test_generator_body_is_chunked(self):
+        body = "".join(pieces(8)).encode()
+        head, wire = self.send(pieces(8))
+        self.assertIn(b"HTTP/1.1", head)
+        self.assertIn(b"Transfer-Encoding: chunked", head)
+        self.assertNotIn(b"Content-Length", head)
+        # Sent through the fixed buffer: full chunks, then the rest.
+        n = urequests.BODY_BUFFER_SIZE
+        self.assertEqual(wire, b"%x\r\n%s\r\n%x\r\n%s\r\n0\r\n\r\n" % (n, body[:n], len(body) - n, body[n:]))
+        resp = urequests.post(self.base + "/echo", data=pieces(8))
+        self.assertEqual(resp.content, body)
+
+    def test_file_body_with_content_length(self):
+        data = bytes(range(256)) * 5
+        headers = {"Content-Length": str(len(data))}
+        head, wire = self.send(io.BytesIO(data), headers)
+        self.assertNotIn(b"chunked", head)
+        self.assertEqual(wire, data)
+        self.assertEqual(urequests.put(self.base + "/echo", data=io.BytesIO(data), headers=headers).content, data)
+        self.assertEqual(urequests.post(self.base + "/echo", data=io.BytesIO(data)).content, data)
+
+    def test_iter_json(self):
+        obj = {"id": "temp", "text": 'say "hi" \\ \u00e9', "values": [1, 2.5, None, True, {"k": []}], "n": {}}
+        gen = (i * i for i in range(4))
+        self.assertEqual(json.loads("".join(urequests.iter_json(obj))), obj)
+        self.assertEqual(json.loads("".join(urequests.iter_json({"squares": gen}))), {"squares": [0, 1, 4, 9]})
+        self.assertEqual(urequests.post(self.base + "/echo", data=urequests.iter_json(obj)).json(), obj)
+
+    def test_session_reused_after_chunked_upload(self):
+        session = urequests.Session()
+        self.addCleanup(session.close)
+        for i in range(3):
+            self.assertEqual(session.post(self.base + "/echo", data=pieces(20)).content, "".join(pieces(20)).encode())
+            self.assertEqual(session.get(self.base + "/bytes/3").content, b"xxx")
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(session.reused, 5)
+
+
+class RedirectTest(ServerTestCase):
+
+    def redirect(self, to, code=302):
+        return self.base + "/redirect?to=" + to.replace("&", "%26") + "&code=%d" % code
+
+    def test_followed(self):
+        self.assertEqual(urequests.get(self.redirect("/bytes/3")).content, b"xxx")
+        self.assertEqual(urequests.get(self.redirect(self.redirect("/bytes/3"), 301)).content, b"xxx")
+        resp = urequests.get(self.redirect("/bytes/3"), allow_redirects=False)
+        self.assertEqual(resp.status_code, 302)
+        resp.close()
+
+    def test_post_becomes_get_unless_307(self):
+        self.assertEqual(urequests.post(self.redirect("/bytes/2", 303), data="v").content, b"xx")
+        self.assertEqual(urequests.post(self.redirect("/echo", 307), data="v").content, b"v")
+
+    def test_hop_limit(self):
+        url = self.redirect("/bytes/1")
+        for i in range(3):
+            url = self.redirect(url)
+        with self.assertRaises(RuntimeError):
+            urequests.get(url, max_redirects=3)
+
+    def test_authorization_kept_on_same_origin_only(self):
+        other = Server()
+        self.addCleanup(other.close)
+        auth = {"Authorization": "Basic dTpw"}
+        got = json.loads(urequests.get(self.redirect("/headers"), headers=auth).content)
+        self.assertEqual(got.get("Authorization"), "Basic dTpw")
+        got = json.loads(urequests.get(self.redirect(other.base + "/headers"), headers=auth).content)
+        self.assertNotIn("Authorization", got)
+
+    def test_https_to_http_not_followed(self):
+        sent = []
+
+        def send(method, url, data, json, headers):
+            sent.append(url)
+            return response(b"HTTP/1.1 302 Found\r\nLocation: http://example.com/\r\nContent-Length: 0\r\n\r\n")
+
+        resp = urequests._fetch(send, "GET", "https://example.com/a", None, None, {}, True, 5, None)
+        self.assertEqual(resp.status_code, 302)
+        self.assertEqual(sent, ["https://example.com/a"])
+
+
+class CacheTest(ServerTestCase):
+
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = os.path.join(tmp.name, "cache")
+
+    def test_not_modified_served_from_cache(self):
+        cache = urequests.ResponseCache(self.dir)
+        for i in range(3):
+            resp = urequests.get(self.base + "/etag", cache=cache)
+            self.assertEqual((resp.status_code, resp.content), (200, b"cached body"))
+        self.assertEqual((cache.misses, cache.hits), (1, 2))
+        # The entries survive a restart.
+        cache = urequests.ResponseCache(self.dir)
+        self.assertEqual(urequests.get(self.base + "/etag", cache=cache).content, b"cached body")
+        self.assertEqual(cache.hits, 1)
+
+    def test_responses_without_validators_not_cached(self):
+        cache = urequests.ResponseCache(self.dir)
+        urequests.get(self.base + "/bytes/10", cache=cache).content
+        self.assertEqual(os.listdir(self.dir), [])
+
+    def test_oversized_chunked_body_not_cached(self):
+        cache = urequests.ResponseCache(self.dir, max_size=1000)
+        for n in (900, 5000):
+            resp = urequests.get(self.base + "/chunked/%d?etag=1" % n, cache=cache)
+            self.assertEqual(resp.headers["etag"], '"v1"')
+            self.assertEqual(resp.content, b"x" * n)
+        resp = urequests.get(self.base + "/chunked/5000?etag=1", cache=cache)
+        self.assertEqual(resp.read(10), b"x" * 10)
+        buf = bytearray(700)
+        got = 10
+        while got < 3000:
+            got += resp.readinto(buf)
+        self.assertEqual(len(resp.content), 5000 - got)
+        self.assertEqual(len(os.listdir(self.dir)), 1)
+        self.assertLessEqual(cache._size, 1000)
+        self.assertIsNotNone(cache._lookup(self.base + "/chunked/900?etag=1"))
+
+    def test_least_recently_used_evicted(self):
+        cache = urequests.ResponseCache(self.dir, max_size=130)
+        urls = [self.base + "/etag?n=%d" % i for i in range(3)]
+        for url in urls:
+            urequests.get(url, cache=cache).content
+            urequests.get(urls[0], cache=cache).content
+        self.assertLessEqual(cache._size, 130)
+        self.assertIsNotNone(cache._lookup(urls[0]))
+        self.assertIsNone(cache._lookup(urls[1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
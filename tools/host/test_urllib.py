@@ -0,0 +1,113 @@
+# Copyright (c) 2026, Digi International, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+import urllib.parse as cpython
+
+import hostenv
+from http_server import Server
+
+parse = hostenv.urllib_parse
+
+
+class QuoteTest(unittest.TestCase):
+
+    STRINGS = ["", "abc", "a b/c?d=e&f", "~user/x.y_z-1", "\u00e9t\u00e9 \u20ac", "100%", "a+b c", "/" * 3,
+               "".join(chr(c) for c in range(128))]
+
+    def test_matches_cpython(self):
+        for s in self.STRINGS:
+            for safe in ("/", "", "/?=&", b":@"):
+                self.assertEqual(parse.quote(s, safe), cpython.quote(s, safe), (s, safe))
+                self.assertEqual(parse.quote(s.encode(), safe), cpython.quote(s.encode(), safe), (s, safe))
+                self.assertEqual(parse.quote_plus(s, safe), cpython.quote_plus(s, safe), (s, safe))
+        data = bytes(range(256))
+        self.assertEqual(parse.quote_from_bytes(data), cpython.quote_from_bytes(data))
+        self.assertEqual(parse.quote("\u00e9", encoding="latin-1"), "%E9")
+
+    def test_errors(self):
+        with self.assertRaises(TypeError):
+            parse.quote(b"x", encoding="utf-8")
+        with self.assertRaises(TypeError):
+            parse.quote_from_bytes("x")
+
+
+
+class UnquoteTest(unittest.TestCase):
+
+    def test_matches_cpython(self):
+        for s in ("", "abc", "a%20b", "%e2%82%ACx", "%C3%A9t%C3%A9", "100%", "%zz%4", "%%41", "a+b", "%FF"):
+            self.assertEqual(parse.unquote(s), cpython.unquote(s), s)
+            self.assertEqual(parse.unquote_to_bytes(s), cpython.unquote_to_bytes(s), s)
+        self.assertEqual(parse.unquote_to_bytes(b"a%2Fb"), b"a/b")
+        self.assertEqual(parse.unquote("%E9", "latin-1"), "\u00e9")
+
+
+class SplitTest(unittest.TestCase):
+
+    URLS = ["https://user:pw@example.com:8443/a/b.json?x=1&y=2#top", "http://example.com", "http://h?q",
+            "//host/path", "/path/only?q#f", "mailto:someone@example.com", "HTTPS://Example.com/",
+            "a1+.-:rest", "1abc:x", "http://h#f?q", ""]
+
+    def test_matches_cpython(self):
+        for url in self.URLS:
+            self.assertEqual(parse.urlsplit(url), tuple(cpython.urlsplit(url)), url)
+            self.assertEqual(parse.urlunsplit(parse.urlsplit(url)), cpython.urlunsplit(cpython.urlsplit(url)), url)
+        self.assertEqual(parse.urlsplit("h/p", "http"), ("http", "", "h/p", "", ""))
+        self.assertEqual(parse.urlsplit("http://h/p#f", allow_fragments=False)[2], "/p#f")
+
+
+class QueryTest(unittest.TestCase):
+
+    QUERIES = ["a=1&b=2&a=3", "a=&b", "x=%20y+z&%C3%A9=%E2%82%AC", "&&a=1&", "k=v=w", ""]
+
+    def test_matches_cpython(self):
+        for qs in self.QUERIES:
+            for blank in (False, True):
+                self.assertEqual(parse.parse_qs(qs, blank), cpython.parse_qs(qs, blank), qs)
+                self.assertEqual(parse.parse_qsl(qs, blank), cpython.parse_qsl(qs, blank), qs)
+        body = bytearray(b"temp=22.5&unit=%C2%B0C")
+        self.assertEqual(parse.parse_qs(body), {"temp": ["22.5"], "unit": ["\u00b0C"]})
+
+    def test_urlencode(self):
+        for query, doseq in (({"a": "x y", "b": b"&", "c": 3}, False), ([("k", ["1", b"2"]), ("e", "\u00e9")], True),
+                             ({}, False)):
+            self.assertEqual(parse.urlencode(query, doseq), cpython.urlencode(query, doseq))
+            self.assertEqual(list(parse.iter_urlencode(query, doseq)),
+                             [p if i == 0 else "&" + p for i, p in enumerate(cpython.urlencode(query, doseq).split("&"))]
+                             if query else [])
+
+
+class ParamsTest(unittest.TestCase):
+
+    def test_request_params(self):
+        server = Server()
+        self.addCleanup(server.close)
+        url = server.base + "/redirect?code=302"
+        resp = hostenv.urequests.request("GET", url, params={"to": "/bytes/3?a=b&c", "skip": None},
+                                         allow_redirects=False)
+        self.assertEqual(resp.headers["location"], "/bytes/3?a=b&c")
+        resp.close()
+        resp = hostenv.urequests.get(server.base + "/redirect", params=[("to", "/bytes/2")])
+        self.assertEqual(resp.content, b"xx")
+
+
+if __name__ == "__main__":
+    unittest.main()